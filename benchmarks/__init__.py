@@ -0,0 +1,7 @@
+"""
+Offline benchmarks of the `oneupsdk` macros, run against a local stand-in for
+the OneUp platform (see `benchmarks.fake_server`) at configurable scale.
+
+Run them from the root of the repository with `python -m benchmarks` (see
+`python -m benchmarks --help` for the options).
+"""
@@ -0,0 +1,6 @@
+import sys
+
+import benchmarks.run
+
+
+sys.exit(benchmarks.run.main())
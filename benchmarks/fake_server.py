@@ -0,0 +1,560 @@
+"""
+Local stand-in for the OneUp platform, serving synthetic courses of any size.
+
+Only the pages that the macros use are implemented, with the same structure
+as the real pages (as far as the macros are concerned): the login form, the
+course selection, the student list and forms, the activities page and forms,
+and the points forms. The server counts the requests it receives, by path,
+so that benchmarks can report how many round trips each macro makes.
+"""
+
+from __future__ import absolute_import
+
+import collections as _collections
+import html as _html
+import itertools as _itertools
+import re as _re
+import threading as _threading
+import typing as _typing
+import uuid as _uuid
+import zlib as _zlib
+
+import six as _six
+
+
+# Values of the dates of the synthetic activities
+_DEFAULT_DATETIMES = {
+    "start_time": "01/19/2020 12:00 AM",
+    "end_time": "06/20/2028 12:00 AM",
+    "deadline": "06/20/2028 12:00 AM",
+}
+
+_SESSION_COOKIE_PATTERN = _re.compile(r"sessionid=([^;]+)")
+
+_SESSION_EXPIRES = "Wed, 21 Oct 2037 07:28:00 GMT"
+
+_CSRF_TOKEN = "benchmarkcsrftoken"
+
+
+###############################################################################
+# SYNTHETIC DATA
+###############################################################################
+
+class FakeCourse(object):
+    """
+    Synthetic course: its `students` (by username), activity `categories` (by
+    ID) and `activities` (by ID), with the points of each activity.
+    """
+
+    def __init__(self, course_id, name, students, activities, ids):
+        # type: (int, str, int, int, _typing.Iterator[int]) -> None
+        self.id = course_id
+        self.name = name
+
+        self.students = _collections.OrderedDict()  # type: _typing.Dict[str, dict]
+        for _ in range(students):
+            student_id = next(ids)
+            self.students["student{}".format(student_id)] = {
+                "id": student_id,
+                "first": "First{}".format(student_id),
+                "last": "Last{}".format(student_id),
+                "email": "student{}@example.edu".format(student_id),
+                "password": "password{}".format(student_id),
+            }
+
+        self.categories = _collections.OrderedDict()  # type: _typing.Dict[int, str]
+        for name in ["Uncategorized", "Homework", "Exams"]:
+            self.categories[next(ids)] = name
+
+        category_ids = list(self.categories.keys())
+
+        self.activities = _collections.OrderedDict()  # type: _typing.Dict[int, dict]
+        for index in range(activities):
+            activity_id = next(ids)
+            activity = {
+                "id": activity_id,
+                "name": "Activity {}".format(activity_id),
+                "points": 100,
+                "category_id": category_ids[index % len(category_ids)],
+                "description": "Description of activity {}".format(activity_id),
+                "instructor_notes": "",
+                "is_graded": False,
+                "grades": dict(),
+            }
+            activity.update(_DEFAULT_DATETIMES)
+            self.activities[activity_id] = activity
+
+        # Rendered pages, until the course is modified (so that the time to
+        # render large pages is not counted against the client)
+        self.pages = dict()  # type: _typing.Dict[tuple, _typing.Tuple[bytes, str]]
+
+
+class FakeOneUp(object):
+    """
+    State of the stand-in platform: its courses, the sessions that have logged
+    in (with their active course), and the count of the requests received.
+    """
+
+    def __init__(self, students=10, activities=10, courses=1):
+        # type: (int, int, int) -> None
+        ids = _itertools.count(1000)
+
+        self.courses = _collections.OrderedDict()  # type: _typing.Dict[int, FakeCourse]
+        for index in range(courses):
+            course_id = index + 1
+            self.courses[course_id] = FakeCourse(
+                course_id=course_id,
+                name="Benchmark Course {}".format(course_id),
+                students=students,
+                activities=activities,
+                ids=ids)
+
+        self._ids = ids
+        self.sessions = dict()  # type: _typing.Dict[str, _typing.Optional[int]]
+        self.logins = 0
+        self.requests = _collections.Counter()  # type: _typing.Counter[str]
+        self.lock = _threading.RLock()
+
+    def next_id(self):
+        # type: () -> int
+        return next(self._ids)
+
+    def count(self, path):
+        # type: (str) -> None
+        with self.lock:
+            self.requests[path] += 1
+
+    def reset_counts(self):
+        # type: () -> None
+        with self.lock:
+            self.requests.clear()
+            self.logins = 0
+
+    @property
+    def request_count(self):
+        # type: () -> int
+        with self.lock:
+            return sum(self.requests.values())
+
+
+###############################################################################
+# PAGES
+###############################################################################
+
+def _escape(value):
+    # type: (_typing.Any) -> str
+    return _html.escape("" if value is None else str(value))
+
+
+def _render_courses(state):
+    # type: (FakeOneUp) -> str
+    rows = "".join(
+        "<tr><td>{name} \xa0 (WSSU)</td>"
+        "<td><input type=\"hidden\" name=\"courseID\" value=\"{id}\"></td></tr>".format(
+            name=_escape(course.name), id=course.id)
+        for course in state.courses.values())
+    return "<html><body><table><tr><th>Your Courses</th></tr>{}</table></body></html>".format(rows)
+
+
+def _render_student_list(course):
+    # type: (FakeCourse) -> str
+    rows = "".join(
+        "<tr><td><img src=\"/static/avatar.png\"></td>"
+        "<td>{first}</td><td>{last}</td><td>{email}</td><td>Never</td>"
+        "<td><input type=\"hidden\" name=\"userID\" value=\"{username}\">"
+        "<input type=\"hidden\" name=\"student_internal_id\" value=\"{id}\"></td></tr>".format(
+            first=_escape(student["first"]), last=_escape(student["last"]),
+            email=_escape(student["email"]), username=_escape(username), id=student["id"])
+        for (username, student) in course.students.items())
+    return (
+        "<html><body>"
+        "<table><tr><th>Navigation</th></tr></table>"
+        "<table><tr><th>Avatar</th><th>First Name</th><th>Last Name</th><th>Email</th>"
+        "<th>Last Action</th></tr>{}</table>"
+        "</body></html>").format(rows)
+
+
+def _render_student_form(username, student):
+    # type: (str, dict) -> str
+    return (
+        "<html><body><form id=\"createStudentForm\">"
+        "<input name=\"firstname\" value=\"{first}\">"
+        "<input name=\"lastname\" value=\"{last}\">"
+        "<input name=\"email\" value=\"{email}\">"
+        "<input name=\"pword\" value=\"{password}\">"
+        "<input name=\"uname\" value=\"{username}\">"
+        "<input name=\"student_internal_id\" value=\"{id}\">"
+        "</form></body></html>").format(
+            first=_escape(student["first"]), last=_escape(student["last"]),
+            email=_escape(student["email"]), password=_escape(student["password"]),
+            username=_escape(username), id=student["id"])
+
+
+def _render_activities_page(course):
+    # type: (FakeCourse) -> str
+    options = "<option value=\"all\">All</option>" + "".join(
+        "<option value=\"{}\">{}</option>".format(category_id, _escape(name))
+        for (category_id, name) in course.categories.items())
+    items = "".join(
+        "<li id=\"{id}\" data-category-id=\"{category_id}\"><div class=\"sortable-item\">"
+        "<div>=</div><div>{name}</div><div>{description}</div><div>{points} Points</div>"
+        "</div></li>".format(
+            id=activity["id"], category_id=activity["category_id"],
+            name=_escape(activity["name"]), description=_escape(activity["description"]),
+            points=_escape(activity["points"]))
+        for activity in course.activities.values())
+    return (
+        "<html><body><select name=\"actCat\">{}</select>"
+        "<ul id=\"sortable-categories\">{}</ul></body></html>").format(options, items)
+
+
+def _render_activity_form(course, activity):
+    # type: (FakeCourse, dict) -> str
+    options = "".join(
+        "<option value=\"{}\"{}>{}</option>".format(
+            category_id, " selected" if category_id == activity["category_id"] else "",
+            _escape(name))
+        for (category_id, name) in course.categories.items())
+    return (
+        "<html><body><form id=\"actForm\">"
+        "<input name=\"activityID\" value=\"{id}\">"
+        "<input name=\"activityName\" value=\"{name}\">"
+        "<input name=\"points\" value=\"{points}\">"
+        "<input name=\"startTime\" value=\"{start_time}\">"
+        "<input name=\"endTime\" value=\"{end_time}\">"
+        "<input name=\"deadLine\" value=\"{deadline}\">"
+        "<input type=\"checkbox\" name=\"isGraded\"{is_graded}>"
+        "<textarea name=\"description\">{description}</textarea>"
+        "<textarea name=\"instructorNotes\">{instructor_notes}</textarea>"
+        "<select name=\"actCat\">{options}</select>"
+        "</form></body></html>").format(
+            id=activity["id"], name=_escape(activity["name"]),
+            points=_escape(activity["points"]), start_time=_escape(activity["start_time"]),
+            end_time=_escape(activity["end_time"]), deadline=_escape(activity["deadline"]),
+            is_graded=" checked" if activity["is_graded"] else "",
+            description=_escape(activity["description"]),
+            instructor_notes=_escape(activity["instructor_notes"]),
+            options=options)
+
+
+def _render_points_form(course, activity):
+    # type: (FakeCourse, dict) -> str
+    rows = []
+    for student in course.students.values():
+        (points, feedback) = activity["grades"].get(student["id"], ("", ""))
+        rows.append(
+            "<tr><td><input type=\"number\" id=\"{id}_points\" name=\"student_Points{id}\" "
+            "value=\"{points}\"></td><td><textarea id=\"student_feedback\" "
+            "name=\"student_Feedback{id}\">{feedback}</textarea></td></tr>".format(
+                id=student["id"], points=_escape(points), feedback=_escape(feedback)))
+    return (
+        "<html><body><form><input type=\"hidden\" name=\"activityID\" value=\"{}\">"
+        "<table>{}</table></form></body></html>").format(activity["id"], "".join(rows))
+
+
+###############################################################################
+# SERVER
+###############################################################################
+
+class _Response(object):
+
+    __slots__ = ("status", "body", "headers")
+
+    def __init__(self, body=b"", status=200, headers=None):
+        # type: (_typing.Union[str, bytes], int, _typing.Optional[list]) -> None
+        self.status = status
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.headers = headers or []
+
+
+def _redirect(location, headers=None):
+    # type: (str, _typing.Optional[list]) -> _Response
+    return _Response(status=302, headers=[("Location", location)] + (headers or []))
+
+
+class _Handler(_six.moves.BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body are written separately, which must not be delayed
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        # type: (str) -> None
+        state = self.server.state
+
+        url = _six.moves.urllib.parse.urlparse(self.path)
+        path = url.path.rstrip("/")
+        query = dict(_six.moves.urllib.parse.parse_qsl(url.query))
+
+        form = dict()
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            form = dict(_six.moves.urllib.parse.parse_qsl(
+                self.rfile.read(length).decode("utf-8"), keep_blank_values=True))
+
+        state.count(path)
+
+        with state.lock:
+            try:
+                response = self._respond(state, method, path, query, form)
+            except (KeyError, ValueError):
+                response = _Response("Bad Request", status=400)
+
+        # Pages that have not changed are revalidated without a body
+        etag = dict(response.headers).get("ETag")
+        if etag is not None and etag == self.headers.get("If-None-Match"):
+            response = _Response(status=304, headers=[("ETag", etag)])
+
+        self._send(response)
+
+    def _send(self, response):
+        # type: (_Response) -> None
+        self.send_response(response.status)
+        for (name, value) in response.headers:
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(response.body)))
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def _session(self, state):
+        # type: (FakeOneUp) -> _typing.Optional[str]
+        match = _SESSION_COOKIE_PATTERN.search(self.headers.get("Cookie") or "")
+        if match is None or match.group(1) not in state.sessions:
+            return None
+        return match.group(1)
+
+    def _respond(self, state, method, path, query, form):
+        # type: (FakeOneUp, str, str, dict, dict) -> _Response
+
+        if path == "/login":
+            if method == "GET":
+                return _Response(
+                    "<html><body><form><input type=\"hidden\" name=\"csrfmiddlewaretoken\" "
+                    "value=\"{}\"></form></body></html>".format(_CSRF_TOKEN),
+                    headers=[("Set-Cookie", "csrftoken={}; Path=/".format(_CSRF_TOKEN))])
+
+            session_id = _uuid.uuid4().hex
+            state.sessions[session_id] = None
+            state.logins += 1
+            return _redirect("/oneUp/instructors/instructorHome", headers=[
+                ("Set-Cookie", "sessionid={}; Path=/; expires={}".format(
+                    session_id, _SESSION_EXPIRES)),
+                ("Set-Cookie", "csrftoken={}; Path=/".format(_CSRF_TOKEN)),
+            ])
+
+        session_id = self._session(state)
+        if session_id is None:
+            return _redirect("/login?next={}".format(path))
+
+        if path == "/oneUp/instructors/instructorHome":
+            return _Response(_render_courses(state))
+
+        if path == "/oneUp/setCourse":
+            course_id = int(form["courseID"])
+            if course_id not in state.courses:
+                return _Response("Not Found", status=404)
+            state.sessions[session_id] = course_id
+            return _Response("OK")
+
+        course = state.courses.get(state.sessions[session_id])
+        if course is None:
+            return _Response(
+                "<html><head><title>DoesNotExist</title></head><body>"
+                "CourseConfigParams matching query does not exist.</body></html>", status=500)
+
+        handler = _ROUTES.get((method, path))
+        if handler is None:
+            return _Response("Not Found", status=404)
+
+        return handler(state, course, query, form)
+
+
+def _cached_page(course, key, render):
+    # type: (FakeCourse, tuple, _typing.Callable[[], str]) -> _Response
+    page = course.pages.get(key)
+    if page is None:
+        body = render().encode("utf-8")
+        page = (body, "\"{:x}\"".format(_zlib.crc32(body)))
+        course.pages[key] = page
+
+    (body, etag) = page
+    return _Response(body, headers=[("ETag", etag)])
+
+
+def _course_home(state, course, query, form):
+    return _Response("<html><script>var course_id = '{}';</script></html>".format(course.id))
+
+
+def _student_list(state, course, query, form):
+    return _cached_page(course, ("students",), lambda: _render_student_list(course))
+
+
+def _student_form(state, course, query, form):
+    username = query.get("userID")
+    student = course.students.get(username)
+    if student is None:
+        return _Response("<html><body>No such student.</body></html>")
+    return _Response(_render_student_form(username, student))
+
+
+def _save_student(state, course, query, form):
+    if "userID" in form:
+        student = course.students.pop(form["userID"])
+    else:
+        student = {"id": state.next_id()}
+    student.update(
+        first=form.get("firstname", ""), last=form.get("lastname", ""),
+        email=form.get("email", ""), password=form.get("pword", ""))
+    course.students[form["uname"]] = student
+    course.pages.clear()
+    return _Response("OK")
+
+
+def _delete_student(state, course, query, form):
+    course.students.pop(form["userID"], None)
+    course.pages.clear()
+    return _Response("OK")
+
+
+def _activities_page(state, course, query, form):
+    return _cached_page(course, ("activities",), lambda: _render_activities_page(course))
+
+
+def _activity_form(state, course, query, form):
+    activity = course.activities.get(int(query.get("activityID") or 0))
+    if activity is None:
+        return _Response("<html><body>No such activity.</body></html>")
+    return _Response(_render_activity_form(course, activity))
+
+
+def _save_activity(state, course, query, form):
+    if form.get("activityID"):
+        activity_id = int(form["activityID"])
+    else:
+        activity_id = state.next_id()
+
+    activity = course.activities.setdefault(activity_id, {"id": activity_id, "grades": dict()})
+    activity.update(
+        name=form.get("activityName", ""),
+        points=form.get("points", ""),
+        category_id=int(form.get("actCat") or next(iter(course.categories))),
+        description=form.get("description", ""),
+        instructor_notes=form.get("instructorNotes", ""),
+        start_time=form.get("startTime", ""),
+        end_time=form.get("endTime", ""),
+        deadline=form.get("deadLine", ""),
+        is_graded="isGraded" in form)
+    course.pages.clear()
+    return _Response("OK")
+
+
+def _delete_activity(state, course, query, form):
+    course.activities.pop(int(form["activityID"]), None)
+    course.pages.clear()
+    return _Response("OK")
+
+
+def _create_category(state, course, query, form):
+    course.categories[state.next_id()] = form["catName"]
+    course.pages.clear()
+    return _redirect("/oneUp/instructors/activitiesList")
+
+
+def _delete_category(state, course, query, form):
+    course.categories.pop(int(form["catID"]), None)
+    course.pages.clear()
+    return _Response("OK")
+
+
+def _points_form(state, course, query, form):
+    activity = course.activities.get(int(query["activityID"]))
+    if activity is None:
+        return _Response("Not Found", status=404)
+    return _cached_page(course, ("points", activity["id"]),
+                        lambda: _render_points_form(course, activity))
+
+
+def _assign_points(state, course, query, form):
+    activity = course.activities.get(int(form["activityID"]))
+    if activity is None:
+        return _Response("Not Found", status=404)
+
+    for (name, value) in form.items():
+        if name.startswith("student_Points"):
+            student_id = int(name[len("student_Points"):])
+            activity["grades"][student_id] = (
+                value, form.get("student_Feedback{}".format(student_id), ""))
+
+    course.pages.pop(("points", activity["id"]), None)
+    return _Response("OK")
+
+
+_ROUTES = {
+    ("GET", "/oneUp/instructors/instructorCourseHome"): _course_home,
+    ("GET", "/oneUp/instructors/createStudentList"): _student_list,
+    ("GET", "/oneUp/instructors/createStudentView"): _student_form,
+    ("POST", "/oneUp/instructors/createStudentView"): _save_student,
+    ("POST", "/oneUp/instructors/deleteStudent"): _delete_student,
+    ("GET", "/oneUp/instructors/activitiesList"): _activities_page,
+    ("GET", "/oneUp/instructors/createActivity"): _activity_form,
+    ("POST", "/oneUp/instructors/createActivity"): _save_activity,
+    ("POST", "/oneUp/instructors/deleteActivity"): _delete_activity,
+    ("POST", "/oneUp/instructors/activityCatsCreate"): _create_category,
+    ("POST", "/oneUp/instructors/activityCatsDelete"): _delete_category,
+    ("GET", "/oneUp/instructors/activityAssignPointsForm"): _points_form,
+    ("POST", "/oneUp/instructors/activityAssignPoints"): _assign_points,
+}
+
+
+class FakeOneUpServer(_six.moves.socketserver.ThreadingMixIn, _six.moves.BaseHTTPServer.HTTPServer):
+    """
+    Local stand-in for the OneUp platform, serving `courses` synthetic courses
+    of `students` students and `activities` activities each, on an ephemeral
+    port of the loopback interface (see `url`). The server runs in a
+    background thread while it is used as a context manager.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, students=10, activities=10, courses=1, host="127.0.0.1", port=0):
+        # type: (int, int, int, str, int) -> None
+        _six.moves.BaseHTTPServer.HTTPServer.__init__(self, (host, port), _Handler)
+        self.state = FakeOneUp(students=students, activities=activities, courses=courses)
+        self._thread = None  # type: _typing.Optional[_threading.Thread]
+
+    @property
+    def url(self):
+        # type: () -> str
+        (host, port) = self.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def start(self):
+        # type: () -> FakeOneUpServer
+        self._thread = _threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        # type: () -> None
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,121 @@
+"""
+Measures how long a fresh interpreter takes to import the `oneupsdk` package,
+and checks it against a budget: importing the package must stay cheap, and
+must not import requests, bs4 or confuse (or read the configuration file),
+which only happens when a macro is first used.
+"""
+
+from __future__ import absolute_import
+
+import argparse as _argparse
+import collections as _collections
+import json as _json
+import os as _os
+import statistics as _statistics
+import subprocess as _subprocess
+import sys as _sys
+import typing as _typing
+
+
+# Budget (in seconds, median of the cold imports) of each measured import,
+# and the modules that it must not import; `None` means only measured
+IMPORT_BUDGETS = _collections.OrderedDict([
+    ("oneupsdk", (0.02, ["requests", "bs4", "confuse", "six"])),
+    ("oneupsdk.integration", (0.02, ["requests", "bs4", "confuse", "six"])),
+    ("oneupsdk.cli", (0.05, ["requests", "bs4", "confuse", "six"])),
+    ("oneupsdk.integration.macros", (None, [])),
+])
+
+DEFAULT_REPEAT = 10
+
+_ROOT = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
+
+_SCRIPT = """
+import json, sys, time
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+json.dump({{"elapsed": elapsed, "modules": sorted(sys.modules)}}, sys.stdout)
+"""
+
+
+def _import_once(module):
+    # type: (str) -> dict
+    output = _subprocess.check_output(
+        [_sys.executable, "-c", _SCRIPT.format(module=module)],
+        cwd=_ROOT,
+    )
+    return _json.loads(output.decode("utf-8"))
+
+
+def measure(modules=None, repeat=DEFAULT_REPEAT):
+    # type: (_typing.Optional[_typing.Iterable[str]], int) -> _typing.List[dict]
+    """
+    Imports each of the `modules` (by default, those of `IMPORT_BUDGETS`)
+    `repeat` times, each time in a new interpreter, and returns the median
+    import time, its budget, and whether the budget was exceeded or one of
+    the forbidden modules was imported.
+    """
+    results = []
+
+    for module in (modules or IMPORT_BUDGETS.keys()):
+        (budget, forbidden) = IMPORT_BUDGETS.get(module, (None, []))
+
+        timings = []
+        imported = set()
+        for _ in range(repeat):
+            run = _import_once(module)
+            timings.append(run["elapsed"])
+            imported.update(run["modules"])
+
+        median = _statistics.median(timings)
+        unexpected = sorted(name for name in forbidden if name in imported)
+
+        results.append(_collections.OrderedDict([
+            ("module", module),
+            ("median", median),
+            ("min", min(timings)),
+            ("max", max(timings)),
+            ("budget", budget),
+            ("unexpected_imports", unexpected),
+            ("ok", (budget is None or median <= budget) and not unexpected),
+        ]))
+
+    return results
+
+
+def main(argv=None):
+    # type: (_typing.Optional[_typing.List[str]]) -> int
+    parser = _argparse.ArgumentParser(
+        prog="python -m benchmarks.import_time",
+        description="Check the cold import time of oneupsdk against its budget.")
+    parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_REPEAT,
+        help="number of cold imports of each module (default: {})".format(DEFAULT_REPEAT))
+    parser.add_argument(
+        "--json", action="store_true",
+        help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    results = measure(repeat=args.repeat)
+
+    if args.json:
+        _json.dump(results, _sys.stdout, indent=2)
+        _sys.stdout.write("\n")
+    else:
+        for result in results:
+            print("{status:4}  {module:30} {median:8.1f} ms  (budget: {budget}){unexpected}".format(
+                status="ok" if result["ok"] else "FAIL",
+                module=result["module"],
+                median=result["median"] * 1000.0,
+                budget="-" if result["budget"] is None else "{:.0f} ms".format(result["budget"] * 1000.0),
+                unexpected="".join("\n      imports {}".format(name) for name in result["unexpected_imports"])))
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    _sys.exit(main())
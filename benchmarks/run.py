@@ -0,0 +1,376 @@
+"""
+Runs the macros of `oneupsdk.integration` against the local stand-in for the
+OneUp platform (see `benchmarks.fake_server`), at several scales, and records
+for each macro its latency, the number of requests it made, the time spent
+parsing HTML and its peak memory use, as a JSON document that can be compared
+across releases.
+"""
+
+from __future__ import absolute_import
+
+import argparse as _argparse
+import collections as _collections
+import datetime as _datetime
+import gc as _gc
+import json as _json
+import platform as _platform
+import statistics as _statistics
+import sys as _sys
+import threading as _threading
+import time as _time
+import tracemalloc as _tracemalloc
+import typing as _typing
+
+import oneupsdk.version
+import oneupsdk.integration
+import oneupsdk.integration.api
+import oneupsdk.integration.client
+import oneupsdk.integration.parsing
+import oneupsdk.integration.sessions
+
+import benchmarks.fake_server
+import benchmarks.import_time
+
+
+# Scales (number of students, number of activities) benchmarked by default
+DEFAULT_SCALES = [
+    (10, 10),
+    (100, 100),
+    (1000, 300),
+    (10000, 1000),
+]
+
+DEFAULT_REPEAT = 5
+
+DEFAULT_OUTPUT = "bench_results.json"
+
+# Number of students or activities that the bulk macros are given
+BULK_SIZE = 10
+
+_USERNAME = "benchmark@example.edu"
+_PASSWORD = "benchmark"
+
+
+###############################################################################
+# MEASUREMENTS
+###############################################################################
+
+class _ParseTimer(object):
+    """
+    Accumulates the time spent building HTML trees and running the streaming
+    student list parser, from any thread, while it is installed.
+    """
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self._lock = _threading.Lock()
+        self._originals = None
+
+    def _timed(self, func):
+        def wrapper(*args, **kwargs):
+            started_at = _time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = _time.perf_counter() - started_at
+                with self._lock:
+                    self.elapsed += elapsed
+        return wrapper
+
+    def __enter__(self):
+        parser_class = oneupsdk.integration.parsing.StudentListParser
+        self._originals = (oneupsdk.integration.parsing.make_soup, parser_class.feed)
+
+        oneupsdk.integration.parsing.make_soup = self._timed(self._originals[0])
+        parser_class.feed = self._timed(self._originals[1])
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        (make_soup, feed) = self._originals
+        oneupsdk.integration.parsing.make_soup = make_soup
+        oneupsdk.integration.parsing.StudentListParser.feed = feed
+
+
+def _summarize(values):
+    # type: (_typing.List[float]) -> dict
+    return {
+        "min": min(values),
+        "median": _statistics.median(values),
+        "mean": _statistics.mean(values),
+        "max": max(values),
+    }
+
+
+###############################################################################
+# BENCHMARKED MACROS
+###############################################################################
+
+class BenchmarkContext(object):
+    """
+    What a benchmarked macro is given: the `usernames` of the students and the
+    `activity_ids` of the activities of the course, and the number of the
+    current `iteration` (so that writes can change something every time).
+    """
+
+    def __init__(self, usernames, activity_ids, iteration=0):
+        # type: (_typing.List[str], _typing.List[int], int) -> None
+        self.usernames = usernames
+        self.activity_ids = activity_ids
+        self.iteration = iteration
+
+
+def _points_data(context):
+    # type: (BenchmarkContext) -> dict
+    return {
+        username: (context.iteration + index) % 100
+        for (index, username) in enumerate(context.usernames)
+    }
+
+
+# Benchmarked macros, by name; each of them is run with a client that has not
+# cached anything yet (but that is already logged in), and the iterators that
+# some macros return are consumed
+BENCHMARKS = _collections.OrderedDict([
+    ("get_instructor_courses",
+     lambda context: oneupsdk.integration.get_instructor_courses()),
+    ("get_enrolled_students",
+     lambda context: oneupsdk.integration.get_enrolled_students()),
+    ("iter_enrolled_students",
+     lambda context: list(oneupsdk.integration.iter_enrolled_students())),
+    ("get_roster",
+     lambda context: oneupsdk.integration.get_roster()),
+    ("get_student_by_username",
+     lambda context: oneupsdk.integration.get_student_by_username(
+         context.usernames[len(context.usernames) // 2])),
+    ("get_students_by_usernames",
+     lambda context: list(oneupsdk.integration.get_students_by_usernames(
+         context.usernames[:BULK_SIZE]))),
+    ("get_activities_page",
+     lambda context: oneupsdk.integration.get_activities_page()),
+    ("get_activities",
+     lambda context: oneupsdk.integration.get_activities()),
+    ("get_activity_by_id",
+     lambda context: oneupsdk.integration.get_activity_by_id(context.activity_ids[0])),
+    ("get_activities_by_ids",
+     lambda context: list(oneupsdk.integration.get_activities_by_ids(
+         context.activity_ids[:BULK_SIZE]))),
+    ("post_activity_points",
+     lambda context: oneupsdk.integration.post_activity_points(
+         context.activity_ids[0], _points_data(context), as_dict=True)),
+    ("post_activity_points_unchanged",
+     lambda context: oneupsdk.integration.post_activity_points(
+         context.activity_ids[-1], {}, as_dict=True)),
+    ("post_points_batch",
+     lambda context: oneupsdk.integration.post_points_batch(
+         {activity_id: _points_data(context)
+          for activity_id in context.activity_ids[:BULK_SIZE]},
+         as_dict=True)),
+])
+
+
+###############################################################################
+# RUNNER
+###############################################################################
+
+def _make_client(server, session_store, course_id, parser=None):
+    # type: (benchmarks.fake_server.FakeOneUpServer, oneupsdk.integration.sessions.MemorySessionStore, int, _typing.Optional[str]) -> oneupsdk.integration.client.OneUpClient
+    return oneupsdk.integration.client.OneUpClient(
+        username=_USERNAME,
+        password=_PASSWORD,
+        base_url=server.url,
+        parser=parser,
+        session_store=session_store,
+        course_id=course_id)
+
+
+def _run_once(server, session_store, course_id, macro, context, parser=None, trace_memory=False):
+    # type: (benchmarks.fake_server.FakeOneUpServer, oneupsdk.integration.sessions.MemorySessionStore, int, _typing.Callable, BenchmarkContext, _typing.Optional[str], bool) -> dict
+
+    # Every run starts from a fresh (but logged in) client, without caches
+    client = _make_client(server, session_store, course_id, parser=parser)
+    oneupsdk.integration.api.set_default_client(client)
+
+    # Restoring the shared session (and selecting its course again) is not
+    # part of the macro
+    client.get_csrf_token()
+
+    _gc.collect()
+    server.state.reset_counts()
+
+    if trace_memory:
+        _tracemalloc.start()
+
+    try:
+        with _ParseTimer() as parse_timer:
+            started_at = _time.perf_counter()
+            macro(context)
+            latency = _time.perf_counter() - started_at
+
+        peak_memory = None
+        if trace_memory:
+            (_, peak_memory) = _tracemalloc.get_traced_memory()
+
+    finally:
+        if trace_memory:
+            _tracemalloc.stop()
+        client.transport.close()
+
+    with server.state.lock:
+        requests = dict(server.state.requests)
+
+    return {
+        "latency": latency,
+        "parse_time": parse_timer.elapsed,
+        "peak_memory": peak_memory,
+        "requests": requests,
+    }
+
+
+def run_scale(students, activities, macros=None, repeat=DEFAULT_REPEAT, parser=None, log=None):
+    # type: (int, int, _typing.Optional[_typing.Iterable[str]], int, _typing.Optional[str], _typing.Optional[_typing.Callable[[str], None]]) -> _typing.List[dict]
+    """
+    Benchmarks the `macros` (by default, all of `BENCHMARKS`) against a course
+    of `students` students and `activities` activities, `repeat` times each
+    (plus a run under `tracemalloc` to measure peak memory use), and returns
+    a result for each macro. The server runs in the same process, with its
+    pages rendered ahead of time, so memory use includes the (small) cost of
+    handling the requests.
+    """
+    macros = list(macros or BENCHMARKS.keys())
+    results = []
+
+    with benchmarks.fake_server.FakeOneUpServer(students=students, activities=activities) as server:
+        course = server.state.courses[1]
+        usernames = list(course.students.keys())
+        activity_ids = list(course.activities.keys())
+
+        # Log in and select the course once, the session is then shared
+        session_store = oneupsdk.integration.sessions.MemorySessionStore()
+        client = _make_client(server, session_store, course.id, parser=parser)
+        client.set_active_course(course.id)
+        client.transport.close()
+
+        for name in macros:
+            macro = BENCHMARKS[name]
+
+            runs = [
+                _run_once(server, session_store, course.id, macro,
+                          BenchmarkContext(usernames, activity_ids, iteration=iteration),
+                          parser=parser)
+                for iteration in range(repeat)
+            ]
+            memory_run = _run_once(
+                server, session_store, course.id, macro,
+                BenchmarkContext(usernames, activity_ids, iteration=repeat),
+                parser=parser, trace_memory=True)
+
+            result = _collections.OrderedDict([
+                ("macro", name),
+                ("students", students),
+                ("activities", activities),
+                ("repeat", repeat),
+                ("latency", _summarize([run["latency"] for run in runs])),
+                ("parse_time", _summarize([run["parse_time"] for run in runs])),
+                ("peak_memory", memory_run["peak_memory"]),
+                ("request_count", sum(runs[-1]["requests"].values())),
+                ("requests", runs[-1]["requests"]),
+            ])
+            results.append(result)
+
+            if log is not None:
+                log("{students:>6} students {activities:>5} activities  {macro:<32} "
+                    "{latency:>9.4f}s  {requests:>4} requests  {parse:>9.4f}s parsing  "
+                    "{memory:>10.1f} KiB".format(
+                        students=students, activities=activities, macro=name,
+                        latency=result["latency"]["median"],
+                        requests=result["request_count"],
+                        parse=result["parse_time"]["median"],
+                        memory=result["peak_memory"] / 1024.0))
+
+    return results
+
+
+def run(scales=None, macros=None, repeat=DEFAULT_REPEAT, parser=None, log=None):
+    # type: (_typing.Optional[_typing.Iterable[_typing.Tuple[int, int]]], _typing.Optional[_typing.Iterable[str]], int, _typing.Optional[str], _typing.Optional[_typing.Callable[[str], None]]) -> dict
+    """
+    Benchmarks the `macros` at each of the `scales` (by default,
+    `DEFAULT_SCALES`), and returns the results together with a description
+    of the environment they were obtained in and the cold import time of
+    the package (see `benchmarks.import_time`).
+    """
+    scales = list(scales or DEFAULT_SCALES)
+
+    results = []
+    for (students, activities) in scales:
+        results.extend(run_scale(
+            students=students, activities=activities, macros=macros,
+            repeat=repeat, parser=parser, log=log))
+
+    return _collections.OrderedDict([
+        ("oneupsdk_version", oneupsdk.version.__version__),
+        ("python_version", _platform.python_version()),
+        ("platform", _platform.platform()),
+        ("parser", oneupsdk.integration.parsing.resolve_backend(parser)),
+        ("timestamp", _datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"),
+        ("import_time", benchmarks.import_time.measure()),
+        ("results", results),
+    ])
+
+
+###############################################################################
+# COMMAND LINE
+###############################################################################
+
+def _parse_scale(value):
+    # type: (str) -> _typing.Tuple[int, int]
+    try:
+        (students, activities) = value.lower().split("x")
+        return (int(students), int(activities))
+    except ValueError:
+        raise _argparse.ArgumentTypeError(
+            "expected a scale such as 100x50 (students x activities), not {!r}".format(value))
+
+
+def main(argv=None):
+    # type: (_typing.Optional[_typing.List[str]]) -> int
+    parser = _argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the oneupsdk macros against a local stand-in for OneUp.")
+    parser.add_argument(
+        "--scale", dest="scales", action="append", type=_parse_scale, metavar="STUDENTSxACTIVITIES",
+        help="course size to benchmark, can be repeated (default: {})".format(
+            ", ".join("{}x{}".format(*scale) for scale in DEFAULT_SCALES)))
+    parser.add_argument(
+        "--macro", dest="macros", action="append", choices=list(BENCHMARKS.keys()),
+        metavar="MACRO", help="macro to benchmark, can be repeated (default: all)")
+    parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_REPEAT,
+        help="number of timed runs of each macro (default: {})".format(DEFAULT_REPEAT))
+    parser.add_argument(
+        "--parser", default=None, choices=oneupsdk.integration.parsing.PARSER_BACKENDS,
+        help="HTML parser backend (default: the fastest installed)")
+    parser.add_argument(
+        "--output", "-o", default=DEFAULT_OUTPUT,
+        help="JSON file to write the results to, or - for the standard output "
+             "(default: {})".format(DEFAULT_OUTPUT))
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    log = lambda line: print(line, file=_sys.stderr)
+
+    report = run(
+        scales=args.scales, macros=args.macros, repeat=args.repeat,
+        parser=args.parser, log=log)
+
+    if args.output == "-":
+        _json.dump(report, _sys.stdout, indent=2)
+        _sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as f:
+            _json.dump(report, f, indent=2)
+            f.write("\n")
+        log("Results written to {}".format(args.output))
+
+    return 0
@@ -21,21 +21,35 @@ from oneupsdk.version import __version__
 
 
 # Configuration file
+#
+# The configuration is only read (and confuse only imported) when it is first
+# used, and the integration modules (and requests, bs4, ...) when they are
+# first accessed, so that importing the package is cheap
 
+import importlib as _importlib
 import os as _os
-import confuse as _confuse
+import threading as _threading
 
 APPNAME = "oneupsdk"
 
-class OneUpSDKConfiguration(_confuse.LazyConfig):
+# Lazy module attributes, created on first access (see `__getattr__`)
+_lazy_lock = _threading.RLock()
+
+
+def _make_configuration_class():
+    import confuse as _confuse
 
-    def config_dir(self):
+    class OneUpSDKConfiguration(_confuse.LazyConfig):
 
-        local_config = _os.path.join(_os.getcwd(), _confuse.CONFIG_FILENAME)
-        if _os.path.exists(local_config):
-            return _os.getcwd()
+        def config_dir(self):
 
-        return super(OneUpSDKConfiguration, self).config_dir()
+            local_config = _os.path.join(_os.getcwd(), _confuse.CONFIG_FILENAME)
+            if _os.path.exists(local_config):
+                return _os.getcwd()
+
+            return super(OneUpSDKConfiguration, self).config_dir()
+
+    return OneUpSDKConfiguration
 
 
 class OneUpSDKConfigurationException(Exception):
@@ -53,8 +67,6 @@ class OneUpSDKConfigurationException(Exception):
         super(OneUpSDKConfigurationException, self).__init__(msg)
 
 
-config = OneUpSDKConfiguration(APPNAME, __name__)
-
 # def get_course_name():
 #     try:
 #         course = config["course"].get(str).lower()
@@ -72,9 +84,10 @@ config = OneUpSDKConfiguration(APPNAME, __name__)
 
 
 def get_local_config(section, template):
+    import confuse as _confuse
 
     try:
-        valid = config.get(template)
+        valid = __getattr__("config").get(template)
 
     except _confuse.NotFoundError as exc:
         raise OneUpSDKConfigurationException(
@@ -85,4 +98,25 @@ def get_local_config(section, template):
     return valid[section]
 
 
-from oneupsdk.integration.api import configure_auth
\ No newline at end of file
+def __getattr__(name):
+    with _lazy_lock:
+        if name in globals():
+            return globals()[name]
+
+        if name == "OneUpSDKConfiguration":
+            value = _make_configuration_class()
+
+        elif name == "config":
+            value = __getattr__("OneUpSDKConfiguration")(APPNAME, __name__)
+
+        elif name == "configure_auth":
+            value = _importlib.import_module("oneupsdk.integration.api").configure_auth
+
+        elif name in ["integration", "util"]:
+            value = _importlib.import_module("{}.{}".format(__name__, name))
+
+        else:
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+        globals()[name] = value
+        return value
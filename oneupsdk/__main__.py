@@ -0,0 +1,6 @@
+import sys
+
+import oneupsdk.cli
+
+
+sys.exit(oneupsdk.cli.main())
@@ -0,0 +1,400 @@
+"""
+Command-line interface to the macros of `oneupsdk.integration`, installed as
+the `oneup` command. Batch input is read from CSV or JSONL files, and output
+is written as JSONL, one record per line, as soon as it is available.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse as _argparse
+import collections as _collections
+import json as _json
+import math as _math
+import os as _os
+import sys as _sys
+import typing as _typing
+
+# Cheap: the macros (and requests, bs4) are only imported when first used
+import oneupsdk
+import oneupsdk.integration
+
+
+PROG = "oneup"
+
+INPUT_FORMATS = ["csv", "jsonl"]
+
+
+###############################################################################
+# INPUT AND OUTPUT
+###############################################################################
+
+def _input_format(path, input_format=None):
+    # type: (str, _typing.Optional[str]) -> str
+    if input_format is not None:
+        return input_format
+
+    # The standard input and files without a known extension are JSONL
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def read_records(path, input_format=None):
+    # type: (str, _typing.Optional[str]) -> _typing.List[dict]
+    """
+    Reads the records of a CSV file (with a header row) or of a JSONL file
+    (one JSON object per line) at `path`, or on the standard input if `path`
+    is `-`. The format is that of the extension of the file, unless
+    `input_format` is given. Empty CSV cells are left out of the records.
+    """
+    if path == "-":
+        content = getattr(_sys.stdin, "buffer", _sys.stdin).read()
+    else:
+        with open(path, "rb") as f:
+            content = f.read()
+
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    if _input_format(path, input_format) == "csv":
+        return [
+            _collections.OrderedDict(
+                (key, value) for (key, value) in record.items()
+                if key is not None and value not in [None, ""])
+            for record in oneupsdk.integration.util.parse_csv(content)
+        ]
+
+    records = []
+    for (number, line) in enumerate(content.decode("utf-8").splitlines(), start=1):
+        if line.strip() == "":
+            continue
+        try:
+            record = _json.loads(line, object_pairs_hook=_collections.OrderedDict)
+        except ValueError as exc:
+            raise ValueError("{}, line {}: {}".format(path, number, exc))
+        if not isinstance(record, dict):
+            raise ValueError("{}, line {}: expected a JSON object".format(path, number))
+        records.append(record)
+
+    return records
+
+
+def read_spec(path):
+    # type: (str) -> dict
+    """
+    Reads a course structure specification (see `sync_activities`) from a
+    YAML (or JSON) file at `path`, or on the standard input if `path` is `-`.
+    """
+    import yaml as _yaml
+
+    if path == "-":
+        spec = _yaml.safe_load(_sys.stdin)
+    else:
+        with open(path) as f:
+            spec = _yaml.safe_load(f)
+
+    if not isinstance(spec, dict):
+        raise ValueError("{}: expected a mapping with `categories` and `activities`".format(path))
+
+    return spec
+
+
+def _jsonable(value):
+    # type: (_typing.Any) -> _typing.Any
+    if isinstance(value, BaseException):
+        return "{}: {}".format(type(value).__name__, value)
+    if isinstance(value, float) and _math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return _collections.OrderedDict(
+            ("{}".format(key), _jsonable(item)) for (key, item) in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+class JSONLWriter(object):
+    """
+    Writes records to `stream` as JSONL, flushing after each of them so that
+    the output can be consumed while the command is still running.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        # type: (_typing.Mapping) -> None
+        self.stream.write(_json.dumps(_jsonable(record)))
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+def _report_record(report, fields):
+    # type: (_typing.Any, _typing.Iterable[str]) -> _typing.Dict[str, _typing.Any]
+    record = _collections.OrderedDict((name, getattr(report, name)) for name in fields)
+    record["ok"] = bool(report)
+    return record
+
+
+###############################################################################
+# COMMANDS
+###############################################################################
+
+def cmd_courses(args, out):
+    # type: (_argparse.Namespace, JSONLWriter) -> bool
+    for course in oneupsdk.integration.get_instructor_courses():
+        out.write(course._asdict())
+    return True
+
+
+def cmd_roster(args, out):
+    # type: (_argparse.Namespace, JSONLWriter) -> bool
+
+    # Students are written as the student list is downloaded
+    for student in oneupsdk.integration.iter_enrolled_students():
+        out.write(dict(student))
+    return True
+
+
+def cmd_gradebook(args, out):
+    # type: (_argparse.Namespace, JSONLWriter) -> bool
+    gradebook = oneupsdk.integration.export.get_gradebook(
+        activity_ids=args.activities, max_workers=args.workers)
+
+    table = gradebook.to_table()
+    names = list(table.columns.keys())
+    for row in zip(*table.columns.values()):
+        out.write(_collections.OrderedDict(zip(names, row)))
+
+    for (activity_id, error) in sorted(gradebook.errors.items()):
+        out.write(_collections.OrderedDict([
+            ("activity_id", activity_id),
+            ("error", error),
+        ]))
+
+    return len(gradebook.errors) == 0
+
+
+def cmd_post_points(args, out):
+    # type: (_argparse.Namespace, JSONLWriter) -> bool
+
+    # Records are grouped by activity, either given by their `activity_id`
+    # or by the --activity option
+    data = _collections.OrderedDict()  # type: _typing.Dict[int, _typing.List[dict]]
+    for record in read_records(args.file, input_format=args.format):
+        record = _collections.OrderedDict(record)
+        activity_id = record.pop("activity_id", None)
+        if activity_id is None:
+            activity_id = args.activity
+        if activity_id is None:
+            raise ValueError("{}: record without an `activity_id` (and no --activity): {}".format(
+                args.file, _json.dumps(record)))
+        data.setdefault(int(activity_id), []).append(record)
+
+    reports = oneupsdk.integration.post_points_batch(
+        data=data, max_workers=args.workers, dry_run=args.dry_run)
+
+    ok = True
+    for activity_id in data:
+        report = reports[activity_id]
+        out.write(_report_record(report, ["activity_id", "submitted", "changes", "unresolved", "error"]))
+        ok = ok and bool(report)
+
+    return ok
+
+
+def cmd_sync_students(args, out):
+    # type: (_argparse.Namespace, JSONLWriter) -> bool
+    report = oneupsdk.integration.sync_students(
+        records=read_records(args.file, input_format=args.format),
+        default_password=args.default_password,
+        delete_missing=args.delete_missing,
+        dry_run=args.dry_run,
+        max_workers=args.workers)
+
+    out.write(_report_record(report, ["added", "modified", "deleted", "unchanged", "failed", "dry_run"]))
+    return bool(report)
+
+
+def cmd_sync_activities(args, out):
+    # type: (_argparse.Namespace, JSONLWriter) -> bool
+    report = oneupsdk.integration.sync_activities(
+        spec=read_spec(args.file),
+        delete_missing=args.delete_missing,
+        dry_run=args.dry_run,
+        max_workers=args.workers)
+
+    out.write(_report_record(report, [
+        "categories_added", "added", "modified", "deleted", "unchanged", "failed", "categories_failed",
+        "dry_run"]))
+    return bool(report)
+
+
+###############################################################################
+# COMMAND LINE
+###############################################################################
+
+def _add_input_arguments(parser, help):
+    # type: (_argparse.ArgumentParser, str) -> None
+    parser.add_argument("file", help=help)
+    parser.add_argument(
+        "--format", choices=INPUT_FORMATS, default=None,
+        help="format of the input (default: csv for .csv files, jsonl otherwise)")
+
+
+def _add_global_arguments(parser, defaults):
+    # type: (_argparse.ArgumentParser, bool) -> None
+
+    # The options are accepted both before and after the command: those of
+    # the commands are only set when given, so as not to override the others
+    default = (lambda value: value) if defaults else (lambda value: _argparse.SUPPRESS)
+
+    parser.add_argument(
+        "--course", type=int, default=default(None), metavar="COURSE_ID",
+        help="course to operate on (required by every command but `courses`)")
+    parser.add_argument(
+        "--workers", type=int, default=default(None), metavar="N",
+        help="number of concurrent requests of batch operations (default: 8)")
+    parser.add_argument(
+        "--session-file", default=default(None), metavar="PATH",
+        help="file in which the authenticated session is kept across runs "
+             "(default: `session_file` of the configuration file, if any)")
+    parser.add_argument(
+        "--output", "-o", default=default("-"), metavar="PATH",
+        help="JSONL file to write the output to (default: the standard output)")
+
+
+def make_parser():
+    # type: () -> _argparse.ArgumentParser
+    parser = _argparse.ArgumentParser(
+        prog=PROG,
+        description="Operate on the OneUp Learning platform from the command line. "
+                    "Credentials are read from the oneupsdk configuration file; "
+                    "output is written as JSONL.")
+    parser.add_argument(
+        "--version", action="version", version="%(prog)s {}".format(oneupsdk.__version__))
+    _add_global_arguments(parser, defaults=True)
+
+    options = _argparse.ArgumentParser(add_help=False)
+    _add_global_arguments(options, defaults=False)
+
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    command = commands.add_parser(
+        "courses", parents=[options],
+        help="list the courses of the instructor")
+    command.set_defaults(func=cmd_courses)
+
+    command = commands.add_parser(
+        "roster", parents=[options],
+        help="dump the students enrolled in the course")
+    command.set_defaults(func=cmd_roster)
+
+    command = commands.add_parser(
+        "gradebook", parents=[options],
+        help="export the points and feedback of the students, one line per student and activity")
+    command.add_argument(
+        "--activity", dest="activities", type=int, action="append", metavar="ACTIVITY_ID",
+        help="activity to export, can be repeated (default: all)")
+    command.set_defaults(func=cmd_gradebook)
+
+    command = commands.add_parser(
+        "post-points", parents=[options],
+        help="assign points and feedback from a batch file")
+    _add_input_arguments(
+        command,
+        help="CSV or JSONL file (- for the standard input) of records with a `username`, "
+             "`email` or `id`, `points` and/or `feedback`, and an `activity_id`")
+    command.add_argument(
+        "--activity", type=int, default=None, metavar="ACTIVITY_ID",
+        help="activity of the records that have no `activity_id`")
+    command.add_argument(
+        "--dry-run", action="store_true", help="report the changes without submitting them")
+    command.set_defaults(func=cmd_post_points)
+
+    command = commands.add_parser(
+        "sync-students", parents=[options],
+        help="reconcile the roster with a batch file")
+    _add_input_arguments(
+        command,
+        help="CSV or JSONL file (- for the standard input) of records with a `username`, "
+             "`email`, `first`, `last` and optionally `password`")
+    command.add_argument(
+        "--default-password", default=None,
+        help="password of the added students that have none")
+    command.add_argument(
+        "--delete-missing", action="store_true",
+        help="delete the students that are not in the file")
+    command.add_argument(
+        "--dry-run", action="store_true", help="report the operations without performing them")
+    command.set_defaults(func=cmd_sync_students)
+
+    command = commands.add_parser(
+        "sync-activities", parents=[options],
+        help="apply a course structure specification")
+    command.add_argument(
+        "file", help="YAML (or JSON) file (- for the standard input) with the "
+                     "`categories` and `activities` of the course")
+    command.add_argument(
+        "--delete-missing", action="store_true",
+        help="delete the activities that are not in the specification")
+    command.add_argument(
+        "--dry-run", action="store_true", help="report the operations without performing them")
+    command.set_defaults(func=cmd_sync_activities)
+
+    return parser
+
+
+def main(argv=None):
+    # type: (_typing.Optional[_typing.List[str]]) -> int
+    """
+    Runs the `oneup` command, and returns its exit status: 0 if it succeeded,
+    1 if it failed or if any of the operations of a batch failed.
+    """
+    parser = make_parser()
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.course is None and args.func is not cmd_courses:
+        parser.error("--course is required by the {} command".format(args.command))
+
+    try:
+        if args.session_file is not None:
+            client = oneupsdk.integration.client.OneUpClient(
+                session_store=oneupsdk.integration.sessions.FileSessionStore(args.session_file))
+        else:
+            client = oneupsdk.integration.api.get_default_client()
+
+        # The command runs in a session of its own course, rather than
+        # switching the course of a session that other processes may share
+        if args.course is not None:
+            client = client.for_course(args.course)
+
+        oneupsdk.integration.api.set_default_client(client)
+
+        if args.output == "-":
+            return 0 if args.func(args, JSONLWriter(_sys.stdout)) else 1
+
+        with open(args.output, "w") as f:
+            return 0 if args.func(args, JSONLWriter(f)) else 1
+
+    except KeyboardInterrupt:
+        return 130
+
+    except BrokenPipeError:
+        # The reader of the output went away (as in `oneup roster | head`):
+        # discard what is left to write instead of failing again on exit
+        _os.dup2(_os.open(_os.devnull, _os.O_WRONLY), _sys.stdout.fileno())
+        return 1
+
+    except (oneupsdk.OneUpSDKConfigurationException,
+            oneupsdk.integration.exceptions.OneUpAPIException,
+            EnvironmentError, ValueError) as exc:
+        print("{}: error: {}".format(PROG, exc), file=_sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    _sys.exit(main())
@@ -1,19 +1,73 @@
 
 from __future__ import absolute_import
 
+import importlib as _importlib
+import importlib.util as _importlib_util
+import threading as _threading
+import types as _types
+
 import oneupsdk
 
 SECTION_NAME = "oneup"
 
-config = oneupsdk.get_local_config(
-    section=SECTION_NAME,
-    template={
-        SECTION_NAME: {
-            "username": str,
-            "password": str,
-        },
-    })
+_CONFIG_TEMPLATE = {
+    SECTION_NAME: {
+        "username": str,
+        "password": str,
+        "parser": str,
+        "session_file": str,
+    },
+}
+
+# The configuration, the top-level methods and the client class are resolved
+# on first access (see `__getattr__`): this keeps `import oneupsdk.integration`
+# from importing requests and bs4, or reading the configuration file, until a
+# macro is actually used
+
+_lazy_lock = _threading.RLock()
+
+
+def _public_macros():
+    macros = _importlib.import_module("oneupsdk.integration.macros")
+
+    return [
+        name for name, value in vars(macros).items()
+        if not name.startswith("_") and not isinstance(value, _types.ModuleType)
+    ]
+
+
+def __getattr__(name):
+    if name.startswith("__") and name != "__all__":
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    with _lazy_lock:
+        if name in globals():
+            return globals()[name]
+
+        if name == "config":
+            value = oneupsdk.get_local_config(
+                section=SECTION_NAME,
+                template=_CONFIG_TEMPLATE,
+            )
+
+        elif name == "__all__":
+            value = _public_macros() + ["OneUpClient"]
+
+        elif name == "OneUpClient":
+            value = _importlib.import_module("oneupsdk.integration.client").OneUpClient
+
+        elif _importlib_util.find_spec("{}.{}".format(__name__, name)) is not None:
+            value = _importlib.import_module("{}.{}".format(__name__, name))
+
+        elif name in _public_macros():
+            value = getattr(_importlib.import_module("oneupsdk.integration.macros"), name)
+
+        else:
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+        globals()[name] = value
+        return value
 
 
-# Import top-level methods
-from oneupsdk.integration.macros import *
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__("__all__")) | {"config"})
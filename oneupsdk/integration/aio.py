@@ -0,0 +1,159 @@
+from __future__ import absolute_import
+
+import asyncio as _asyncio
+import concurrent.futures as _futures
+import functools as _functools
+import threading as _threading
+import typing as _typing
+import weakref as _weakref
+
+import oneupsdk.integration.client
+import oneupsdk.integration.transport
+import oneupsdk.integration.util
+
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+ASYNC_MACROS = [
+    # Requests
+    "request",
+    "get_csrf_token",
+
+    # Courses
+    "get_instructor_courses",
+    "set_active_course",
+    "get_active_course",
+
+    # Students
+    "get_enrolled_students",
+    "get_roster",
+    "invalidate_roster",
+    "get_student_by_username",
+    "get_student_by_id",
+    "add_student",
+    "delete_student",
+    "modify_student",
+    "sync_students",
+
+    # Activities
+    "get_activities_page",
+    "invalidate_activities_page",
+    "get_default_activity_category",
+    "get_activity_categories",
+    "create_activity_category",
+    "get_activities",
+    "get_activity_by_id",
+    "delete_activity_category",
+    "create_activity",
+    "modify_activity",
+    "get_assigned_points",
+    "post_activity_points",
+    "post_points_batch",
+    "sync_activities",
+    "delete_activity",
+]
+
+
+class AsyncOneUpClient(object):
+    """
+    Asyncio variant of `OneUpClient`: every macro of the synchronous client is
+    available as a coroutine method of the same name.
+
+    Calls are run in a pool of worker threads sharing the connection pool of a
+    single `OneUpClient`, so that neither the network round trips nor the HTML
+    parsing block the event loop. At most `max_concurrency` calls are in
+    flight at any time; additional calls wait for a slot. If no `client` is
+    provided, one is created (with the remaining keyword arguments) whose
+    connection pool is sized to match.
+    """
+
+    def __init__(self, client=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, **kwargs):
+        # type: (_typing.Optional[oneupsdk.integration.client.OneUpClient], int, _typing.Any) -> None
+
+        if client is None:
+            kwargs.setdefault("transport", oneupsdk.integration.transport.Transport(
+                pool_maxsize=max(max_concurrency, oneupsdk.integration.transport.DEFAULT_POOL_MAXSIZE)))
+            client = oneupsdk.integration.client.OneUpClient(**kwargs)
+
+        self.client = client
+        self.max_concurrency = max_concurrency
+
+        self._executor = _futures.ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphores = _weakref.WeakKeyDictionary()  # type: _weakref.WeakKeyDictionary
+        self._semaphores_lock = _threading.Lock()
+
+    def _semaphore(self, loop):
+        # type: (_asyncio.AbstractEventLoop) -> _asyncio.Semaphore
+
+        # A semaphore can only be awaited from the loop it was first used in,
+        # so each loop using the client (e.g. successive `asyncio.run` calls,
+        # or loops in other threads) gets its own
+        with self._semaphores_lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = _asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+
+    async def _run(self, func, *args, **kwargs):
+        loop = _asyncio.get_running_loop()
+
+        async with self._semaphore(loop):
+            return await loop.run_in_executor(
+                self._executor,
+                _functools.partial(func, *args, **kwargs))
+
+    async def _fan_out(self, func, items):
+        async def run_one(item):
+            try:
+                value = await self._run(func, item)
+            except Exception as exc:
+                return oneupsdk.integration.util.BulkResult(key=item, value=None, error=exc)
+            return oneupsdk.integration.util.BulkResult(key=item, value=value, error=None)
+
+        for future in _asyncio.as_completed([run_one(item) for item in items]):
+            yield await future
+
+    def get_students_by_usernames(self, usernames):
+        # type: (_typing.Iterable[str]) -> _typing.AsyncIterator[oneupsdk.integration.util.BulkResult]
+        """
+        Fetches the students with the provided usernames concurrently, and yields
+        a `BulkResult(key=username, value=student, error=exception)` for each
+        of them as soon as it is available.
+        """
+        return self._fan_out(self.client.get_student_by_username, usernames)
+
+    def get_activities_by_ids(self, activity_ids):
+        # type: (_typing.Iterable[int]) -> _typing.AsyncIterator[oneupsdk.integration.util.BulkResult]
+        """
+        Fetches the activities with the provided activity IDs concurrently, and
+        yields a `BulkResult(key=activity_id, value=activity, error=exception)`
+        for each of them as soon as it is available.
+        """
+        return self._fan_out(self.client.get_activity_by_id, activity_ids)
+
+    def close(self):
+        # type: () -> None
+        """
+        Shut down the worker threads (the underlying client stays usable).
+        """
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _make_async_macro(name):
+    method = getattr(oneupsdk.integration.client.OneUpClient, name)
+
+    @_functools.wraps(method)
+    async def async_macro(self, *args, **kwargs):
+        return await self._run(getattr(self.client, name), *args, **kwargs)
+
+    return async_macro
+
+
+for _name in ASYNC_MACROS:
+    setattr(AsyncOneUpClient, _name, _make_async_macro(_name))
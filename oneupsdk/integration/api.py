@@ -1,124 +1,100 @@
-
 from __future__ import absolute_import
 
-import json as _json
 import typing as _typing
 
-import bs4 as _bs4
 import requests as _requests
 import six as _six
 
 import oneupsdk.integration
-import oneupsdk.integration.exceptions
+import oneupsdk.integration.client
+import oneupsdk.integration.sessions
+import oneupsdk.integration.transport
 
 
 BASE_URL = "https://oneup.wssu.edu"
 LOGIN_URL = _six.moves.urllib.parse.urljoin(BASE_URL, "login")
 
 
-_override_username = None
-_override_password = None
+_default_client = None
+
+
+def get_default_client():
+    # type: () -> oneupsdk.integration.client.OneUpClient
+    """
+    Return the client that the module-level macros operate on, creating it on
+    first use.
+    """
+    global _default_client
+
+    if _default_client is None:
+        # Sessions are shared across processes if a session file is configured
+        session_store = None
+        session_file = oneupsdk.integration.config.get("session_file")
+        if session_file:
+            session_store = oneupsdk.integration.sessions.FileSessionStore(session_file)
+
+        _default_client = oneupsdk.integration.client.OneUpClient(session_store=session_store)
+
+    return _default_client
+
+
+def set_default_client(client):
+    # type: (oneupsdk.integration.client.OneUpClient) -> None
+    """
+    Replace the client that the module-level macros operate on.
+    """
+    global _default_client
+
+    _default_client = client
 
-last_cookies = None
+
+def __getattr__(name):
+    # Backwards compatibility: the cookies of the last login used to be stored
+    # in a module-level variable, they are now owned by the default client
+    if name == "last_cookies":
+        return get_default_client().cookies
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def get_transport():
+    # type: () -> oneupsdk.integration.transport.Transport
+    """
+    Return the transport shared by all macros.
+    """
+    return get_default_client().transport
+
+
+def set_transport(transport):
+    # type: (_typing.Any) -> None
+    """
+    Replace the transport shared by all macros, for instance to change the
+    connection pool size or to substitute a local stand-in during tests.
+    Authentication cookies obtained through the previous transport are dropped.
+    """
+    client = get_default_client()
+    client.transport = transport
+    client.cookies = None
 
 
 def configure_auth(username=None, password=None):
     """
     Override the configuration file sourced authentication information.
     """
-    _override_username = username
-    _override_password = password
+    get_default_client().configure_auth(username=username, password=password)
 
 
 def get_auth_cookies(username=None, password=None, **kwargs):
     # type: (_typing.Optional[str], _typing.Optional[str], _typing.Dict) -> _typing.Optional[dict]
-    global last_cookies
-
-    session = _requests.sessions.session()
-
-    # Step 1: Get a CSRF token and start the OneUp session
-
-    try:
-        response = session.get(LOGIN_URL)
-    except _requests.RequestException:
-        response = None
-
-    if response is None or not response.ok:
-        return
-
-    soup = _bs4.BeautifulSoup(response.content, features="html.parser")
-    csrf_token = soup.find("input", {"name": "csrfmiddlewaretoken"}).get("value")
-
-    # Step 2: Login with credentials and get signed token
-
-    url = LOGIN_URL
-
-    try:
-        response = session.post(
-            url=url,
-            allow_redirects=False,
-            headers={
-                # Cache liveness stuff
-                "Connection": "keep-alive",
-                "Pragma": "no-cache",
-                "Cache-Control": "no-cache",
-
-                # Format stuff
-                "Accept": "text/html,application/xhtml+xml,application/xml",
-                "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
-
-                # CSRF security stuff
-                "Cookie": "csrftoken={}".format(csrf_token),
-                "Referer": LOGIN_URL,
-                "Origin": BASE_URL,
-                "Upgrade-Insecure-Requests": "1",
-                "Sec-Fetch-Mode": "navigate",
-                "Sec-Fetch-User": "?1",
-                "Sec-Fetch-Site": "same-origin",
-
-                "User-Agent": ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_14_6) "
-                               "AppleWebKit/537.36 (KHTML, like Gecko) "
-                               "Chrome/77.0.3865.120 Safari/537.36"),
-            },
-            data={
-                "csrfmiddlewaretoken": csrf_token,
-                "next": "/oneUp/courses",
-                "username": username or _override_username or oneupsdk.integration.config["username"],
-                "password": password or _override_password or oneupsdk.integration.config["password"],
-                "login": "Login",
-            },
-        )
-    except _requests.RequestException:
-        return
-
-    # Step 3: Inspect cookies to make sure we are logged in
-    if response.status_code in [200, 302]:
-        cookies = response.cookies
-        cookies_string = "; ".join(
-            list(map(lambda cookie: "{name}={value}".format(
-                name=cookie.name, value=cookie.value),
-                     cookies)))
-
-        if "sessionid" in cookies and "csrftoken" in cookies:
-            data = {
-                "sessionid": cookies["sessionid"],
-                "csrftoken": cookies["csrftoken"],
-                "cookies": cookies,
-                "cookies_string": cookies_string
-            }
-            last_cookies = data
-            return data
+    return get_default_client().get_auth_cookies(
+        username=username, password=password, **kwargs)
 
 
 def get_csrf_token(**kwargs):
     """
     Return the CSRF token for the active session.
     """
-    if last_cookies is None:
-        get_auth_cookies(**kwargs)
-
-    if last_cookies is not None:
-        return last_cookies.get("csrftoken")
+    return get_default_client().get_csrf_token(**kwargs)
 
 
 def request(endpoint=None, url=None, data=None, json=None, **kwargs):
@@ -126,71 +102,5 @@ def request(endpoint=None, url=None, data=None, json=None, **kwargs):
     """
     Make a request directly to the Ed platform's API.
     """
-
-    if last_cookies is None:
-        get_auth_cookies(**kwargs)
-
-    # If only endpoint was passed, augment with base URL
-    if endpoint is not None:
-        url = _six.moves.urllib.parse.urljoin(
-            base=BASE_URL,
-            url=endpoint,
-        )
-
-    headers = {
-        # Cache liveness stuff
-        "Connection": "keep-alive",
-        "Pragma": "no-cache",
-        "Cache-Control": "no-cache",
-
-        # Format stuff
-        "Accept": "text/html,application/xhtml+xml,application/xml",
-        "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
-
-        # Authentication
-        "Cookie": last_cookies.get("cookies_string"),
-
-        # CSRF security stuff
-        "Referer": LOGIN_URL,
-        "Origin": BASE_URL,
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-User": "?1",
-        "Sec-Fetch-Site": "same-origin",
-
-        "User-Agent": ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_14_6) "
-                       "AppleWebKit/537.36 (KHTML, like Gecko) "
-                       "Chrome/77.0.3865.120 Safari/537.36"),
-    }
-
-    try:
-
-        if data is None and json is None:
-            res = _requests.get(
-                url=url,
-                headers=headers,
-            )
-
-        elif json is not None:
-            res = _requests.post(
-                url=url,
-                headers=headers,
-                json=json,
-            )
-
-        else:
-            res = _requests.post(
-                url=url,
-                headers=headers,
-                data=data,
-            )
-
-        if res.status_code == 301 and url[-1] != "/":
-            return request(url="{}/".format(url))
-
-    except _requests.RequestException as exc:
-        raise
-
-    oneupsdk.integration.exceptions.handle_api_error(res)
-
-    return res
+    return get_default_client().request(
+        endpoint=endpoint, url=url, data=data, json=json, **kwargs)
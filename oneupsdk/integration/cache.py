@@ -0,0 +1,420 @@
+from __future__ import absolute_import
+
+import base64 as _base64
+import collections as _collections
+import hashlib as _hashlib
+import json as _json
+import os as _os
+import tempfile as _tempfile
+import threading as _threading
+import time as _time
+import typing as _typing
+
+import requests as _requests
+import requests.structures as _requests_structures
+import six as _six
+
+import oneupsdk.integration.records
+
+
+DEFAULT_TTL = 300  # seconds
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class RosterIndex(object):
+    """
+    Index of the students enrolled in a course, which maps their ID, username
+    and email to their roster record (a `Student`, built from the records
+    returned by `get_enrolled_students`).
+
+    The index expires `ttl` seconds after it was built (never, if `ttl` is
+    `None`), and can be kept up to date as students are added, modified or
+    removed, rather than re-downloaded.
+    """
+
+    def __init__(self, students, ttl=DEFAULT_TTL):
+        # type: (_typing.Iterable[dict], _typing.Optional[float]) -> None
+
+        self.ttl = ttl
+        self.created_at = _time.time()
+
+        self.by_id = dict()  # type: _typing.Dict[int, oneupsdk.integration.records.Student]
+        self.by_username = dict()  # type: _typing.Dict[str, oneupsdk.integration.records.Student]
+        self.by_email = dict()  # type: _typing.Dict[str, oneupsdk.integration.records.Student]
+
+        self._lock = _threading.RLock()
+
+        for student in students:
+            self.add(student)
+
+    @property
+    def expired(self):
+        # type: () -> bool
+        return self.ttl is not None and _time.time() - self.created_at > self.ttl
+
+    @property
+    def students(self):
+        # type: () -> _typing.List[oneupsdk.integration.records.Student]
+        with self._lock:
+            return list(self.by_id.values())
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def get(self, id=None, username=None, email=None):
+        # type: (_typing.Optional[int], _typing.Optional[str], _typing.Optional[str]) -> _typing.Optional[oneupsdk.integration.records.Student]
+        """
+        Returns the record of the student with the provided ID, username or
+        email (tried in that order), if such a student is in the roster.
+        """
+        with self._lock:
+            if id is not None and id in self.by_id:
+                return self.by_id[id]
+            if username is not None and username in self.by_username:
+                return self.by_username[username]
+            if email is not None and email in self.by_email:
+                return self.by_email[email]
+
+    def add(self, student):
+        # type: (_typing.Mapping) -> None
+        student = oneupsdk.integration.records.Student.from_dict(student)
+
+        with self._lock:
+            self.by_id[student.get("id")] = student
+            self.by_username[student.get("username")] = student
+            self.by_email[student.get("email")] = student
+
+    def remove(self, username):
+        # type: (str) -> _typing.Optional[oneupsdk.integration.records.Student]
+        with self._lock:
+            student = self.by_username.pop(username, None)
+            if student is None:
+                return
+
+            self.by_id.pop(student.get("id"), None)
+            self.by_email.pop(student.get("email"), None)
+            return student
+
+    def update(self, username, changes):
+        # type: (str, dict) -> _typing.Optional[oneupsdk.integration.records.Student]
+        with self._lock:
+            student = self.remove(username)
+            if student is None:
+                return
+
+            student = student.replace(**changes)
+            self.add(student)
+            return student
+
+
+class ActivitiesPage(object):
+    """
+    Snapshot of the activities page of a course (`activitiesList`), which lists
+    both the activities and the activity categories of the course, so that the
+    page only needs to be downloaded and parsed once for both.
+
+    The snapshot expires `ttl` seconds after it was taken (never, if `ttl` is
+    `None`). Its list of activities can be flagged as stale on its own, since
+    changes to the activities do not affect the categories.
+    """
+
+    def __init__(self, activities, categories, default_category_name, ttl=DEFAULT_TTL):
+        # type: (_typing.Iterable[_typing.Mapping], _typing.Iterable[_typing.Mapping], str, _typing.Optional[float]) -> None
+
+        self.ttl = ttl
+        self.created_at = _time.time()
+
+        self.activities = list(map(
+            oneupsdk.integration.records.Activity.from_dict,
+            activities))  # type: _typing.List[oneupsdk.integration.records.Activity]
+        self.categories = list(map(
+            oneupsdk.integration.records.ActivityCategory.from_dict,
+            categories))  # type: _typing.List[oneupsdk.integration.records.ActivityCategory]
+        self.default_category_name = default_category_name
+
+        self.activities_stale = False
+
+    @property
+    def expired(self):
+        # type: () -> bool
+        return self.ttl is not None and _time.time() - self.created_at > self.ttl
+
+    @property
+    def default_category(self):
+        # type: () -> _typing.Optional[oneupsdk.integration.records.ActivityCategory]
+
+        # Filter by name, then sort and take smallest ID
+        default = sorted(
+            filter(lambda c: c.get("name") == self.default_category_name, self.categories),
+            key=lambda c: c.get("id"))
+
+        if len(default) > 0:
+            return default[0]
+
+
+class CachedResponse(object):
+    """
+    A response to a GET request as stored in a `ResponseCache`, along with the
+    validators (`ETag`, `Last-Modified`) with which it can be revalidated.
+    """
+
+    __slots__ = ("url", "status_code", "headers", "content", "encoding", "stored_at")
+
+    def __init__(self, url, status_code, headers, content, encoding=None, stored_at=None):
+        # type: (str, int, dict, bytes, _typing.Optional[str], _typing.Optional[float]) -> None
+        self.url = url
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.content = content
+        self.encoding = encoding
+        self.stored_at = _time.time() if stored_at is None else stored_at
+
+    @classmethod
+    def from_response(cls, response):
+        # type: (_requests.Response) -> CachedResponse
+        return cls(
+            url=response.url,
+            status_code=response.status_code,
+            headers=response.headers,
+            content=response.content,
+            encoding=response.encoding)
+
+    @property
+    def etag(self):
+        # type: () -> _typing.Optional[str]
+        return _requests_structures.CaseInsensitiveDict(self.headers).get("ETag")
+
+    @property
+    def last_modified(self):
+        # type: () -> _typing.Optional[str]
+        return _requests_structures.CaseInsensitiveDict(self.headers).get("Last-Modified")
+
+    def to_response(self):
+        # type: () -> _requests.Response
+        response = _requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = _requests_structures.CaseInsensitiveDict(self.headers)
+        response.encoding = self.encoding
+        response._content = self.content
+        return response
+
+    def to_json(self):
+        # type: () -> dict
+        return {
+            "url": self.url,
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "content": _base64.b64encode(self.content).decode("ascii"),
+            "encoding": self.encoding,
+            "stored_at": self.stored_at,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        # type: (dict) -> CachedResponse
+        return cls(
+            url=data["url"],
+            status_code=data["status_code"],
+            headers=data["headers"],
+            content=_base64.b64decode(data["content"]),
+            encoding=data.get("encoding"),
+            stored_at=data["stored_at"])
+
+
+class MemoryCacheBackend(object):
+    """
+    In-memory storage for a `ResponseCache`, which evicts the least recently
+    used entry beyond `max_entries` entries.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        # type: (int) -> None
+        self.max_entries = max_entries
+
+        self._entries = _collections.OrderedDict()  # type: _collections.OrderedDict
+        self._lock = _threading.Lock()
+
+    def get(self, key):
+        # type: (tuple) -> _typing.Optional[CachedResponse]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        # type: (tuple, CachedResponse) -> None
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_matching(self, predicate):
+        # type: (_typing.Callable[[tuple], bool]) -> None
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        # type: () -> None
+        with self._lock:
+            self._entries.clear()
+
+
+class FileCacheBackend(object):
+    """
+    On-disk storage for a `ResponseCache`, with one JSON file per entry in
+    `directory`, which evicts the least recently used entry beyond
+    `max_entries` entries. It can be shared between processes.
+    """
+
+    def __init__(self, directory, max_entries=DEFAULT_MAX_ENTRIES):
+        # type: (str, int) -> None
+        self.directory = _os.path.expanduser(directory)
+        self.max_entries = max_entries
+
+        if not _os.path.isdir(self.directory):
+            _os.makedirs(self.directory)
+
+    def _path(self, key):
+        # type: (tuple) -> str
+        digest = _hashlib.sha1(_json.dumps(list(key)).encode("utf-8")).hexdigest()
+        return _os.path.join(self.directory, digest + ".json")
+
+    def _paths(self):
+        # type: () -> _typing.List[str]
+        return [
+            _os.path.join(self.directory, name)
+            for name in _os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+
+    @staticmethod
+    def _load(path):
+        # type: (str) -> _typing.Optional[dict]
+        try:
+            with open(path) as f:
+                return _json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+
+    def get(self, key):
+        # type: (tuple) -> _typing.Optional[CachedResponse]
+        path = self._path(key)
+
+        data = self._load(path)
+        if data is None or tuple(data.get("key")) != tuple(key):
+            return
+
+        # The modification time of the files tracks their last use
+        try:
+            _os.utime(path, None)
+        except OSError:
+            pass
+
+        return CachedResponse.from_json(data["entry"])
+
+    def set(self, key, entry):
+        # type: (tuple, CachedResponse) -> None
+
+        # Write atomically, so that concurrent readers never see partial files
+        (fd, tmp_path) = _tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with _os.fdopen(fd, "w") as f:
+            _json.dump({"key": list(key), "entry": entry.to_json()}, f)
+        _os.replace(tmp_path, self._path(key))
+
+        paths = self._paths()
+        if len(paths) > self.max_entries:
+            paths.sort(key=lambda path: _os.path.getmtime(path))
+            for path in paths[:len(paths) - self.max_entries]:
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        # type: (str) -> None
+        try:
+            _os.remove(path)
+        except OSError:
+            pass
+
+    def delete_matching(self, predicate):
+        # type: (_typing.Callable[[tuple], bool]) -> None
+        for path in self._paths():
+            data = self._load(path)
+            if data is not None and predicate(tuple(data.get("key"))):
+                self._remove(path)
+
+    def clear(self):
+        # type: () -> None
+        for path in self._paths():
+            self._remove(path)
+
+
+class ResponseCache(object):
+    """
+    Cache of the responses to GET requests for read-only OneUp pages, keyed by
+    account, active course and URL. Entries are fresh for `ttl` seconds; past
+    that, they are revalidated with the server (with `If-None-Match` and
+    `If-Modified-Since`) when the server provided validators, and dropped
+    otherwise. Entries are kept in memory unless another backend (such as a
+    `FileCacheBackend`) is provided. The client revalidates the forms that it
+    reads right before a write even while they are fresh.
+    """
+
+    def __init__(self, backend=None, ttl=DEFAULT_TTL):
+        # type: (_typing.Optional[_typing.Any], _typing.Optional[float]) -> None
+        self.backend = backend or MemoryCacheBackend()
+        self.ttl = ttl
+
+    def is_fresh(self, entry):
+        # type: (CachedResponse) -> bool
+        return self.ttl is None or _time.time() - entry.stored_at <= self.ttl
+
+    def get(self, key):
+        # type: (tuple) -> _typing.Optional[CachedResponse]
+        """
+        Returns the entry stored for the key, fresh or not.
+        """
+        return self.backend.get(key)
+
+    def store(self, key, response):
+        # type: (tuple, _requests.Response) -> CachedResponse
+        entry = CachedResponse.from_response(response)
+        self.backend.set(key, entry)
+        return entry
+
+    def refresh(self, key, entry):
+        # type: (tuple, CachedResponse) -> None
+        """
+        Marks an entry as fresh again, after the server confirmed it is valid.
+        """
+        entry.stored_at = _time.time()
+        self.backend.set(key, entry)
+
+    def invalidate(self, account, course_id, paths=None):
+        # type: (str, _typing.Optional[int], _typing.Optional[_typing.Iterable[str]]) -> None
+        """
+        Discards the entries of an account and course whose URL path is one of
+        `paths` (regardless of the query string), or all of them if `paths` is
+        `None`.
+        """
+        paths = None if paths is None else tuple(paths)
+
+        def predicate(key):
+            (key_account, key_course_id, key_url) = key
+            if key_account != account or key_course_id != course_id:
+                return False
+            if paths is None:
+                return True
+            key_path = _six.moves.urllib.parse.urlparse(key_url).path.rstrip("/")
+            return key_path in paths
+
+        self.backend.delete_matching(predicate)
+
+    def clear(self):
+        # type: () -> None
+        self.backend.clear()
@@ -0,0 +1,2429 @@
+from __future__ import absolute_import
+
+import codecs as _codecs
+import itertools as _itertools
+import re as _re
+import threading as _threading
+import typing as _typing
+
+import bs4 as _bs4
+import requests as _requests
+import six as _six
+
+import oneupsdk.integration
+import oneupsdk.integration.api
+import oneupsdk.integration.cache
+import oneupsdk.integration.exceptions
+import oneupsdk.integration.instrumentation
+import oneupsdk.integration.macros
+import oneupsdk.integration.parsing
+import oneupsdk.integration.records
+import oneupsdk.integration.sessions
+import oneupsdk.integration.transport
+import oneupsdk.integration.util
+
+from oneupsdk.integration.cache import DEFAULT_TTL as _DEFAULT_CACHE_TTL
+from oneupsdk.integration.instrumentation import instrumented as _instrumented
+
+
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Read-only pages whose responses can be kept in a response cache
+CACHEABLE_PATHS = [
+    "/oneUp/instructors/instructorHome",
+    "/oneUp/instructors/instructorCourseHome",
+    "/oneUp/instructors/createStudentList",
+    "/oneUp/instructors/createStudentView",
+    "/oneUp/instructors/activitiesList",
+    "/oneUp/instructors/createActivity",
+    "/oneUp/instructors/activityAssignPointsForm",
+]
+
+# Pages affected by each mutating endpoint (unknown endpoints affect all pages)
+CACHE_INVALIDATIONS = {
+    "/oneUp/setCourse": [
+        "/oneUp/instructors/instructorCourseHome",
+    ],
+    "/oneUp/instructors/createStudentView": [
+        "/oneUp/instructors/createStudentList",
+        "/oneUp/instructors/createStudentView",
+        "/oneUp/instructors/activityAssignPointsForm",
+    ],
+    "/oneUp/instructors/deleteStudent": [
+        "/oneUp/instructors/createStudentList",
+        "/oneUp/instructors/createStudentView",
+        "/oneUp/instructors/activityAssignPointsForm",
+    ],
+    "/oneUp/instructors/createActivity": [
+        "/oneUp/instructors/activitiesList",
+        "/oneUp/instructors/createActivity",
+        "/oneUp/instructors/activityAssignPointsForm",
+    ],
+    "/oneUp/instructors/deleteActivity": [
+        "/oneUp/instructors/activitiesList",
+        "/oneUp/instructors/createActivity",
+        "/oneUp/instructors/activityAssignPointsForm",
+    ],
+    "/oneUp/instructors/activityCatsCreate": [
+        "/oneUp/instructors/activitiesList",
+        "/oneUp/instructors/createActivity",
+    ],
+    "/oneUp/instructors/activityCatsDelete": [
+        "/oneUp/instructors/activitiesList",
+        "/oneUp/instructors/createActivity",
+    ],
+    "/oneUp/instructors/activityAssignPoints": [
+        "/oneUp/instructors/activityAssignPointsForm",
+    ],
+}
+
+# Signs that a request was made with an expired session, besides a redirect to
+# the login page: an authentication error, or the login form in the page (a 403
+# is a CSRF or permission error, which logging in again would not fix)
+SESSION_EXPIRED_STATUS_CODES = [401]
+
+LOGIN_FORM_PATTERN = _re.compile(br"""<input[^>]+name\s*=\s*["']password["']""", _re.IGNORECASE)
+
+USER_AGENT = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_14_6) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/77.0.3865.120 Safari/537.36")
+
+
+class PointsReport(object):
+    """
+    Outcome of assigning the points of an activity: the `changes` made, as a
+    dictionary mapping each affected student ID to the `"points"` and/or
+    `"feedback"` that changed (as `(old, new)` pairs), whether the points
+    were `submitted` at all, and whether the operation was `ok`. The students
+    of the data that are not enrolled in the course (by email, username or
+    ID) are listed as `unresolved`, and make the operation fail.
+    """
+
+    __slots__ = ("activity_id", "changes", "submitted", "ok", "error", "unresolved")
+
+    def __init__(self, activity_id, changes, submitted, ok, error=None, unresolved=None):
+        # type: (int, _typing.Optional[dict], bool, bool, _typing.Optional[Exception], _typing.Optional[list]) -> None
+        self.activity_id = activity_id
+        self.changes = changes
+        self.submitted = submitted
+        self.ok = ok
+        self.error = error
+        self.unresolved = unresolved or []
+
+    def __bool__(self):
+        return self.ok
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return ("PointsReport(activity_id={!r}, changes={!r}, submitted={!r}, ok={!r}, error={!r}, "
+                "unresolved={!r})").format(
+            self.activity_id, self.changes, self.submitted, self.ok, self.error, self.unresolved)
+
+
+class RosterSyncReport(object):
+    """
+    Outcome of reconciling the roster of a course with a desired roster: the
+    usernames of the students `added`, `deleted` and left `unchanged`, the
+    changes made to the `modified` students (a dictionary mapping each
+    username to the fields that changed, as `(old, new)` pairs), and the
+    errors of the operations that `failed` (by username). With `dry_run`,
+    these are the planned operations, none of which was performed. The report
+    is truthy if no operation failed.
+    """
+
+    __slots__ = ("added", "modified", "deleted", "unchanged", "failed", "dry_run")
+
+    def __init__(self, added, modified, deleted, unchanged, failed, dry_run=False):
+        # type: (_typing.List[str], _typing.Dict[str, dict], _typing.List[str], _typing.List[str], _typing.Dict[str, Exception], bool) -> None
+        self.added = added
+        self.modified = modified
+        self.deleted = deleted
+        self.unchanged = unchanged
+        self.failed = failed
+        self.dry_run = dry_run
+
+    def __bool__(self):
+        return len(self.failed) == 0
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return ("RosterSyncReport(added={!r}, modified={!r}, deleted={!r}, unchanged={}, "
+                "failed={!r}, dry_run={!r})").format(
+            self.added, sorted(self.modified), self.deleted, len(self.unchanged),
+            self.failed, self.dry_run)
+
+
+class ActivitiesSyncReport(object):
+    """
+    Outcome of applying a course structure specification: the names of the
+    activity categories created (`categories_added`), of the activities
+    `added`, `deleted` and left `unchanged`, the changes made to the
+    `modified` activities (a dictionary mapping each name to the fields that
+    changed, as `(old, new)` pairs), and the errors of the operations on
+    activities that `failed` (by name) and of the categories that could not be
+    created (`categories_failed`, by name). With `dry_run`, these are the
+    planned operations, none of which was performed. The report is truthy if
+    no operation failed.
+    """
+
+    __slots__ = ("categories_added", "added", "modified", "deleted", "unchanged", "failed",
+                 "categories_failed", "dry_run")
+
+    def __init__(self, categories_added, added, modified, deleted, unchanged, failed,
+                 categories_failed=None, dry_run=False):
+        # type: (_typing.List[str], _typing.List[str], _typing.Dict[str, dict], _typing.List[str], _typing.List[str], _typing.Dict[str, Exception], _typing.Optional[_typing.Dict[str, Exception]], bool) -> None
+        self.categories_added = categories_added
+        self.added = added
+        self.modified = modified
+        self.deleted = deleted
+        self.unchanged = unchanged
+        self.failed = failed
+        self.categories_failed = categories_failed or dict()
+        self.dry_run = dry_run
+
+    def __bool__(self):
+        return len(self.failed) == 0 and len(self.categories_failed) == 0
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return ("ActivitiesSyncReport(categories_added={!r}, added={!r}, modified={!r}, deleted={!r}, "
+                "unchanged={}, failed={!r}, categories_failed={!r}, dry_run={!r})").format(
+            self.categories_added, self.added, sorted(self.modified), self.deleted,
+            len(self.unchanged), self.failed, self.categories_failed, self.dry_run)
+
+
+def _same_value(old, new):
+    # type: (_typing.Any, _typing.Any) -> bool
+
+    # Values scraped from the form are strings, while new values may be numbers
+    if old is None:
+        old = ""
+    if new is None:
+        new = ""
+
+    if str(old) == str(new):
+        return True
+
+    try:
+        return float(old) == float(new)
+    except (TypeError, ValueError):
+        return False
+
+
+def _same_field(old, new):
+    # type: (_typing.Any, _typing.Any) -> bool
+
+    # Checkboxes are scraped as strings (or as whether they are checked)
+    if isinstance(new, bool):
+        if isinstance(old, bool):
+            return old == new
+        return (old not in [None, "", "False", "false", "off"]) == new
+
+    return _same_value(old, new)
+
+
+def _activity_form_payload(*fields):
+    # type: (*_typing.Mapping[str, _typing.Any]) -> dict
+
+    # Merges the fields (by internal name, the last ones taking precedence)
+    # before dropping those that are False: as when a browser submits the
+    # form, an unchecked checkbox is left out, and must override a checked one
+    merged = dict()
+    for values in fields:
+        merged.update(
+            (oneupsdk.integration.macros.ONEUP_ACTIVITY_ATTRIBUTES_FORM_RDICT.get(name), value)
+            for (name, value) in values.items()
+            if name in oneupsdk.integration.macros.ONEUP_ACTIVITY_ATTRIBUTES_FORM_RDICT)
+
+    return {
+        name: value
+        for (name, value) in merged.items()
+        if value is not False
+    }
+
+
+def _compute_points_changes(s_ids, old_points, old_feedback, new_points, new_feedback):
+    # type: (_typing.Iterable[int], dict, dict, dict, dict) -> _typing.Dict[int, dict]
+    changes = dict()
+
+    for user_id in s_ids:
+        student_changes = dict()
+
+        if not _same_value(old_points.get(user_id), new_points.get(user_id)):
+            student_changes["points"] = (old_points.get(user_id), new_points.get(user_id))
+
+        if not _same_value(old_feedback.get(user_id), new_feedback.get(user_id)):
+            student_changes["feedback"] = (old_feedback.get(user_id), new_feedback.get(user_id))
+
+        if len(student_changes) > 0:
+            changes[user_id] = student_changes
+
+    return changes
+
+
+class OneUpClient(object):
+    """
+    A client for the OneUp Learning platform, which owns its own credentials,
+    authentication cookies, connection pool and active course.
+
+    Several clients can be used side by side (for instance, one per instructor
+    account) without interfering with each other. The module-level macros of
+    `oneupsdk.integration` operate on a default client (see
+    `oneupsdk.integration.api.get_default_client`).
+    """
+
+    def __init__(self, username=None, password=None, base_url=None, transport=None,
+                 cache_ttl=_DEFAULT_CACHE_TTL, parser=None, response_cache=None, session_store=None,
+                 course_id=None, instrumentation=None):
+        # type: (_typing.Optional[str], _typing.Optional[str], _typing.Optional[str], _typing.Any, _typing.Optional[float], _typing.Optional[str], _typing.Optional[oneupsdk.integration.cache.ResponseCache], _typing.Any, _typing.Optional[int], _typing.Optional[oneupsdk.integration.instrumentation.Instrumentation]) -> None
+
+        self.username = username
+        self.password = password
+
+        self.base_url = base_url or oneupsdk.integration.api.BASE_URL
+        self.login_url = _six.moves.urllib.parse.urljoin(self.base_url, "login")
+
+        self.transport = transport or oneupsdk.integration.transport.Transport()
+
+        self.cookies = None  # type: _typing.Optional[dict]
+        self.active_course = None  # type: _typing.Optional[int]
+        self._active_course_known = False
+
+        # A client bound to a course has a session of its own, in which that
+        # course is selected once and for all
+        self.course_id = course_id
+
+        # Sessions of the store are shared: an unbound client uses the session
+        # of its active course, rather than switching the course of a session
+        # that other clients may be using (see `set_active_course`)
+        self.session_store = session_store
+        self._session_course = None  # type: _typing.Optional[int]
+
+        # Observers of the macro calls, requests and parsing (none by default)
+        self.instrumentation = instrumentation
+
+        self.cache_ttl = cache_ttl
+        self.parser = parser
+        self.response_cache = response_cache
+        self._rosters = dict()  # type: _typing.Dict[_typing.Optional[int], oneupsdk.integration.cache.RosterIndex]
+        self._activities_pages = dict()  # type: _typing.Dict[_typing.Optional[int], oneupsdk.integration.cache.ActivitiesPage]
+
+        self._auth_lock = _threading.Lock()
+        self._cache_lock = _threading.Lock()
+
+    ###########################################################################
+    # AUTHENTICATION AND REQUESTS
+    ###########################################################################
+
+    def configure_auth(self, username=None, password=None):
+        # type: (_typing.Optional[str], _typing.Optional[str]) -> None
+        """
+        Override the configuration file sourced authentication information.
+        """
+        self.username = username
+        self.password = password
+        self.cookies = None
+        self._session_course = None
+        self._active_course_known = False
+        self._rosters.clear()
+        self._activities_pages.clear()
+
+    def _get_credentials(self, username=None, password=None):
+        # type: (_typing.Optional[str], _typing.Optional[str]) -> _typing.Tuple[str, str]
+        return (
+            username or self.username or oneupsdk.integration.config["username"],
+            password or self.password or oneupsdk.integration.config["password"],
+        )
+
+    def _account_key(self):
+        # type: () -> str
+        (username, _) = self._get_credentials()
+        return "{}|{}".format(self.base_url, username)
+
+    def _headers(self, cookie):
+        # type: (str) -> dict
+        return {
+            # Cache liveness stuff
+            "Connection": "keep-alive" if getattr(self.transport, "keep_alive", True) else "close",
+            "Pragma": "no-cache",
+            "Cache-Control": "no-cache",
+
+            # Format stuff
+            "Accept": "text/html,application/xhtml+xml,application/xml",
+            "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
+
+            # Authentication
+            "Cookie": cookie,
+
+            # CSRF security stuff
+            "Referer": self.login_url,
+            "Origin": self.base_url,
+            "Upgrade-Insecure-Requests": "1",
+            "Sec-Fetch-Mode": "navigate",
+            "Sec-Fetch-User": "?1",
+            "Sec-Fetch-Site": "same-origin",
+
+            "User-Agent": USER_AGENT,
+        }
+
+    def _make_soup(self, content, parse_only=None):
+        # type: (bytes, _typing.Optional[_bs4.SoupStrainer]) -> _bs4.BeautifulSoup
+
+        # The parser backend can be selected per client, or in the configuration file
+        backend = self.parser or oneupsdk.integration.config.get("parser")
+
+        if self.instrumentation is None:
+            return oneupsdk.integration.parsing.make_soup(
+                content, parse_only=parse_only, backend=backend)
+
+        event = self.instrumentation.parse_started(
+            parser=oneupsdk.integration.parsing.resolve_backend(backend), size=len(content))
+        try:
+            return oneupsdk.integration.parsing.make_soup(
+                content, parse_only=parse_only, backend=backend)
+        finally:
+            self.instrumentation.parse_finished(event)
+
+    def get_auth_cookies(self, username=None, password=None, **kwargs):
+        # type: (_typing.Optional[str], _typing.Optional[str], _typing.Dict) -> _typing.Optional[dict]
+        """
+        Log into the OneUp platform and return the resulting session cookies.
+        """
+
+        login = self._login(username=username, password=password)
+        if login is None:
+            return
+
+        (data, expires) = login
+
+        # A new session starts without any active course
+        self.active_course = None
+        self._active_course_known = True
+        self.cookies = data
+
+        self._save_session(expires=expires)
+
+        return data
+
+    def _login(self, username=None, password=None, **kwargs):
+        # type: (_typing.Optional[str], _typing.Optional[str], _typing.Dict) -> _typing.Optional[_typing.Tuple[dict, _typing.Optional[float]]]
+
+        # Logs in without touching the state of the client, and returns the
+        # cookies of the new session along with the time it expires
+
+        # Step 1: Get a CSRF token and start the OneUp session
+
+        try:
+            response = self._perform(
+                "GET", self.login_url, reason=oneupsdk.integration.instrumentation.REASON_LOGIN)
+        except _requests.RequestException:
+            response = None
+
+        if response is None or not response.ok:
+            return
+
+        soup = self._make_soup(
+            response.content, parse_only=oneupsdk.integration.parsing.STRAINER_LOGIN_FORM)
+        csrf_token = soup.find("input", {"name": "csrfmiddlewaretoken"}).get("value")
+
+        # Step 2: Login with credentials and get signed token
+
+        (username, password) = self._get_credentials(username=username, password=password)
+
+        try:
+            response = self._perform(
+                "POST", self.login_url,
+                reason=oneupsdk.integration.instrumentation.REASON_LOGIN,
+                allow_redirects=False,
+                headers=self._headers(cookie="csrftoken={}".format(csrf_token)),
+                data={
+                    "csrfmiddlewaretoken": csrf_token,
+                    "next": "/oneUp/courses",
+                    "username": username,
+                    "password": password,
+                    "login": "Login",
+                },
+            )
+        except _requests.RequestException:
+            return
+
+        # Step 3: Inspect cookies to make sure we are logged in
+        if response.status_code in [200, 302]:
+            cookies = response.cookies
+
+            if "sessionid" in cookies and "csrftoken" in cookies:
+                # Remember when the session expires, to know when it can be reused
+                expires = None
+                for cookie in cookies:
+                    if cookie.name == "sessionid":
+                        expires = cookie.expires
+
+                return (self._make_cookies_data(cookies), expires)
+
+    @staticmethod
+    def _make_cookies_data(cookies):
+        # type: (_requests.cookies.RequestsCookieJar) -> dict
+        cookies_string = "; ".join(
+            list(map(lambda cookie: "{name}={value}".format(
+                name=cookie.name, value=cookie.value),
+                     cookies)))
+
+        return {
+            "sessionid": cookies["sessionid"],
+            "csrftoken": cookies["csrftoken"],
+            "cookies": cookies,
+            "cookies_string": cookies_string
+        }
+
+    def _bound_course(self):
+        # type: () -> _typing.Optional[int]
+        return self.course_id if self.course_id is not None else self._session_course
+
+    def _session_key(self):
+        # type: () -> str
+
+        # The course of a stored session is selected once, right after login,
+        # and never switched: it is shared only by clients of that course
+        course_id = self._bound_course()
+        if course_id is not None:
+            return "{}|course={}".format(self._account_key(), course_id)
+
+        return self._account_key()
+
+    def _save_session(self, expires=None):
+        # type: (_typing.Optional[float]) -> None
+        if self.session_store is None or self.cookies is None:
+            return
+
+        if expires is None:
+            previous = self.session_store.load(self._session_key())
+            if previous is not None:
+                expires = previous.get("expires")
+
+        self.session_store.save(self._session_key(), {
+            "cookies": {
+                cookie.name: cookie.value
+                for cookie in self.cookies.get("cookies")
+            },
+            "expires": expires,
+            "active_course": self.active_course,
+        })
+
+    def _load_session(self):
+        # type: () -> _typing.Optional[dict]
+        if self.session_store is None:
+            return
+
+        session = self.session_store.load(self._session_key())
+        if not oneupsdk.integration.sessions.is_session_valid(session):
+            return
+
+        return session
+
+    def _ensure_auth(self, **kwargs):
+        # type: (_typing.Dict) -> None
+
+        # Concurrent callers (threads, or the asyncio front-end) must not all
+        # log in at once: the first one logs in, the others wait for it
+        if self.cookies is None:
+            with self._auth_lock:
+                if self.cookies is None:
+                    self._open_session(self._bound_course(), **kwargs)
+
+    def _open_session(self, course_id, stale_session_id=None, **kwargs):
+        # type: (_typing.Optional[int], _typing.Optional[str], _typing.Dict) -> bool
+
+        # Restores the session of the store (unless it is the stale one) or
+        # logs in, selects `course_id` in it, and only then publishes it: other
+        # threads use `self.cookies` as soon as it is set, without waiting for
+        # the authentication lock (which the caller must hold)
+        expires = None
+        session = self._load_session()
+
+        if session is not None and session.get("cookies", {}).get("sessionid") != stale_session_id:
+            cookies = self._make_cookies_data(
+                _requests.cookies.cookiejar_from_dict(session.get("cookies")))
+
+            # The stored course is only a hint: the course of a session restored
+            # from the store is selected again, or looked up, before it is relied on
+            (active_course, active_course_known, changed) = (session.get("active_course"), False, False)
+
+        else:
+            # Another process may have stored the session that just expired
+            if session is not None:
+                self.session_store.delete(self._session_key())
+
+            login = self._login(**kwargs)
+            if login is None:
+                return False
+
+            # A new session starts without any active course
+            (cookies, expires) = login
+            (active_course, active_course_known, changed) = (None, True, True)
+
+        if course_id is not None and not (active_course_known and active_course == course_id):
+            self._select_course(course_id, cookies)
+            (active_course, active_course_known, changed) = (course_id, True, True)
+
+        self.active_course = active_course
+        self._active_course_known = active_course_known
+        self.cookies = cookies
+
+        if changed:
+            self._save_session(expires=expires)
+
+        return True
+
+    def _select_course(self, course_id, cookies):
+        # type: (int, dict) -> None
+
+        # Selects a course in a session that is not published yet
+        res = self._send(
+            url=_six.moves.urllib.parse.urljoin(self.base_url, "/oneUp/setCourse"),
+            data={
+                "courseID": course_id,
+                "csrfmiddlewaretoken": cookies.get("csrftoken"),
+            },
+            cookies=cookies)
+        oneupsdk.integration.exceptions.handle_api_error(res)
+
+    def _is_session_expired(self, response, head=None):
+        # type: (_requests.Response, _typing.Optional[bytes]) -> bool
+
+        # Django redirects the requests of expired sessions to the login page
+        login_path = _six.moves.urllib.parse.urlparse(self.login_url).path.rstrip("/")
+
+        for r in list(response.history) + [response]:
+            if r.is_redirect:
+                location = _six.moves.urllib.parse.urlparse(r.headers.get("Location", "")).path
+                if location.rstrip("/") == login_path:
+                    return True
+
+        if (len(response.history) > 0 and
+                _six.moves.urllib.parse.urlparse(response.url).path.rstrip("/") == login_path):
+            return True
+
+        # Some views answer with an authorization error instead
+        if response.status_code in SESSION_EXPIRED_STATUS_CODES:
+            return True
+
+        # Others render the login form in place of the page (only the `head`
+        # of the body of streamed responses, if provided, is looked at)
+        if response.status_code == 200:
+            content = response.content if response._content_consumed else head
+            content_type = response.headers.get("Content-Type", "")
+            if (content is not None and content_type.startswith("text/html") and
+                    LOGIN_FORM_PATTERN.search(content)):
+                return True
+
+        return False
+
+    def _reauthenticate(self, stale_cookies):
+        # type: (_typing.Optional[dict]) -> None
+
+        # Single flight: concurrent callers that see the same session expire
+        # wait here, and only the first of them logs in again
+        with self._auth_lock:
+            if self.cookies is not None and self.cookies is not stale_cookies:
+                return
+
+            active_course = self._bound_course()
+            if active_course is None:
+                active_course = self.active_course
+            stale_session_id = None if stale_cookies is None else stale_cookies.get("sessionid")
+
+            # Another process may already have logged in again; either way, the
+            # new session is switched back to the course that was active before
+            # it replaces the stale one, and the waiting callers replay their
+            # requests with it
+            if not self._open_session(active_course, stale_session_id=stale_session_id):
+                raise oneupsdk.integration.exceptions.OneUpAPIException(
+                    msg="The session has expired, and logging in again failed.",
+                    url=self.login_url,
+                )
+
+    def _session_cookies(self, **kwargs):
+        # type: (_typing.Dict) -> dict
+        self._ensure_auth(**kwargs)
+
+        cookies = self.cookies
+        if cookies is None:
+            raise oneupsdk.integration.exceptions.OneUpAPIException(
+                msg="Could not log into the OneUp platform.", url=self.login_url)
+
+        return cookies
+
+    def get_csrf_token(self, **kwargs):
+        # type: (_typing.Dict) -> _typing.Optional[str]
+        """
+        Return the CSRF token for the active session.
+        """
+        self._ensure_auth(**kwargs)
+
+        cookies = self.cookies
+        if cookies is not None:
+            return cookies.get("csrftoken")
+
+    def request(self, endpoint=None, url=None, data=None, json=None, stream=False, revalidate=False, **kwargs):
+        # type: (_typing.Optional[str], _typing.Optional[str], _typing.Optional[_typing.Union[str, dict]], _typing.Optional[dict], bool, bool, dict) -> _requests.Response
+        """
+        Make a request directly to the OneUp platform. If `stream` is set, the
+        body of a successful GET response is not downloaded upfront, and can
+        be consumed incrementally with `iter_content()`.
+
+        If `revalidate` is set, a cached response is never used without first
+        asking the server whether it is still valid (reads that come right
+        before a write must see the current state of the page).
+
+        If the session has expired, the client logs in again and replays the
+        request once.
+        """
+
+        # If only endpoint was passed, augment with base URL
+        if endpoint is not None:
+            url = _six.moves.urllib.parse.urljoin(
+                base=self.base_url,
+                url=endpoint,
+            )
+
+        # The session may be replaced by another thread at any time: the
+        # request is sent (and replayed) with a single snapshot of it
+        cookies = self._session_cookies(**kwargs)
+        res = self._send(url=url, data=data, json=json, stream=stream, revalidate=revalidate,
+                         cookies=cookies)
+
+        if self._is_session_expired(res):
+            self._reauthenticate(cookies)
+            cookies = self._session_cookies()
+
+            # The CSRF token of the expired session must be replaced as well
+            if isinstance(data, dict) and "csrfmiddlewaretoken" in data:
+                data = dict(data)
+                data["csrfmiddlewaretoken"] = cookies.get("csrftoken")
+
+            res = self._send(url=url, data=data, json=json, stream=stream, revalidate=revalidate,
+                             cookies=cookies, reason=oneupsdk.integration.instrumentation.REASON_REPLAY)
+
+            if self._is_session_expired(res):
+                res.close()
+                raise oneupsdk.integration.exceptions.OneUpAPIException(
+                    msg="The session expired again right after logging in.", url=url)
+
+        oneupsdk.integration.exceptions.handle_api_error(res)
+
+        return res
+
+    def _request_stream(self, endpoint, chunk_size=STREAM_CHUNK_SIZE):
+        # type: (str, int) -> _typing.Tuple[_requests.Response, _typing.Iterator[bytes]]
+        """
+        Make a streamed GET request, and return the response along with an
+        iterator over its body. The first chunk is read before returning, so
+        that a login form served in place of the page (which `request` cannot
+        see in a streamed response) is detected before any of it is used: the
+        client then logs in again and replays the request once.
+        """
+
+        for attempt in range(2):
+            stale_cookies = self._session_cookies()
+            res = self.request(endpoint, stream=True)
+
+            chunks = res.iter_content(chunk_size=chunk_size)
+            head = next(chunks, b"")
+
+            if not self._is_session_expired(res, head=head):
+                return (res, _itertools.chain([head], chunks))
+
+            res.close()
+            if attempt == 0:
+                self._reauthenticate(stale_cookies)
+
+        raise oneupsdk.integration.exceptions.OneUpAPIException(
+            msg="The session expired again right after logging in.", url=res.url)
+
+    def _perform(self, method, url, reason=None, **kwargs):
+        # type: (str, str, _typing.Optional[str], _typing.Any) -> _requests.Response
+
+        # Every request that goes out goes through here, to be observed
+        send = self.transport.get if method == "GET" else self.transport.post
+
+        if self.instrumentation is None:
+            return send(url=url, **kwargs)
+
+        event = self.instrumentation.request_started(
+            method=method,
+            url=url,
+            endpoint=_six.moves.urllib.parse.urlparse(url).path,
+            reason=reason)
+        try:
+            res = send(url=url, **kwargs)
+        except Exception as exc:
+            self.instrumentation.request_finished(event, error=exc)
+            raise
+
+        self.instrumentation.request_finished(event, response=res, stream=kwargs.get("stream", False))
+        return res
+
+    def _send(self, url, data=None, json=None, stream=False, revalidate=False, cookies=None, reason=None):
+        # type: (str, _typing.Optional[_typing.Union[str, dict]], _typing.Optional[dict], bool, bool, _typing.Optional[dict], _typing.Optional[str]) -> _requests.Response
+
+        if cookies is None:
+            cookies = self._session_cookies()
+
+        headers = self._headers(cookie=cookies.get("cookies_string"))
+
+        # Serve read-only pages from the response cache, if one is enabled
+        path = _six.moves.urllib.parse.urlparse(url).path.rstrip("/")
+        cache_key = None
+        cached = None
+
+        if self.response_cache is not None and data is None and json is None and not stream:
+            if path in CACHEABLE_PATHS:
+                cache_key = (self._account_key(), self.active_course, url)
+                cached = self.response_cache.get(cache_key)
+
+                if cached is not None:
+                    if not revalidate and self.response_cache.is_fresh(cached):
+                        return cached.to_response()
+
+                    # Ask the server whether the entry is still valid
+                    if cached.etag is not None:
+                        headers["If-None-Match"] = cached.etag
+                    if cached.last_modified is not None:
+                        headers["If-Modified-Since"] = cached.last_modified
+
+        if data is None and json is None:
+            res = self._perform(
+                "GET", url,
+                reason=reason,
+                headers=headers,
+                **({"stream": True} if stream else {})
+            )
+
+        elif json is not None:
+            res = self._perform(
+                "POST", url,
+                reason=reason,
+                headers=headers,
+                json=json,
+            )
+
+        else:
+            res = self._perform(
+                "POST", url,
+                reason=reason,
+                headers=headers,
+                data=data,
+            )
+
+        if res.status_code == 301 and url[-1] != "/":
+            return self._send(url="{}/".format(url), stream=stream, revalidate=revalidate, cookies=cookies,
+                              reason=oneupsdk.integration.instrumentation.REASON_REDIRECT)
+
+        if cache_key is not None:
+            if res.status_code == 304 and cached is not None:
+                self.response_cache.refresh(cache_key, cached)
+                return cached.to_response()
+
+            if res.status_code == 200:
+                self.response_cache.store(cache_key, res)
+
+        elif self.response_cache is not None and (data is not None or json is not None):
+            self.response_cache.invalidate(
+                account=self._account_key(),
+                course_id=self.active_course,
+                paths=CACHE_INVALIDATIONS.get(path))
+
+        return res
+
+    ###########################################################################
+    # COURSE METHODS
+    ###########################################################################
+
+    @_instrumented
+    def get_instructor_courses(self):
+        # type: () -> _typing.List[oneupsdk.integration.records.Course]
+        """
+        Returns a list of all courses that the logged in instructor has access to,
+        as `(id, name)` tuples.
+        """
+        r = self.request("/oneUp/instructors/instructorHome")
+
+        if r.status_code != 200:
+            return []
+
+        s = self._make_soup(
+            r.content, parse_only=oneupsdk.integration.parsing.STRAINER_TABLES)
+        t = oneupsdk.integration.util.find_table(s, header_query="Your Courses")
+        if t is None:
+            return []
+
+        rows = t.find_all("tr")
+
+        courses = []
+        for row in rows:
+            try:
+                course_caption = row.find("td").text
+
+                # newly introduced: University marker
+                # <caption> \xa0 (<university>)
+                m = oneupsdk.integration.macros.ONEUP_COURSE_TITLE_PARSER.match(course_caption)
+                if m is not None:
+                    course_caption = m.group("name")
+
+                course_id = int(row.find("input", {"name": "courseID"})["value"])
+                courses.append(oneupsdk.integration.records.Course(id=course_id, name=course_caption))
+            except ValueError:
+                continue
+            except:
+                continue
+
+        return sorted(courses)
+
+    @_instrumented
+    def set_active_course(self, course_id):
+        # type: (int) -> bool
+        """
+        Switch the active OneUp Learning course that the API is operating on.
+        With a session store, whose sessions are shared with other clients,
+        the client switches to the session of the course instead.
+        """
+
+        if self.course_id is not None and course_id != self.course_id:
+            raise ValueError("this client is bound to course {}, use `for_course({})` instead".format(
+                self.course_id, course_id))
+
+        if self.session_store is not None and self.course_id is None:
+            return self._switch_session(course_id)
+
+        r = self.request(
+            endpoint="/oneUp/setCourse",
+            data={
+                "courseID": course_id,
+                "csrfmiddlewaretoken": self.get_csrf_token()
+            })
+
+        if r.status_code != 200:
+            return False
+
+        self.active_course = course_id
+        self._active_course_known = True
+        self._save_session()
+
+        return True
+
+    def _switch_session(self, course_id):
+        # type: (int) -> bool
+
+        # Other clients (and processes) may be using the current session of
+        # the store, and would then operate on the wrong course: switch to the
+        # session of the course instead, restored or logged in and bound
+        previous = self._session_course
+        with self._auth_lock:
+            self._session_course = course_id
+            self.cookies = None
+
+        try:
+            self._ensure_auth()
+        except Exception:
+            with self._auth_lock:
+                self._session_course = previous
+                self.cookies = None
+            raise
+
+        return self.cookies is not None and self.active_course == course_id
+
+    @_instrumented
+    def get_active_course(self, refresh=False):
+        # type: (bool) -> _typing.Optional[int]
+        """
+        Returns the actively selected course, if any. The course is only looked
+        up on the OneUp platform if it is not known yet (or if `refresh` is set);
+        the course recorded with a session restored from the session store is
+        not trusted, and is looked up again.
+        """
+        self._ensure_auth()
+
+        if self._active_course_known and not refresh:
+            return self.active_course
+
+        try:
+            r = self.request("/oneUp/instructors/instructorCourseHome")
+        except oneupsdk.integration.exceptions.OneUpAPIException as exc:
+            # This happens when no course is selected
+            if exc.data.get("http_code") == 500:
+                self.active_course = None
+                self._active_course_known = True
+                return
+
+            # Unknown error
+            raise
+
+        if r.status_code != 200:
+            return
+
+        c = r.content.decode()
+        m = _re.search(r"course_id\s*=\s*'([^';]*)'", c)
+        if m is None:
+            return
+
+        try:
+            i = int(m.group(1).strip("'\""))
+        except ValueError:
+            return
+
+        self.active_course = i
+        self._active_course_known = True
+        return i
+
+    def for_course(self, course_id):
+        # type: (int) -> OneUpClient
+        """
+        Returns a new client bound to a course: it has an authenticated session
+        of its own, in which the course is selected once and for all, so that
+        clients for different courses can be used concurrently without
+        switching the active course back and forth. The new client shares the
+        credentials, connection pool, response cache, session store and
+        instrumentation of this client.
+        """
+        return OneUpClient(
+            username=self.username,
+            password=self.password,
+            base_url=self.base_url,
+            transport=self.transport,
+            cache_ttl=self.cache_ttl,
+            parser=self.parser,
+            response_cache=self.response_cache,
+            session_store=self.session_store,
+            course_id=course_id,
+            instrumentation=self.instrumentation,
+        )
+
+    ###########################################################################
+    # STUDENT METHODS
+    ###########################################################################
+
+    @_instrumented
+    def get_enrolled_students(self):
+        # type: () -> _typing.List[dict]
+        """
+        Provide a list of students currently enrolled in the active course.
+        """
+
+        r = self.request("/oneUp/instructors/createStudentList")
+        if r.status_code != 200:
+            return list()
+
+        s = self._make_soup(
+            r.content, parse_only=oneupsdk.integration.parsing.STRAINER_TABLES)
+        t = oneupsdk.integration.util.find_table(s, "Avatar")
+        if t is None:
+            return list()
+
+        rows = t.find_all("tr")
+        if rows is None or len(rows) == 0:
+            return list()
+
+        headers = list(map(
+            lambda obj: oneupsdk.integration.macros.ONEUP_STUDENT_ATTRIBUTE_CAPTION_DICT.get(obj.text),
+            rows[0].find_all("th")))
+
+        rows = rows[1:]
+
+        def convert_column(c):
+            if c is None:
+                return ""
+            if c.text != "":
+                return c.text
+            try:
+                return c.find("img")["src"]
+            except:
+                return ""
+
+        students = []
+        for row in rows:
+            columns = list(map(convert_column, row.find_all("td")))[:-1]
+
+            if len(columns) != len(headers):
+                continue
+
+            try:
+                user_name = row.find("input", { "name": "userID" }).get("value")
+            except:
+                continue
+
+            # Added 2020-02-16 after adding field by Keith Irwin on forms
+            try:
+                user_id = row.find("input", { "name": "student_internal_id" }).get("value")
+                user_id = int(user_id)
+            except ValueError:
+                continue
+            except:
+                continue
+
+            user_record = dict(zip(headers, columns))
+            user_record["username"] = user_name
+            user_record["id"] = user_id
+
+            students.append(user_record)
+
+        return students
+
+    @_instrumented
+    def iter_enrolled_students(self, chunk_size=STREAM_CHUNK_SIZE):
+        # type: (int) -> _typing.Iterator[dict]
+        """
+        Iterates over the students currently enrolled in the active course. The
+        student list is parsed as it is downloaded, and each student is yielded
+        as soon as their row has been received, which keeps memory use constant
+        for very large courses.
+        """
+
+        (r, chunks) = self._request_stream("/oneUp/instructors/createStudentList", chunk_size=chunk_size)
+
+        try:
+            if r.status_code != 200:
+                return
+
+            parser = oneupsdk.integration.parsing.StudentListParser(
+                captions=oneupsdk.integration.macros.ONEUP_STUDENT_ATTRIBUTE_CAPTION_DICT)
+            decoder = _codecs.getincrementaldecoder(r.encoding or "utf-8")(errors="replace")
+
+            for chunk in chunks:
+                self._feed(parser, decoder.decode(chunk))
+                for student in parser.pop_records():
+                    yield student
+
+                # No need to download the rest of the page
+                if parser.done:
+                    return
+
+            self._feed(parser, decoder.decode(b"", final=True))
+            parser.close()
+            for student in parser.pop_records():
+                yield student
+
+        finally:
+            r.close()
+
+    def _feed(self, parser, text):
+        # type: (oneupsdk.integration.parsing.StudentListParser, str) -> None
+        if self.instrumentation is None:
+            parser.feed(text)
+            return
+
+        event = self.instrumentation.parse_started(parser="html.parser", size=len(text))
+        try:
+            parser.feed(text)
+        finally:
+            self.instrumentation.parse_finished(event)
+
+    @_instrumented
+    def get_roster(self, refresh=False):
+        # type: (bool) -> oneupsdk.integration.cache.RosterIndex
+        """
+        Returns an index of the students enrolled in the active course, by ID,
+        username and email. The roster is only downloaded again once it is
+        older than `cache_ttl` seconds, or when `refresh` is set.
+        """
+
+        # A course-bound client selects its course when it logs in
+        self._ensure_auth()
+        course_id = self.active_course
+
+        with self._cache_lock:
+            roster = self._rosters.get(course_id)
+
+        if roster is None or roster.expired or refresh:
+            roster = oneupsdk.integration.cache.RosterIndex(
+                students=self.get_enrolled_students(),
+                ttl=self.cache_ttl)
+
+            with self._cache_lock:
+                self._rosters[course_id] = roster
+
+        return roster
+
+    def invalidate_roster(self):
+        # type: () -> None
+        """
+        Discards the cached roster of the active course.
+        """
+        with self._cache_lock:
+            self._rosters.pop(self.active_course, None)
+
+    def _cached_roster(self):
+        # type: () -> _typing.Optional[oneupsdk.integration.cache.RosterIndex]
+        with self._cache_lock:
+            return self._rosters.get(self.active_course)
+
+    @_instrumented
+    def get_student_by_username(self, username):
+        # type: (str) -> _typing.Optional[dict]
+        """
+        Returns a student with the provided username, if such a student exists in the
+        active course.
+        """
+        return self._get_student_info(username=username)
+
+    def _get_student_info(self, username, revalidate=False):
+        # type: (str, bool) -> _typing.Optional[dict]
+
+        r = self.request(
+            "/oneUp/instructors/createStudentView?userID={}".format(username),
+            revalidate=revalidate)
+
+        if r.status_code != 200:
+            return
+
+        s = self._make_soup(
+            r.content, parse_only=oneupsdk.integration.parsing.STRAINER_STUDENT_FORM)
+
+        obj_form = s.find("form", { "id": "createStudentForm" })
+        if obj_form is None:
+            return
+
+        lst_fields = list(
+            map(lambda field: (field.get("name"), field.get("value")),
+                obj_form.find_all("input")))
+
+        student_info = {}
+        for (name, value) in lst_fields:
+            if name in oneupsdk.integration.macros.ONEUP_STUDENT_ATTRIBUTES_FORM_DICT:
+                internal_name = oneupsdk.integration.macros.ONEUP_STUDENT_ATTRIBUTES_FORM_DICT.get(name)
+                student_info[internal_name] = value
+
+        # Hackish: Try to convert ID to integer
+        if "id" in student_info:
+            try:
+                student_info["id"] = int(student_info["id"])
+            except ValueError:
+                pass
+
+        return student_info
+
+    @_instrumented
+    def get_students_by_usernames(self, usernames, max_workers=None):
+        # type: (_typing.Iterable[str], _typing.Optional[int]) -> _typing.Iterator[oneupsdk.integration.util.BulkResult]
+        """
+        Fetches the students with the provided usernames concurrently, and yields
+        a `BulkResult(key=username, value=student, error=exception)` for each
+        of them as soon as it is available.
+        """
+        return oneupsdk.integration.util.fan_out(
+            func=self.get_student_by_username,
+            items=usernames,
+            max_workers=max_workers)
+
+    @_instrumented
+    def get_student_by_id(self, user_id):
+        # type: (int) -> _typing.Optional[dict]
+        """
+        Returns a student with the provided user ID, if such a student exists in the
+        active course.
+        """
+        student = self.get_roster().get(id=user_id)
+        if student is None:
+            return
+
+        student_username = student.get("username")
+
+        if student_username is None or student_username == "":
+            return
+
+        return self.get_student_by_username(username=student_username)
+
+    @_instrumented
+    def add_student(self, email, password, first=None, last=None, username=None):
+        # type: (str, str, _typing.Optional[str], _typing.Optional[str], _typing.Optional[str]) -> bool
+        """
+        Creates a new student and enrolls them in the active course.
+        """
+        if email is None or email == "":
+            return False
+
+        if password is None or password == "":
+            return False
+
+        if not self._create_student(
+                email=email, password=password, first=first, last=last, username=username):
+            return False
+
+        # Keep the cached roster (if any) up to date: the ID of the new student
+        # is assigned by the server, so it has to be read back from their form
+        roster = self._cached_roster()
+        if roster is not None:
+            student = self.get_student_by_username(username=username or email)
+            if student is None or "id" not in student:
+                self.invalidate_roster()
+            else:
+                roster.add({
+                    "avatar_link": "",
+                    "first": student.get("first"),
+                    "last": student.get("last"),
+                    "email": student.get("email"),
+                    "last_action": "",
+                    "username": student.get("username"),
+                    "id": student.get("id"),
+                })
+
+        return True
+
+    def _create_student(self, email, password, first=None, last=None, username=None):
+        # type: (str, str, _typing.Optional[str], _typing.Optional[str], _typing.Optional[str]) -> bool
+        r = self.request(
+            endpoint="/oneUp/instructors/createStudentView",
+            data={
+                "csrfmiddlewaretoken": self.get_csrf_token(),
+
+                "firstname": first or "",
+                "lastname": last or "",
+                "email": email,
+                "uname": username or email,
+                "pword": password,
+                "pword2": password,
+            })
+
+        return r.status_code == 200
+
+    @_instrumented
+    def delete_student(self, username):
+        # type: (str) -> bool
+        """
+        Unenrolls a student from the active course.
+        """
+        r = self.request(
+            endpoint="/oneUp/instructors/deleteStudent",
+            data={
+                "userID": username,
+                "csrfmiddlewaretoken": self.get_csrf_token()
+            })
+
+        if r.status_code != 200:
+            return False
+
+        roster = self._cached_roster()
+        if roster is not None:
+            roster.remove(username)
+
+        return True
+
+    @_instrumented
+    def modify_student(self, username, email=None, password=None, first=None, last=None, new_user_id=None):
+        """
+        Creates a new student and enrolls them in the active course.
+        """
+        # The whole form is submitted, so it must not come from the cache
+        user_info = self._get_student_info(username=username, revalidate=True)
+
+        if user_info is None:
+            return False
+
+        return self._modify_student(
+            username=username, user_info=user_info, email=email, password=password,
+            first=first, last=last, new_user_id=new_user_id)
+
+    def _modify_student(self, username, user_info, email=None, password=None, first=None, last=None,
+                        new_user_id=None):
+        # type: (str, dict, _typing.Optional[str], _typing.Optional[str], _typing.Optional[str], _typing.Optional[str], _typing.Optional[str]) -> bool
+
+        payload = {
+            "userID": user_info.get("username"),
+            "sUsernamePrev": user_info.get("username"),
+            "sEmailPrev": user_info.get("email"),
+
+            # Existing fields
+            "firstname": user_info.get("first"),
+            "lastname": user_info.get("last"),
+            "email": user_info.get("email"),
+            "uname": user_info.get("username"),
+            "pword": user_info.get("password"),
+            "pword2": "",
+        }
+
+        # NOTE: the names of the dict entries come from the FORM
+
+        if email is not None:
+            payload["email"] = email
+        if password is not None:
+            payload["pword"] = password
+            payload["pword2"] = password
+        if first is not None:
+            payload["firstname"] = first
+        if last is not None:
+            payload["lastname"] = last
+        if new_user_id is not None:
+            payload["uname"] = new_user_id
+
+        # add CSRF token
+        payload["csrfmiddlewaretoken"] = self.get_csrf_token()
+
+        r = self.request(
+            endpoint="/oneUp/instructors/createStudentView",
+            data=payload)
+
+        if r.status_code != 200:
+            return False
+
+        roster = self._cached_roster()
+        if roster is not None:
+            roster.update(username, {
+                "first": payload["firstname"],
+                "last": payload["lastname"],
+                "email": payload["email"],
+                "username": payload["uname"],
+            })
+
+        return True
+
+    @_instrumented
+    def sync_students(self, records, default_password=None, delete_missing=False, dry_run=False,
+                      max_workers=None):
+        # type: (_typing.Iterable[dict], _typing.Optional[str], bool, bool, _typing.Optional[int]) -> RosterSyncReport
+        """
+        Reconciles the roster of the active course with a desired roster, given
+        as a list of records:
+        ```python
+        [
+            { "username": "oneup_username", "email": "student@university.edu",
+              "first": "Ada", "last": "Lovelace", "password": "..." },
+            ...
+        ]
+        ```
+        Records are matched with enrolled students by username, or else by
+        email. Students that are missing are added (with their `password`, or
+        `default_password`, and by default with their email as username),
+        students whose fields differ are modified, and, if `delete_missing` is
+        set, students that are not in the desired roster are deleted. The
+        username of a student is only compared, and changed, if the record has
+        a `username`. Records with neither a `username` nor an `email` are not
+        applied, and are reported as failed by their position (e.g. `"#3"`).
+
+        The roster is fetched once, and the form of a student is only fetched
+        if they need to be modified (or if a password is provided, as it can
+        only be compared through the form). The operations are executed
+        concurrently by a pool of `max_workers` threads. Returns a
+        `RosterSyncReport`; with `dry_run`, the operations are planned but not
+        performed.
+        """
+        roster = self.get_roster()
+
+        additions = dict()  # type: _typing.Dict[str, dict]
+        candidates = dict()  # type: _typing.Dict[str, _typing.Tuple[dict, dict]]
+        unchanged = []  # type: _typing.List[str]
+        failed = dict()  # type: _typing.Dict[str, Exception]
+        matched = set()
+
+        for (index, record) in enumerate(records):
+            username = record.get("username") or None
+
+            if not username and not record.get("email"):
+                failed["#{}".format(index)] = ValueError(
+                    "record without a username or an email: {!r}".format(record))
+                continue
+
+            student = roster.get(username=username, email=record.get("email"))
+            if student is None:
+                additions[username or record.get("email")] = record
+                continue
+
+            matched.add(student.get("username"))
+
+            # Fields that can be compared with the roster itself
+            changes = dict()
+            for field in ["first", "last", "email"]:
+                if record.get(field) is not None and not _same_value(
+                        (student.get(field) or "").strip(), record.get(field)):
+                    changes[field] = (student.get(field), record.get(field))
+            if username is not None and username != student.get("username"):
+                changes["username"] = (student.get("username"), username)
+
+            if len(changes) == 0 and record.get("password") is None:
+                unchanged.append(student.get("username"))
+                continue
+
+            candidates[student.get("username")] = (record, changes)
+
+        deletions = []  # type: _typing.List[str]
+        if delete_missing:
+            deletions = [
+                student.get("username")
+                for student in roster.students
+                if student.get("username") not in matched
+            ]
+
+        modified = dict()  # type: _typing.Dict[str, dict]
+
+        def inspect_student(username):
+            (record, changes) = candidates[username]
+            user_info = self._get_student_info(username=username, revalidate=True)
+            if user_info is None:
+                raise oneupsdk.integration.exceptions.OneUpAPIException(
+                    msg="Could not retrieve the form of the student.", username=username)
+
+            changes = dict(changes)
+            if record.get("password") is not None and user_info.get("password") != record.get("password"):
+                # Passwords are not reported
+                changes["password"] = (None, None)
+
+            return (user_info, changes)
+
+        # Passwords can only be compared through the forms, which are fetched
+        # for the students that will be modified anyway
+        user_infos = dict()
+        for result in oneupsdk.integration.util.fan_out(
+                func=inspect_student, items=list(candidates.keys()), max_workers=max_workers):
+            if result.error is not None:
+                failed[result.key] = result.error
+                continue
+
+            (user_info, changes) = result.value
+            if len(changes) == 0:
+                unchanged.append(result.key)
+                continue
+
+            user_infos[result.key] = user_info
+            modified[result.key] = changes
+
+        if dry_run:
+            return RosterSyncReport(
+                added=list(additions.keys()), modified=modified, deleted=deletions,
+                unchanged=unchanged, failed=failed, dry_run=True)
+
+        def execute(operation):
+            (kind, username) = operation
+
+            if kind == "add":
+                record = additions[username]
+                password = record.get("password") or default_password
+                if password is None or password == "":
+                    raise ValueError("no password for new student {!r}".format(username))
+
+                return self._create_student(
+                    email=record.get("email") or username, password=password,
+                    first=record.get("first"), last=record.get("last"), username=username)
+
+            if kind == "modify":
+                (record, _) = candidates[username]
+                return self._modify_student(
+                    username=username,
+                    user_info=user_infos[username],
+                    email=record.get("email"),
+                    password=record.get("password"),
+                    first=record.get("first"),
+                    last=record.get("last"),
+                    new_user_id=record.get("username") or None)
+
+            return self.delete_student(username=username)
+
+        operations = (
+            [("add", username) for username in additions] +
+            [("modify", username) for username in modified] +
+            [("delete", username) for username in deletions])
+
+        for result in oneupsdk.integration.util.fan_out(
+                func=execute, items=operations, max_workers=max_workers):
+            (kind, username) = result.key
+
+            error = result.error
+            if error is None and not result.value:
+                error = oneupsdk.integration.exceptions.OneUpAPIException(
+                    msg="The server rejected the operation.", operation=kind, username=username)
+
+            if error is not None:
+                failed[username] = error
+
+        # New students get their IDs from the server: fetch the roster once for
+        # all of them, rather than their forms one by one
+        if len(additions) > 0:
+            self.get_roster(refresh=True)
+
+        return RosterSyncReport(
+            added=[username for username in additions if username not in failed],
+            modified={username: changes for (username, changes) in modified.items() if username not in failed},
+            deleted=[username for username in deletions if username not in failed],
+            unchanged=unchanged,
+            failed=failed)
+
+    ###########################################################################
+    # ACTIVITY METHODS
+    ###########################################################################
+
+    @_instrumented
+    def get_activities_page(self, refresh=False):
+        # type: (bool) -> oneupsdk.integration.cache.ActivitiesPage
+        """
+        Returns a snapshot of the activities page of the active course, which
+        provides its activities, activity categories and default category.
+        The page is only downloaded again once it is older than `cache_ttl`
+        seconds, once the activities of the course have been modified, or
+        when `refresh` is set.
+        """
+
+        # A course-bound client selects its course when it logs in
+        self._ensure_auth()
+        course_id = self.active_course
+
+        with self._cache_lock:
+            page = self._activities_pages.get(course_id)
+
+        if page is None or page.expired or page.activities_stale or refresh:
+            page = self._fetch_activities_page()
+
+            with self._cache_lock:
+                self._activities_pages[course_id] = page
+
+        return page
+
+    def invalidate_activities_page(self):
+        # type: () -> None
+        """
+        Discards the cached activities page of the active course.
+        """
+        with self._cache_lock:
+            self._activities_pages.pop(self.active_course, None)
+
+    def _get_categories_page(self):
+        # type: () -> oneupsdk.integration.cache.ActivitiesPage
+
+        # Changes to the activities do not affect the categories, so a snapshot
+        # with stale activities can still be used for its categories
+        with self._cache_lock:
+            page = self._activities_pages.get(self.active_course)
+
+        if page is None or page.expired:
+            page = self.get_activities_page(refresh=True)
+
+        return page
+
+    def _activities_changed(self):
+        # type: () -> None
+        with self._cache_lock:
+            page = self._activities_pages.get(self.active_course)
+            if page is not None:
+                page.activities_stale = True
+
+    def _fetch_activities_page(self):
+        # type: () -> oneupsdk.integration.cache.ActivitiesPage
+
+        activities = []
+        categories = []
+
+        r = self.request("/oneUp/instructors/activitiesList")
+        if r is not None and r.status_code == 200:
+            s = self._make_soup(
+                r.content, parse_only=oneupsdk.integration.parsing.STRAINER_ACTIVITIES_PAGE)
+            categories = self._parse_activity_categories(s)
+            activities = self._parse_activities(s)
+
+        return oneupsdk.integration.cache.ActivitiesPage(
+            activities=activities,
+            categories=categories,
+            default_category_name=oneupsdk.integration.macros.ONEUP_ACTIVITY_CATEGORY_DEFAULT_NAME,
+            ttl=self.cache_ttl)
+
+    @staticmethod
+    def _parse_activity_categories(s):
+        # type: (_bs4.BeautifulSoup) -> _typing.List[oneupsdk.integration.records.ActivityCategory]
+
+        o = s.find("select", { "name": "actCat" })
+        if o is None:
+            return []
+
+        raw_cats = o.find_all("option")
+        cats = []
+        for c in raw_cats:
+            if c.get("value") == "all":
+                continue
+
+            cats.append(oneupsdk.integration.records.ActivityCategory(
+                id=int(c.get("value")),
+                name=c.text,
+            ))
+
+        return cats
+
+    @staticmethod
+    def _parse_activities(s):
+        # type: (_bs4.BeautifulSoup) -> _typing.List[oneupsdk.integration.records.Activity]
+
+        pane_tag = s.find("ul", {"id": "sortable-categories"})
+        if pane_tag is None:
+            return []
+
+        activity_tags = list(filter(
+            lambda tag: tag.get("id") is not None and tag.get("data-category-id") is not None,
+            pane_tag.find_all("li")))
+
+        activities = []
+        for tag in activity_tags:
+            activity_id = tag.get("id")
+            category_id = tag.get("data-category-id")
+            try:
+                divs = tag.find("div", {"class": "sortable-item"}).find_all("div")
+                divs_text = list(map(
+                    lambda tag: tag.text.strip(),
+                    divs,
+                ))
+            except:
+                divs_text = None
+
+            activity = {
+                "id": int(activity_id),
+                "category_id": int(category_id),
+            }
+            if divs_text is not None:
+                activity.update({
+                    "name": divs_text[1],
+                    "description": divs_text[2],
+                    "points": float(divs_text[3].split(" Points")[0]),
+                })
+
+            activities.append(oneupsdk.integration.records.Activity(**activity))
+
+        return activities
+
+    @_instrumented
+    def get_default_activity_category(self):
+        # type: () -> dict
+        """
+        Returns the default activity category.
+        """
+        default = self._get_categories_page().default_category
+
+        if default is None:
+            raise ValueError("something wrong")
+
+        return dict(default)
+
+    @_instrumented
+    def get_activity_categories(self):
+        # type: () -> list
+        """
+        Returns a list of the activity categories for the active course.
+        """
+        return list(map(dict, self._get_categories_page().categories))
+
+    @_instrumented
+    def create_activity_category(self, name, xp_weight=1):
+        # type: (str, int) -> _typing.Optional[dict]
+        """
+        Creates a new activity category in the active course and returns its ID.
+        """
+
+        # Uses the presumption that IDs are creating in ascending order
+        # to be able to identify the activity category that was created
+
+        # Select existing activity categories, filter those who have
+        # the same name, and sort by decreasing IDs
+
+        existing_cats = sorted(filter(lambda c: c["name"] == name,
+                                      self._get_categories_page().categories),
+                               key=lambda c: -c["id"])
+
+        r = self._create_activity_category(name=name, xp_weight=xp_weight)
+
+        # Find categories with name and see if there is a new category
+
+        self.invalidate_activities_page()
+
+        after_cats = sorted(filter(lambda c: c["name"] == name,
+                                   self._get_categories_page().categories),
+                            key=lambda c: -c["id"])
+
+        if r.status_code in [302, 200] and len(existing_cats) + 1 == len(after_cats):
+            return dict(after_cats[0])
+
+    def _create_activity_category(self, name, xp_weight=1):
+        # type: (str, int) -> _requests.Response
+        return self.request(
+            endpoint="/oneUp/instructors/activityCatsCreate",
+            data={
+                "catName": name,
+                "xpWeight": xp_weight,
+                "csrfmiddlewaretoken": self.get_csrf_token(),
+            })
+
+    @_instrumented
+    def get_activities(self):
+        # type: () -> list
+        """
+        Returns a list of the activity categories for the active course.
+        """
+        return list(map(dict, self.get_activities_page().activities))
+
+    @_instrumented
+    def get_activity_by_id(self, activity_id):
+        # type: (int) -> _typing.Optional[dict]
+        """
+        Returns an activity with the provided activity ID, if such an activity exists in the
+        active course.
+        """
+        return self._get_activity_info(activity_id=activity_id)
+
+    def _get_activity_info(self, activity_id, revalidate=False):
+        # type: (int, bool) -> _typing.Optional[dict]
+
+        r = self.request(
+            "/oneUp/instructors/createActivity?activityID={}".format(activity_id),
+            revalidate=revalidate)
+
+        if r.status_code != 200:
+            return
+
+        s = self._make_soup(
+            r.content, parse_only=oneupsdk.integration.parsing.STRAINER_ACTIVITY_FORM)
+
+        obj_form = s.find("form", { "id": "actForm" })
+        if obj_form is None:
+            return
+
+        def compute_value(field):
+            val = field.get("value")
+            if val is not None:
+                return val
+
+            if field.get("type") == "checkbox":
+                return field.get("checked") is not None
+
+            return field.text.strip()
+
+        lst_fields = list(
+            map(lambda field: (field.get("name"), compute_value(field)),
+                obj_form.find_all("input") + obj_form.find_all("textarea")))
+
+        activity_info = {}
+        for (name, value) in lst_fields:
+            if name in oneupsdk.integration.macros.ONEUP_ACTIVITY_ATTRIBUTES_FORM_DICT:
+                internal_name = oneupsdk.integration.macros.ONEUP_ACTIVITY_ATTRIBUTES_FORM_DICT.get(name)
+                activity_info[internal_name] = value
+
+        # Determine category
+        obj_cat = obj_form.find("select").find("option", selected=True)
+
+        activity_info["category_id"] = int(obj_cat.get("value"))
+
+        # NOTE: unsupported currently
+        if "file" in activity_info:
+            del activity_info["file"]
+
+        # Hackish: Try to convert ID to integer
+        if "id" in activity_info:
+            try:
+                activity_info["id"] = int(activity_info["id"])
+            except ValueError:
+                pass
+
+        # Hackish: Try to convert points to integer
+        if "id" in activity_info:
+            try:
+                activity_info["points"] = int(activity_info["points"])
+            except ValueError:
+                pass
+
+        return activity_info
+
+    @_instrumented
+    def get_activities_by_ids(self, activity_ids, max_workers=None):
+        # type: (_typing.Iterable[int], _typing.Optional[int]) -> _typing.Iterator[oneupsdk.integration.util.BulkResult]
+        """
+        Fetches the activities with the provided activity IDs concurrently, and
+        yields a `BulkResult(key=activity_id, value=activity, error=exception)`
+        for each of them as soon as it is available.
+        """
+        return oneupsdk.integration.util.fan_out(
+            func=self.get_activity_by_id,
+            items=activity_ids,
+            max_workers=max_workers)
+
+    @_instrumented
+    def delete_activity_category(self, category_id):
+        # type: (int) -> bool
+
+        """
+        Deletes an activity category from the active course.
+        """
+        r = self.request(
+            endpoint="/oneUp/instructors/activityCatsDelete",
+            data={
+                "catID": category_id,
+                "csrfmiddlewaretoken": self.get_csrf_token()
+            })
+
+        self.invalidate_activities_page()
+
+        return r.status_code == 200
+
+    @_instrumented
+    def create_activity(self, name, category_id=None, **kwargs):
+        # type: (str, str, str) -> bool
+        """
+        Modify the properties of an existing activity.
+        """
+
+        payload = _activity_form_payload(
+            oneupsdk.integration.macros.ONEUP_ACTIVITY_DEFAULTS,
+            {"category_id": self.get_default_activity_category().get("id")},
+            {} if category_id is None else {"category_id": category_id},
+            kwargs)
+
+        payload["activityName"] = name
+
+        # add CSRF token
+        payload["csrfmiddlewaretoken"] = self.get_csrf_token()
+        payload["submit"] = ""
+
+        r = self.request(
+            endpoint="/oneUp/instructors/createActivity",
+            data=payload, multipart=True)
+
+        self._activities_changed()
+
+        return r.status_code == 200
+
+    @_instrumented
+    def modify_activity(self, activity_id, **kwargs):
+        # type: (int, str) -> bool
+        """
+        Modify the properties of an existing activity.
+        """
+        # The whole form is submitted, so it must not come from the cache
+        activity_info = self._get_activity_info(activity_id=activity_id, revalidate=True)
+
+        if activity_info is None:
+            return False
+
+        return self._modify_activity(activity_info=activity_info, **kwargs)
+
+    def _modify_activity(self, activity_info, **kwargs):
+        # type: (dict, _typing.Any) -> bool
+
+        # NOTE: the names of the payload entries come from the FORM
+        payload = _activity_form_payload(activity_info, kwargs)
+
+        # if name is not None:
+        #     payload["activityName"] = name
+        # if total is not None:
+        #     payload["points"] = total
+        # if description is not None:
+        #     payload["description"] = description
+        # if notes is not None:
+        #     payload["instructorNotes"] = notes
+
+        # add CSRF token
+        payload["csrfmiddlewaretoken"] = self.get_csrf_token()
+        payload["submit"] = ""
+
+        r = self.request(
+            endpoint="/oneUp/instructors/createActivity",
+            data=payload, multipart=True)
+
+        self._activities_changed()
+
+        return r.status_code == 200
+
+    @_instrumented
+    def sync_activities(self, spec, delete_missing=False, dry_run=False, max_workers=None):
+        # type: (dict, bool, bool, _typing.Optional[int]) -> ActivitiesSyncReport
+        """
+        Applies a specification of the structure of the active course, which
+        lists its activity categories and activities:
+        ```python
+        {
+            "categories": [ "Homework", { "name": "Exams", "xp_weight": 2 } ],
+            "activities": [
+                { "name": "Homework 1", "category": "Homework", "points": 10,
+                  "deadline": "02/01/2021 11:59 PM", "description": "..." },
+                ...
+            ]
+        }
+        ```
+        Activities are matched by name, and their `category` is given by name
+        (or by ID, as `category_id`). Missing categories and activities are
+        created, activities whose fields differ are modified and, if
+        `delete_missing` is set, activities that are not in the specification
+        are deleted.
+
+        The activities page is fetched once, and the form of an activity is
+        only fetched if the specification sets fields that the page does not
+        show; forms are fetched, and changes applied, concurrently by a pool of
+        `max_workers` threads. The activities page (and the forms of the
+        activities whose changed fields it does not show) are then fetched once
+        more to check every changed field, and the activities that do not match
+        are reported as failed; so are the categories that the server rejected,
+        or that the page does not list after their creation. Returns an `ActivitiesSyncReport`; with `dry_run`,
+        the operations are planned but not performed.
+        """
+        failed = dict()  # type: _typing.Dict[str, Exception]
+        categories_failed = dict()  # type: _typing.Dict[str, Exception]
+
+        # Categories
+
+        page = self.get_activities_page()
+        category_ids = {category.get("name"): category.get("id") for category in page.categories}
+
+        categories_added = []
+        for category in spec.get("categories") or []:
+            if not isinstance(category, dict):
+                category = {"name": category}
+            if category.get("name") not in category_ids and category.get("name") not in categories_added:
+                categories_added.append(category.get("name"))
+
+        if not dry_run and len(categories_added) > 0:
+            xp_weights = {
+                category.get("name"): category.get("xp_weight", 1)
+                for category in spec.get("categories") or []
+                if isinstance(category, dict)
+            }
+
+            for result in oneupsdk.integration.util.fan_out(
+                    func=lambda name: self._create_activity_category(
+                        name=name, xp_weight=xp_weights.get(name, 1)),
+                    items=categories_added,
+                    max_workers=max_workers):
+                if result.error is not None:
+                    categories_failed[result.key] = result.error
+                elif result.value.status_code not in [200, 302]:
+                    categories_failed[result.key] = oneupsdk.integration.exceptions.OneUpAPIException(
+                        msg="The server rejected the creation of the category.",
+                        name=result.key, http_code=result.value.status_code)
+
+            # One refetch provides the IDs of all the new categories
+            self.invalidate_activities_page()
+            page = self.get_activities_page()
+            category_ids = {category.get("name"): category.get("id") for category in page.categories}
+
+            for name in categories_added:
+                if name not in categories_failed and name not in category_ids:
+                    categories_failed[name] = oneupsdk.integration.exceptions.OneUpAPIException(
+                        msg="The category does not exist after its creation.", name=name)
+
+        # Activities: the page shows their name, category, points and description
+
+        existing = dict()  # type: _typing.Dict[str, dict]
+        for activity in page.activities:
+            existing.setdefault(activity.get("name"), activity)
+
+        page_fields = ["category_id", "points", "description"]
+
+        def desired_fields(entry):
+            fields = {
+                name: value
+                for (name, value) in entry.items()
+                if name in oneupsdk.integration.macros.ONEUP_ACTIVITY_ATTRIBUTES_FORM_RDICT
+                if name not in ["id", "name", "file"]
+            }
+            if entry.get("category") is not None:
+                if entry.get("category") not in category_ids and not dry_run:
+                    raise ValueError("unknown activity category {!r}".format(entry.get("category")))
+                fields["category_id"] = category_ids.get(entry.get("category"), entry.get("category"))
+            return fields
+
+        additions = dict()  # type: _typing.Dict[str, dict]
+        candidates = dict()  # type: _typing.Dict[str, dict]
+        unchanged = []  # type: _typing.List[str]
+
+        for entry in spec.get("activities") or []:
+            name = entry.get("name")
+            try:
+                fields = desired_fields(entry)
+            except ValueError as exc:
+                failed[name] = exc
+                continue
+
+            if name not in existing:
+                additions[name] = fields
+                continue
+
+            # Only the fields that the page does not show require the form
+            activity = existing[name]
+            if all(field in page_fields and _same_field(activity.get(field), value)
+                   for (field, value) in fields.items()):
+                unchanged.append(name)
+                continue
+
+            candidates[name] = fields
+
+        def inspect_activity(name):
+            activity_info = self._get_activity_info(activity_id=existing[name].get("id"), revalidate=True)
+            if activity_info is None:
+                raise oneupsdk.integration.exceptions.OneUpAPIException(
+                    msg="Could not retrieve the form of the activity.", name=name)
+
+            changes = {
+                field: (activity_info.get(field), value)
+                for (field, value) in candidates[name].items()
+                if not _same_field(activity_info.get(field), value)
+            }
+            return (activity_info, changes)
+
+        activity_infos = dict()
+        modified = dict()  # type: _typing.Dict[str, dict]
+        for result in oneupsdk.integration.util.fan_out(
+                func=inspect_activity, items=list(candidates.keys()), max_workers=max_workers):
+            if result.error is not None:
+                failed[result.key] = result.error
+                continue
+
+            (activity_info, changes) = result.value
+            if len(changes) == 0:
+                unchanged.append(result.key)
+                continue
+
+            activity_infos[result.key] = activity_info
+            modified[result.key] = changes
+
+        deletions = []  # type: _typing.List[str]
+        if delete_missing:
+            desired_names = set(entry.get("name") for entry in spec.get("activities") or [])
+            deletions = [name for name in existing if name not in desired_names]
+
+        if dry_run:
+            return ActivitiesSyncReport(
+                categories_added=categories_added, added=list(additions.keys()), modified=modified,
+                deleted=deletions, unchanged=unchanged, failed=failed,
+                categories_failed=categories_failed, dry_run=True)
+
+        def execute(operation):
+            (kind, name) = operation
+
+            if kind == "add":
+                return self.create_activity(name=name, **additions[name])
+
+            if kind == "modify":
+                return self._modify_activity(
+                    activity_info=activity_infos[name],
+                    **{field: value for (field, (_, value)) in modified[name].items()})
+
+            return self.delete_activity(activity_id=existing[name].get("id"))
+
+        operations = (
+            [("add", name) for name in additions] +
+            [("modify", name) for name in modified] +
+            [("delete", name) for name in deletions])
+
+        for result in oneupsdk.integration.util.fan_out(
+                func=execute, items=operations, max_workers=max_workers):
+            (kind, name) = result.key
+
+            error = result.error
+            if error is None and not result.value:
+                error = oneupsdk.integration.exceptions.OneUpAPIException(
+                    msg="The server rejected the operation.", operation=kind, name=name)
+
+            if error is not None:
+                failed[name] = error
+
+        # Check the result against a refetch of the activities page, and of the
+        # forms of the activities with fields that the page does not show
+        if len(operations) > 0:
+            after = dict()
+            for activity in self.get_activities_page(refresh=True).activities:
+                after.setdefault(activity.get("name"), activity)
+
+            def verify(name):
+                if name in additions:
+                    fields = additions[name]
+                else:
+                    fields = {field: value for (field, (_, value)) in modified[name].items()}
+
+                activity = after.get(name)
+                if activity is not None and any(field not in page_fields for field in fields):
+                    activity = self.get_activity_by_id(activity_id=activity.get("id"))
+
+                return activity is not None and all(
+                    _same_field(activity.get(field), value)
+                    for (field, value) in fields.items())
+
+            for result in oneupsdk.integration.util.fan_out(
+                    func=verify,
+                    items=[name for name in list(additions) + list(modified) if name not in failed],
+                    max_workers=max_workers):
+                if result.error is not None:
+                    failed[result.key] = result.error
+                elif not result.value:
+                    failed[result.key] = oneupsdk.integration.exceptions.OneUpAPIException(
+                        msg="The activity does not match the specification after the update.",
+                        name=result.key)
+
+            for name in deletions:
+                if name not in failed and name in after:
+                    failed[name] = oneupsdk.integration.exceptions.OneUpAPIException(
+                        msg="The activity still exists after its deletion.", name=name)
+
+        return ActivitiesSyncReport(
+            categories_added=[name for name in categories_added if name not in categories_failed],
+            added=[name for name in additions if name not in failed],
+            modified={name: changes for (name, changes) in modified.items() if name not in failed},
+            deleted=[name for name in deletions if name not in failed],
+            unchanged=unchanged,
+            failed=failed,
+            categories_failed=categories_failed)
+
+    @_instrumented
+    def get_assigned_points(self, activity_id):
+        # type: (int) -> _typing.Tuple[_typing.Dict[int, str], _typing.Dict[int, str]]
+        """
+        Returns the points and the feedback currently assigned to the students
+        in an activity, as two dictionaries mapping each student ID to their
+        points (as a string, empty if they were not graded) and feedback.
+        """
+        return self._get_assigned_points(activity_id=activity_id)
+
+    def _get_assigned_points(self, activity_id, revalidate=False):
+        # type: (int, bool) -> _typing.Tuple[dict, dict]
+
+        r = self.request(
+            "/oneUp/instructors/activityAssignPointsForm?activityID={}".format(activity_id),
+            revalidate=revalidate)
+        s = self._make_soup(
+            r.content, parse_only=oneupsdk.integration.parsing.STRAINER_ASSIGN_POINTS_FORM)
+
+        # Extract the existing information (as it all must be submitted)
+
+        s_feedback = {
+            int(row.get("name").replace("student_Feedback", "")) : row.text
+            for row in s.find_all("textarea", { "id": "student_feedback" })
+        }
+        s_points = {
+            int(row.get("id").split("_")[0]) : row.get("value")
+            for row in s.find_all("input", { "type": "number" })
+        }
+
+        return (s_points, s_feedback)
+
+    @staticmethod
+    def _resolve_points_data(roster, data, as_dict):
+        # type: (oneupsdk.integration.cache.RosterIndex, _typing.Union[list, dict], bool) -> _typing.Tuple[_typing.List[_typing.Tuple[int, dict]], list]
+
+        # Returns the student ID and new fields of each entry of the data,
+        # along with the students (emails or usernames) missing from the roster
+        resolved = []
+        unresolved = []
+
+        if as_dict:
+            # Data is given as { "username": points }
+
+            for str_id, points in data.items():
+
+                if "@" in str_id:
+                    # Email
+                    student = roster.by_email.get(str_id)
+                else:
+                    # Username
+                    student = roster.by_username.get(str_id)
+
+                if student is None:
+                    unresolved.append(str_id)
+                    continue
+
+                resolved.append((student.get("id"), {"points": points}))
+
+        else:
+            # Data is given as [ { "username": "", "email": "", "feedback": "", "points": 0 }, ... ]
+
+            for record in data:
+
+                # Retrieve ID by order of preference
+                if "id" in record:
+                    record_id = int(record.get("id"))
+
+                elif "email" in record and record.get("email") in roster.by_email:
+                    record_id = roster.by_email[record.get("email")].get("id")
+
+                elif "username" in record and record.get("username") in roster.by_username:
+                    record_id = roster.by_username[record.get("username")].get("id")
+
+                else:
+                    unresolved.append(record.get("email") or record.get("username"))
+                    continue
+
+                resolved.append((record_id, {
+                    name: record[name] for name in ["points", "feedback"] if name in record
+                }))
+
+        return (resolved, unresolved)
+
+    def _points_roster(self, datasets, as_dict):
+        # type: (_typing.Iterable[_typing.Union[list, dict]], bool) -> oneupsdk.integration.cache.RosterIndex
+
+        # Students enrolled since the roster was cached (e.g. by another
+        # client) are missing from it: it is then downloaded again, once
+        cached = self._cached_roster()
+        roster = self.get_roster()
+
+        if roster is cached and any(
+                len(self._resolve_points_data(roster, data, as_dict)[1]) > 0 for data in datasets):
+            roster = self.get_roster(refresh=True)
+
+        return roster
+
+    def _submit_points(self, activity_id, s_ids, s_points, s_feedback):
+        # type: (int, _typing.Iterable[int], dict, dict) -> bool
+
+        # Build payload to be sent
+
+        payload = {
+            "csrfmiddlewaretoken": self.get_csrf_token(),
+            "activityID": "{}".format(activity_id),
+            "submit": "",
+        }
+        for user_id in s_ids:
+            student_payload = {
+                "student_Points{}".format(user_id) : s_points.get(user_id),
+                "student_Feedback{}".format(user_id) : s_feedback.get(user_id),
+            }
+            payload.update(student_payload)
+
+        r = self.request(
+            endpoint="/oneUp/instructors/activityAssignPoints",
+            data=payload)
+
+        return r.status_code in [200, 302]
+
+    def _post_points(self, roster, activity_id, data, as_dict=False, dry_run=False):
+        # type: (oneupsdk.integration.cache.RosterIndex, int, _typing.Union[list, dict], bool, bool) -> PointsReport
+
+        # The diff (and the submitted form) must reflect the current grades,
+        # even if the form was cached moments ago
+        (s_points, s_feedback) = self._get_assigned_points(activity_id=activity_id, revalidate=True)
+        s_ids = list(s_points.keys())
+
+        (old_points, old_feedback) = (dict(s_points), dict(s_feedback))
+
+        # Modify data based on input data (students not in the form, such as
+        # unknown IDs, are reported along with those missing from the roster)
+        (resolved, unresolved) = self._resolve_points_data(roster=roster, data=data, as_dict=as_dict)
+        for (user_id, fields) in resolved:
+            if user_id not in s_points:
+                unresolved.append(user_id)
+                continue
+
+            if "points" in fields:
+                s_points[user_id] = fields["points"]
+            if "feedback" in fields:
+                s_feedback[user_id] = fields["feedback"]
+
+        changes = _compute_points_changes(
+            s_ids=s_ids,
+            old_points=old_points,
+            old_feedback=old_feedback,
+            new_points=s_points,
+            new_feedback=s_feedback)
+
+        # All the points must be submitted together, but only if any changed
+        if dry_run or len(changes) == 0:
+            return PointsReport(
+                activity_id=activity_id, changes=changes, submitted=False,
+                ok=len(unresolved) == 0, unresolved=unresolved)
+
+        ok = self._submit_points(
+            activity_id=activity_id,
+            s_ids=s_ids,
+            s_points=s_points,
+            s_feedback=s_feedback)
+
+        return PointsReport(
+            activity_id=activity_id, changes=changes, submitted=True,
+            ok=ok and len(unresolved) == 0, unresolved=unresolved)
+
+    @_instrumented
+    def post_activity_points(self, activity_id, data, as_dict=False, dry_run=False):
+        # type: (int, _typing.Union[list, dict], bool, bool) -> PointsReport
+        """
+        Assign the points of a given activity for a set of students. The input data
+        can be presented in one of multiple forms: Either as a list of records:
+        ```python
+        [
+            { "username": "oneup_username", "points": 23 },
+            { "email": "student@university.edu", "points": 23 },
+            { "id": 413, "points": 23, "feedback": "Everything good!" },
+            ...
+        ]
+        ```
+        or as a dictionary:
+        ```python
+        {
+            "student@university.edu": 23.5
+        }
+        ```
+        The changes are computed against the points and feedback currently
+        assigned, and nothing is submitted if there are none; otherwise, the
+        points and feedback of every student are submitted (changed or not),
+        as the form expects all of them. Returns a `PointsReport` of the
+        changes (truthy if the operation succeeded); with `dry_run`, the
+        changes are computed but not submitted. Students that are not enrolled
+        in the course are reported as `unresolved`, and fail the operation
+        (the points of the others are still assigned).
+        """
+        if not as_dict:
+            data = list(data)
+
+        return self._post_points(
+            roster=self._points_roster([data], as_dict=as_dict),
+            activity_id=activity_id,
+            data=data,
+            as_dict=as_dict,
+            dry_run=dry_run)
+
+    @_instrumented
+    def post_points_batch(self, data, as_dict=False, max_workers=None, dry_run=False):
+        # type: (_typing.Dict[int, _typing.Union[list, dict]], bool, _typing.Optional[int], bool) -> _typing.Dict[int, PointsReport]
+        """
+        Assign the points of several activities at once. The input data maps
+        each activity ID to the data that would be passed to `post_activity_points`.
+
+        The roster is resolved only once, and the activities are processed
+        concurrently by a pool of `max_workers` threads; activities in which no
+        student's points or feedback would change are not submitted at all.
+        Returns a `PointsReport` for each activity ID; with `dry_run`, the
+        changes are computed but not submitted.
+        """
+        if not as_dict:
+            data = {activity_id: list(records) for (activity_id, records) in data.items()}
+
+        roster = self._points_roster(data.values(), as_dict=as_dict)
+
+        def post_one(activity_id):
+            return self._post_points(
+                roster=roster,
+                activity_id=activity_id,
+                data=data[activity_id],
+                as_dict=as_dict,
+                dry_run=dry_run)
+
+        reports = dict()
+        for result in oneupsdk.integration.util.fan_out(
+                func=post_one,
+                items=list(data.keys()),
+                max_workers=max_workers):
+
+            if result.error is not None:
+                reports[result.key] = PointsReport(
+                    activity_id=result.key, changes=None, submitted=False, ok=False,
+                    error=result.error)
+                continue
+
+            reports[result.key] = result.value
+
+        return reports
+
+    @_instrumented
+    def delete_activity(self, activity_id):
+        # type: (int) -> bool
+
+        """
+        Deletes an activity from the active course.
+        """
+        r = self.request(
+            endpoint="/oneUp/instructors/deleteActivity",
+            data={
+                "activityID": activity_id,
+                "csrfmiddlewaretoken": self.get_csrf_token()
+            })
+
+        self._activities_changed()
+
+        return r.status_code == 200
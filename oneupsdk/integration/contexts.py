@@ -0,0 +1,61 @@
+from __future__ import absolute_import
+
+import threading as _threading
+import typing as _typing
+
+import oneupsdk.integration.api
+import oneupsdk.integration.client
+
+
+class CourseContextPool(object):
+    """
+    Pool of course-bound clients (see `OneUpClient.for_course`), created on
+    first use from a parent `client` (the default client if none is
+    provided), with one client per course.
+
+    Each client holds an authenticated session of its own in which its course
+    is selected, so that the clients of different courses can be used
+    concurrently, from any number of threads, without switching the active
+    course of a shared session back and forth.
+    """
+
+    def __init__(self, client=None):
+        # type: (_typing.Optional[oneupsdk.integration.client.OneUpClient]) -> None
+        self.client = client or oneupsdk.integration.api.get_default_client()
+
+        self._contexts = dict()  # type: _typing.Dict[int, oneupsdk.integration.client.OneUpClient]
+        self._lock = _threading.Lock()
+
+    def get(self, course_id):
+        # type: (int) -> oneupsdk.integration.client.OneUpClient
+        """
+        Returns the client bound to a course, creating it if needed.
+        """
+        with self._lock:
+            context = self._contexts.get(course_id)
+            if context is None:
+                context = self.client.for_course(course_id)
+                self._contexts[course_id] = context
+            return context
+
+    __getitem__ = get
+
+    def __contains__(self, course_id):
+        return course_id in self._contexts
+
+    def __len__(self):
+        return len(self._contexts)
+
+    @property
+    def course_ids(self):
+        # type: () -> _typing.List[int]
+        with self._lock:
+            return list(self._contexts.keys())
+
+    def discard(self, course_id):
+        # type: (int) -> None
+        """
+        Forgets the client bound to a course (its session is left to expire).
+        """
+        with self._lock:
+            self._contexts.pop(course_id, None)
@@ -0,0 +1,247 @@
+from __future__ import absolute_import
+
+import collections as _collections
+import importlib as _importlib
+import typing as _typing
+
+import oneupsdk.integration.api
+import oneupsdk.integration.client
+import oneupsdk.integration.util
+
+
+ROSTER_COLUMNS = [
+    "id",
+    "username",
+    "first",
+    "last",
+    "email",
+    "avatar_link",
+    "last_action",
+]
+
+GRADEBOOK_COLUMNS = [
+    "student_id",
+    "username",
+    "activity_id",
+    "points",
+    "feedback",
+]
+
+# Optional dependencies, by module, with the extra that installs them
+_OPTIONAL_DEPENDENCIES = {
+    "numpy": "numpy",
+    "pyarrow": "arrow",
+    "pandas": "pandas",
+}
+
+
+def _require(module_name):
+    # type: (str) -> _typing.Any
+    try:
+        return _importlib.import_module(module_name)
+    except ImportError:
+        raise ImportError(
+            "{module} is required for this export format, install it with "
+            "`pip install oneupsdk[{extra}]`".format(
+                module=module_name, extra=_OPTIONAL_DEPENDENCIES[module_name]))
+
+
+def _to_points(value):
+    # type: (_typing.Any) -> float
+
+    # Students that were not graded have empty points
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class Table(object):
+    """
+    Columnar table: a dictionary mapping each column name to the list of its
+    values, which can be converted into NumPy arrays, an Arrow table or a
+    pandas DataFrame (if these libraries are installed).
+    """
+
+    def __init__(self, columns):
+        # type: (_typing.Mapping[str, list]) -> None
+        self.columns = _collections.OrderedDict(columns)
+
+    def __len__(self):
+        for values in self.columns.values():
+            return len(values)
+        return 0
+
+    def __getitem__(self, name):
+        # type: (str) -> list
+        return self.columns[name]
+
+    def to_numpy(self):
+        # type: () -> _typing.Dict[str, _typing.Any]
+        numpy = _require("numpy")
+        return _collections.OrderedDict(
+            (name, numpy.asarray(values, dtype=float if name == "points" else None))
+            for (name, values) in self.columns.items())
+
+    def to_arrow(self):
+        # type: () -> _typing.Any
+        pyarrow = _require("pyarrow")
+        return pyarrow.table(self.columns)
+
+    def to_pandas(self):
+        # type: () -> _typing.Any
+        pandas = _require("pandas")
+        return pandas.DataFrame(self.columns)
+
+
+class Gradebook(object):
+    """
+    Points and feedback of the students of a course in its activities, as
+    matrices with one row per student (`student_ids`, with their `usernames`)
+    and one column per activity (`activity_ids`). Missing points are `nan`.
+    The activities whose points could not be retrieved are left out, and
+    their errors are reported in `errors` (by activity ID).
+    """
+
+    def __init__(self, student_ids, usernames, activity_ids, points, feedback, errors=None):
+        # type: (_typing.List[int], _typing.List[_typing.Optional[str]], _typing.List[int], _typing.List[_typing.List[float]], _typing.List[_typing.List[str]], _typing.Optional[_typing.Dict[int, Exception]]) -> None
+        self.student_ids = student_ids
+        self.usernames = usernames
+        self.activity_ids = activity_ids
+        self.points = points
+        self.feedback = feedback
+        self.errors = errors or dict()
+
+    @property
+    def shape(self):
+        # type: () -> _typing.Tuple[int, int]
+        return (len(self.student_ids), len(self.activity_ids))
+
+    def to_table(self):
+        # type: () -> Table
+        """
+        Returns the gradebook in long format, with one row per student and
+        activity (see `GRADEBOOK_COLUMNS`).
+        """
+        columns = _collections.OrderedDict((name, []) for name in GRADEBOOK_COLUMNS)
+
+        for (i, student_id) in enumerate(self.student_ids):
+            for (j, activity_id) in enumerate(self.activity_ids):
+                columns["student_id"].append(student_id)
+                columns["username"].append(self.usernames[i])
+                columns["activity_id"].append(activity_id)
+                columns["points"].append(self.points[i][j])
+                columns["feedback"].append(self.feedback[i][j])
+
+        return Table(columns)
+
+    def to_numpy(self):
+        # type: () -> _typing.Dict[str, _typing.Any]
+        """
+        Returns the gradebook as NumPy arrays: the `points` (as floats) and
+        `feedback` matrices, and the `student_ids` and `activity_ids` of their
+        rows and columns.
+        """
+        numpy = _require("numpy")
+        return {
+            "student_ids": numpy.asarray(self.student_ids, dtype=numpy.int64),
+            "activity_ids": numpy.asarray(self.activity_ids, dtype=numpy.int64),
+            "points": numpy.asarray(self.points, dtype=float).reshape(self.shape),
+            "feedback": numpy.asarray(self.feedback, dtype=object).reshape(self.shape),
+        }
+
+    def to_arrow(self):
+        # type: () -> _typing.Any
+        """
+        Returns the gradebook as an Arrow table, in long format.
+        """
+        return self.to_table().to_arrow()
+
+    def to_pandas(self, values="points"):
+        # type: (str) -> _typing.Any
+        """
+        Returns the `points` (or `feedback`) of the gradebook as a pandas
+        DataFrame indexed by student ID, with one column per activity ID.
+        """
+        pandas = _require("pandas")
+
+        if values not in ["points", "feedback"]:
+            raise ValueError("values must be 'points' or 'feedback', not {!r}".format(values))
+
+        return pandas.DataFrame(
+            getattr(self, values),
+            index=pandas.Index(self.student_ids, name="student_id"),
+            columns=pandas.Index(self.activity_ids, name="activity_id"))
+
+
+def get_roster_table(client=None, refresh=False):
+    # type: (_typing.Optional[oneupsdk.integration.client.OneUpClient], bool) -> Table
+    """
+    Returns the roster of the active course as a columnar `Table` (see
+    `ROSTER_COLUMNS`), sorted by student ID.
+    """
+    client = client or oneupsdk.integration.api.get_default_client()
+
+    students = sorted(client.get_roster(refresh=refresh).students, key=lambda student: student.id)
+
+    return Table(_collections.OrderedDict(
+        (name, [getattr(student, name) for student in students])
+        for name in ROSTER_COLUMNS))
+
+
+def get_gradebook(client=None, activity_ids=None, max_workers=None):
+    # type: (_typing.Optional[oneupsdk.integration.client.OneUpClient], _typing.Optional[_typing.Iterable[int]], _typing.Optional[int]) -> Gradebook
+    """
+    Returns the `Gradebook` of the active course, for the provided activities
+    (by default, all of them). The points forms of the activities are fetched
+    concurrently by a pool of `max_workers` threads.
+    """
+    client = client or oneupsdk.integration.api.get_default_client()
+
+    if activity_ids is None:
+        activity_ids = [activity.id for activity in client.get_activities_page().activities]
+
+    # The activity IDs are iterated over more than once
+    activity_ids = list(activity_ids)
+
+    forms = dict()
+    errors = dict()
+    for result in oneupsdk.integration.util.fan_out(
+            func=client.get_assigned_points,
+            items=activity_ids,
+            max_workers=max_workers):
+        if result.error is not None:
+            errors[result.key] = result.error
+            continue
+        forms[result.key] = result.value
+
+    activity_ids = [activity_id for activity_id in activity_ids if activity_id in forms]
+
+    # Students are those of the roster, and any other student with points
+    roster = client.get_roster()
+    student_ids = set(student.id for student in roster.students)
+    for (s_points, _) in forms.values():
+        student_ids.update(s_points.keys())
+    student_ids = sorted(student_ids)
+
+    usernames = []
+    for student_id in student_ids:
+        student = roster.get(id=student_id)
+        usernames.append(None if student is None else student.username)
+
+    points = [
+        [_to_points(forms[activity_id][0].get(student_id)) for activity_id in activity_ids]
+        for student_id in student_ids
+    ]
+    feedback = [
+        [forms[activity_id][1].get(student_id) or "" for activity_id in activity_ids]
+        for student_id in student_ids
+    ]
+
+    return Gradebook(
+        student_ids=student_ids,
+        usernames=usernames,
+        activity_ids=activity_ids,
+        points=points,
+        feedback=feedback,
+        errors=errors)
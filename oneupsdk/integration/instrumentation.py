@@ -0,0 +1,610 @@
+from __future__ import absolute_import
+
+import bisect as _bisect
+import collections as _collections
+import contextvars as _contextvars
+import functools as _functools
+import importlib as _importlib
+import threading as _threading
+import time as _time
+import types as _types
+import typing as _typing
+
+
+# Upper bounds (in seconds) of the buckets of the latency histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Reasons for which a request is made besides a plain call
+REASON_LOGIN = "login"
+REASON_REDIRECT = "redirect"
+REASON_REPLAY = "replay"
+
+# Macro call in progress in the current thread (or task), if any
+_current_macro = _contextvars.ContextVar("oneupsdk_current_macro", default=None)
+
+
+###############################################################################
+# EVENTS
+###############################################################################
+
+class MacroEvent(object):
+    """
+    A call to a macro (a public method of `OneUpClient`), which lasts until it
+    returns or, for macros that return an iterator, until that iterator is
+    exhausted or closed. Macros called by another macro have a `parent`,
+    and are attributed to the outermost call (their `root`).
+    """
+
+    __slots__ = ("name", "parent", "started_at", "elapsed", "error")
+
+    def __init__(self, name, parent=None):
+        # type: (str, _typing.Optional[MacroEvent]) -> None
+        self.name = name
+        self.parent = parent
+        self.started_at = _time.perf_counter()
+        self.elapsed = None  # type: _typing.Optional[float]
+        self.error = None  # type: _typing.Optional[BaseException]
+
+    @property
+    def root(self):
+        # type: () -> MacroEvent
+        event = self
+        while event.parent is not None:
+            event = event.parent
+        return event
+
+    @property
+    def path(self):
+        # type: () -> _typing.List[str]
+        """
+        Names of the macros from the outermost call down to this one.
+        """
+        names = []
+        event = self
+        while event is not None:
+            names.append(event.name)
+            event = event.parent
+        return names[::-1]
+
+
+class RequestEvent(object):
+    """
+    A request sent to the OneUp platform: its `method`, `url` and `endpoint`
+    (the path of the URL), the `macro` call that made it (if any), and the
+    `reason` it was made for besides a plain call (`"login"`, `"redirect"`
+    when it follows a redirect to the URL with a trailing slash, or
+    `"replay"` when it is replayed after logging in again). Once a response
+    is received, its `status_code`, the `elapsed` time and the number of
+    bytes sent and received are filled in (or the `error` raised).
+    """
+
+    __slots__ = ("method", "url", "endpoint", "reason", "macro", "started_at", "elapsed",
+                 "status_code", "request_bytes", "response_bytes", "error")
+
+    def __init__(self, method, url, endpoint, reason=None, macro=None):
+        # type: (str, str, str, _typing.Optional[str], _typing.Optional[MacroEvent]) -> None
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        self.reason = reason
+        self.macro = macro
+        self.started_at = _time.perf_counter()
+        self.elapsed = None  # type: _typing.Optional[float]
+        self.status_code = None  # type: _typing.Optional[int]
+        self.request_bytes = None  # type: _typing.Optional[int]
+        self.response_bytes = None  # type: _typing.Optional[int]
+        self.error = None  # type: _typing.Optional[BaseException]
+
+
+class ParseEvent(object):
+    """
+    The parsing of (part of) an HTML page of `size` bytes with a `parser`
+    backend, on behalf of a `macro` call (if any).
+    """
+
+    __slots__ = ("parser", "size", "macro", "started_at", "elapsed")
+
+    def __init__(self, parser, size, macro=None):
+        # type: (str, _typing.Optional[int], _typing.Optional[MacroEvent]) -> None
+        self.parser = parser
+        self.size = size
+        self.macro = macro
+        self.started_at = _time.perf_counter()
+        self.elapsed = None  # type: _typing.Optional[float]
+
+
+def _macro_name(event):
+    # type: (_typing.Union[RequestEvent, ParseEvent]) -> _typing.Optional[str]
+    return None if event.macro is None else event.macro.root.name
+
+
+def _body_size(body):
+    # type: (_typing.Any) -> _typing.Optional[int]
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, bytes):
+        return len(body)
+    return None
+
+
+###############################################################################
+# OBSERVERS
+###############################################################################
+
+class Observer(object):
+    """
+    Base class of the observers of a client's activity: each method is called
+    with the corresponding event (the same event object is given to the
+    `*_start` and `*_end` methods), and does nothing unless overridden.
+    Observers are called synchronously, from the threads that make the
+    calls, and must therefore be thread-safe and fast.
+    """
+
+    def macro_start(self, event):
+        # type: (MacroEvent) -> None
+        pass
+
+    def macro_end(self, event):
+        # type: (MacroEvent) -> None
+        pass
+
+    def before_request(self, event):
+        # type: (RequestEvent) -> None
+        pass
+
+    def after_response(self, event):
+        # type: (RequestEvent) -> None
+        pass
+
+    def parse_start(self, event):
+        # type: (ParseEvent) -> None
+        pass
+
+    def parse_end(self, event):
+        # type: (ParseEvent) -> None
+        pass
+
+
+class Histogram(object):
+    """
+    Histogram of observed values, with a cumulative `count` and `sum`, and the
+    number of values in each bucket (the last bucket holds the values above
+    the largest bound).
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        # type: (_typing.Sequence[float]) -> None
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        # type: (float) -> None
+        self.counts[_bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self):
+        # type: () -> _typing.Optional[float]
+        return self.sum / self.count if self.count > 0 else None
+
+    def to_dict(self):
+        # type: () -> dict
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": [[bound, count] for (bound, count) in zip(self.bounds + (None,), self.counts)],
+        }
+
+
+class _EndpointMetrics(object):
+
+    __slots__ = ("requests", "errors", "redirects", "replays", "bytes_sent", "bytes_received",
+                 "statuses", "latency")
+
+    def __init__(self, bounds):
+        self.requests = 0
+        self.errors = 0
+        self.redirects = 0
+        self.replays = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.statuses = _collections.Counter()
+        self.latency = Histogram(bounds)
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "redirects": self.redirects,
+            "replays": self.replays,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "statuses": dict(self.statuses),
+            "latency": self.latency.to_dict(),
+        }
+
+
+class _MacroMetrics(object):
+
+    __slots__ = ("calls", "errors", "requests", "endpoints", "bytes_received", "latency",
+                 "request_time", "parse_time")
+
+    def __init__(self, bounds):
+        self.calls = 0
+        self.errors = 0
+        self.requests = 0
+        self.endpoints = _collections.Counter()
+        self.bytes_received = 0
+        self.latency = Histogram(bounds)
+        self.request_time = Histogram(bounds)
+        self.parse_time = Histogram(bounds)
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "requests": self.requests,
+            "requests_per_call": self.requests / float(self.calls) if self.calls > 0 else None,
+            "endpoints": dict(self.endpoints),
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.to_dict(),
+            "request_time": self.request_time.to_dict(),
+            "parse_time": self.parse_time.to_dict(),
+        }
+
+
+class Metrics(Observer):
+    """
+    Observer that keeps counters and latency histograms of the requests made,
+    by endpoint, and of the macro calls, by macro (with the requests that
+    each macro made, by endpoint, and the time spent waiting on requests and
+    parsing pages). Macros called by other macros are accounted for in the
+    outermost call, and requests made outside of any macro (for instance,
+    with `request`) are attributed to the macro `None`.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        # type: (_typing.Sequence[float]) -> None
+        self.buckets = tuple(buckets)
+        self._lock = _threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # type: () -> None
+        with self._lock:
+            self._endpoints = dict()  # type: _typing.Dict[str, _EndpointMetrics]
+            self._macros = dict()  # type: _typing.Dict[_typing.Optional[str], _MacroMetrics]
+
+    def _endpoint(self, endpoint):
+        # type: (str) -> _EndpointMetrics
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = _EndpointMetrics(self.buckets)
+        return metrics
+
+    def _macro(self, name):
+        # type: (_typing.Optional[str]) -> _MacroMetrics
+        metrics = self._macros.get(name)
+        if metrics is None:
+            metrics = self._macros[name] = _MacroMetrics(self.buckets)
+        return metrics
+
+    def macro_end(self, event):
+        # type: (MacroEvent) -> None
+
+        # Nested calls are accounted for in the call that made them
+        if event.parent is not None:
+            return
+
+        with self._lock:
+            metrics = self._macro(event.name)
+            metrics.calls += 1
+            metrics.latency.observe(event.elapsed)
+            if event.error is not None:
+                metrics.errors += 1
+
+    def after_response(self, event):
+        # type: (RequestEvent) -> None
+        with self._lock:
+            endpoint = self._endpoint(event.endpoint)
+            macro = self._macro(_macro_name(event))
+
+            endpoint.requests += 1
+            endpoint.latency.observe(event.elapsed)
+            endpoint.bytes_sent += event.request_bytes or 0
+            endpoint.bytes_received += event.response_bytes or 0
+
+            if event.error is not None:
+                endpoint.errors += 1
+            else:
+                endpoint.statuses[event.status_code] += 1
+
+            if event.reason == REASON_REDIRECT:
+                endpoint.redirects += 1
+            elif event.reason == REASON_REPLAY:
+                endpoint.replays += 1
+
+            macro.requests += 1
+            macro.endpoints[event.endpoint] += 1
+            macro.bytes_received += event.response_bytes or 0
+            macro.request_time.observe(event.elapsed)
+
+    def parse_end(self, event):
+        # type: (ParseEvent) -> None
+        with self._lock:
+            self._macro(_macro_name(event)).parse_time.observe(event.elapsed)
+
+    def requests_per_call(self, macro):
+        # type: (str) -> _typing.Optional[float]
+        """
+        Returns the average number of requests made by each call to a macro.
+        """
+        with self._lock:
+            metrics = self._macros.get(macro)
+            if metrics is None or metrics.calls == 0:
+                return None
+            return metrics.requests / float(metrics.calls)
+
+    def snapshot(self):
+        # type: () -> dict
+        """
+        Returns a copy of all the metrics, by `endpoint` and by `macro`.
+        """
+        with self._lock:
+            return {
+                "endpoints": {
+                    endpoint: metrics.to_dict()
+                    for (endpoint, metrics) in self._endpoints.items()
+                },
+                "macros": {
+                    name: metrics.to_dict()
+                    for (name, metrics) in self._macros.items()
+                },
+            }
+
+
+class SpanEmitter(Observer):
+    """
+    Observer that emits OpenTelemetry spans: one span per macro call, with a
+    child span for each request it made and each page it parsed. Spans are
+    created with the provided `tracer` (by default, the tracer of the global
+    tracer provider), and require the `opentelemetry-api` package (which
+    `pip install oneupsdk[otel]` installs).
+    """
+
+    def __init__(self, tracer=None):
+        # type: (_typing.Any) -> None
+        try:
+            self._trace = _importlib.import_module("opentelemetry.trace")
+        except ImportError:
+            raise ImportError(
+                "opentelemetry-api is required to emit spans, install it with "
+                "`pip install oneupsdk[otel]`")
+
+        self.tracer = tracer or self._trace.get_tracer("oneupsdk")
+        self._spans = dict()  # type: _typing.Dict[int, _typing.Any]
+
+    def _start(self, event, name, attributes):
+        # type: (_typing.Any, str, dict) -> None
+
+        # Spans of requests, parsing and nested macro calls are children of
+        # the span of the macro call that made them
+        context = None
+        macro = event.parent if isinstance(event, MacroEvent) else event.macro
+        if macro is not None and id(macro) in self._spans:
+            context = self._trace.set_span_in_context(self._spans[id(macro)])
+
+        self._spans[id(event)] = self.tracer.start_span(
+            name, context=context, attributes=attributes)
+
+    def _end(self, event, attributes=None, error=None):
+        # type: (_typing.Any, _typing.Optional[dict], _typing.Optional[BaseException]) -> None
+        span = self._spans.pop(id(event), None)
+        if span is None:
+            return
+
+        for (key, value) in (attributes or dict()).items():
+            if value is not None:
+                span.set_attribute(key, value)
+
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(error)))
+
+        span.end()
+
+    def macro_start(self, event):
+        # type: (MacroEvent) -> None
+        self._start(event, "oneup.{}".format(event.name), {"oneup.macro": event.name})
+
+    def macro_end(self, event):
+        # type: (MacroEvent) -> None
+        self._end(event, error=event.error)
+
+    def before_request(self, event):
+        # type: (RequestEvent) -> None
+        attributes = {
+            "http.request.method": event.method,
+            "url.full": event.url,
+            "url.path": event.endpoint,
+        }
+        if event.reason is not None:
+            attributes["oneup.reason"] = event.reason
+        self._start(event, "{} {}".format(event.method, event.endpoint), attributes)
+
+    def after_response(self, event):
+        # type: (RequestEvent) -> None
+        self._end(event, attributes={
+            "http.response.status_code": event.status_code,
+            "http.request.body.size": event.request_bytes,
+            "http.response.body.size": event.response_bytes,
+        }, error=event.error)
+
+    def parse_start(self, event):
+        # type: (ParseEvent) -> None
+        attributes = {"oneup.parser": event.parser}
+        if event.size is not None:
+            attributes["oneup.parse.size"] = event.size
+        self._start(event, "oneup.parse", attributes)
+
+    def parse_end(self, event):
+        # type: (ParseEvent) -> None
+        self._end(event)
+
+
+###############################################################################
+# DISPATCH
+###############################################################################
+
+class Instrumentation(object):
+    """
+    Dispatches the events of a client (see `OneUpClient.instrumentation`) to
+    its `observers`, for instance a `Metrics` observer and a `SpanEmitter`.
+    Clients without instrumentation (the default) do not create any event.
+    """
+
+    def __init__(self, observers=None):
+        # type: (_typing.Optional[_typing.Iterable[Observer]]) -> None
+        self.observers = tuple(observers or ())
+        self._lock = _threading.Lock()
+
+    def add(self, observer):
+        # type: (Observer) -> Observer
+        with self._lock:
+            self.observers = self.observers + (observer,)
+        return observer
+
+    def remove(self, observer):
+        # type: (Observer) -> None
+        with self._lock:
+            self.observers = tuple(o for o in self.observers if o is not observer)
+
+    # Macros
+
+    def macro_started(self, name, parent=None):
+        # type: (str, _typing.Optional[MacroEvent]) -> MacroEvent
+        event = MacroEvent(name, parent=parent)
+        for observer in self.observers:
+            observer.macro_start(event)
+        return event
+
+    def macro_finished(self, event, error=None):
+        # type: (MacroEvent, _typing.Optional[BaseException]) -> None
+        event.elapsed = _time.perf_counter() - event.started_at
+        event.error = error
+        for observer in self.observers:
+            observer.macro_end(event)
+
+    def call(self, name, func, args=(), kwargs=None):
+        # type: (str, _typing.Callable, tuple, _typing.Optional[dict]) -> _typing.Any
+        """
+        Calls `func(*args, **kwargs)` as the macro `name`: the requests it
+        makes and the pages it parses (including in the threads it fans out
+        to) are attributed to it. Calls to other macros that it makes are
+        reported as nested calls (with a `parent`).
+        """
+        event = self.macro_started(name, parent=_current_macro.get())
+        token = _current_macro.set(event)
+        try:
+            result = func(*args, **(kwargs or dict()))
+        except BaseException as exc:
+            self.macro_finished(event, error=exc)
+            raise
+        finally:
+            _current_macro.reset(token)
+
+        if isinstance(result, _types.GeneratorType):
+            return self._traced_generator(event, result)
+
+        self.macro_finished(event)
+        return result
+
+    def _traced_generator(self, event, generator):
+        # type: (MacroEvent, _typing.Iterator) -> _typing.Iterator
+        error = None
+        try:
+            while True:
+                token = _current_macro.set(event)
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    _current_macro.reset(token)
+                yield item
+
+        except BaseException as exc:
+            error = exc
+            raise
+
+        finally:
+            generator.close()
+            self.macro_finished(event, error=None if isinstance(error, GeneratorExit) else error)
+
+    # Requests
+
+    def request_started(self, method, url, endpoint, reason=None):
+        # type: (str, str, str, _typing.Optional[str]) -> RequestEvent
+        event = RequestEvent(method, url, endpoint, reason=reason, macro=_current_macro.get())
+        for observer in self.observers:
+            observer.before_request(event)
+        return event
+
+    def request_finished(self, event, response=None, error=None, stream=False):
+        # type: (RequestEvent, _typing.Any, _typing.Optional[BaseException], bool) -> None
+        event.elapsed = _time.perf_counter() - event.started_at
+        event.error = error
+
+        if response is not None:
+            event.status_code = response.status_code
+            event.request_bytes = _body_size(getattr(getattr(response, "request", None), "body", None))
+
+            # The body of a streamed response has not been downloaded yet
+            if stream:
+                try:
+                    event.response_bytes = int(response.headers.get("Content-Length"))
+                except (TypeError, ValueError):
+                    event.response_bytes = None
+            else:
+                event.response_bytes = len(response.content or b"")
+
+        for observer in self.observers:
+            observer.after_response(event)
+
+    # Parsing
+
+    def parse_started(self, parser, size=None):
+        # type: (str, _typing.Optional[int]) -> ParseEvent
+        event = ParseEvent(parser, size, macro=_current_macro.get())
+        for observer in self.observers:
+            observer.parse_start(event)
+        return event
+
+    def parse_finished(self, event):
+        # type: (ParseEvent) -> None
+        event.elapsed = _time.perf_counter() - event.started_at
+        for observer in self.observers:
+            observer.parse_end(event)
+
+
+def instrumented(method):
+    # type: (_typing.Callable) -> _typing.Callable
+    """
+    Decorates a method of `OneUpClient` to report its calls as macro calls to
+    the client's instrumentation, if any.
+    """
+    @_functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.instrumentation is None:
+            return method(self, *args, **kwargs)
+        return self.instrumentation.call(method.__name__, method, (self,) + args, kwargs)
+
+    return wrapper
+
@@ -0,0 +1,202 @@
+from __future__ import absolute_import
+
+import collections as _collections
+import concurrent.futures as _futures
+import pickle as _pickle
+import time as _time
+import typing as _typing
+
+import oneupsdk.integration.api
+import oneupsdk.integration.client
+import oneupsdk.integration.contexts
+import oneupsdk.integration.sessions
+import oneupsdk.integration.util
+
+
+class CourseResult(_collections.namedtuple("CourseResult", ["course_id", "value", "error", "elapsed"])):
+    """
+    Outcome of the task run for a course: the `value` it returned or the
+    `error` it raised, and the time it took (`elapsed`, in seconds).
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        # type: () -> bool
+        return self.error is None
+
+
+class CourseRunReport(object):
+    """
+    Outcome of a task run for several courses: the `results` of the courses
+    (in order of completion), and the total time taken (`elapsed`, in
+    seconds). The report is truthy if the task succeeded for every course.
+    """
+
+    def __init__(self, results, elapsed):
+        # type: (_typing.List[CourseResult], float) -> None
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self):
+        # type: () -> _typing.Dict[int, _typing.Any]
+        return {r.course_id: r.value for r in self.results if r.ok}
+
+    @property
+    def failed(self):
+        # type: () -> _typing.Dict[int, Exception]
+        return {r.course_id: r.error for r in self.results if not r.ok}
+
+    def __bool__(self):
+        return len(self.failed) == 0
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return "CourseRunReport(succeeded={!r}, failed={!r}, elapsed={:.3f})".format(
+            sorted(self.succeeded), sorted(self.failed), self.elapsed)
+
+
+def _course_id(course):
+    # type: (_typing.Union[int, tuple]) -> int
+
+    # Courses can be given by ID, or as returned by `get_instructor_courses`
+    if isinstance(course, (tuple, list)):
+        return course[0]
+    return course
+
+
+def _timed(task, client, course_id):
+    # type: (_typing.Callable, oneupsdk.integration.client.OneUpClient, int) -> CourseResult
+    started_at = _time.perf_counter()
+    try:
+        value = task(client, course_id)
+    except Exception as exc:
+        return CourseResult(course_id=course_id, value=None, error=exc,
+                            elapsed=_time.perf_counter() - started_at)
+
+    return CourseResult(course_id=course_id, value=value, error=None,
+                        elapsed=_time.perf_counter() - started_at)
+
+
+###############################################################################
+# PROCESS WORKERS
+###############################################################################
+
+# Course-bound clients of a worker process, reused across the tasks it runs
+_process_clients = dict()  # type: _typing.Dict[tuple, oneupsdk.integration.client.OneUpClient]
+
+
+def _client_settings(client):
+    # type: (oneupsdk.integration.client.OneUpClient) -> dict
+
+    # Clients cannot be sent to other processes, only what is needed to
+    # recreate them (sessions can be shared through a session file)
+    session_file = None
+    if isinstance(client.session_store, oneupsdk.integration.sessions.FileSessionStore):
+        session_file = client.session_store.path
+
+    return {
+        "username": client.username,
+        "password": client.password,
+        "base_url": client.base_url,
+        "cache_ttl": client.cache_ttl,
+        "parser": client.parser,
+        "session_file": session_file,
+    }
+
+
+def _run_in_process(settings, task, course_id):
+    # type: (dict, _typing.Callable, int) -> CourseResult
+    key = tuple(sorted(settings.items())) + (course_id,)
+
+    client = _process_clients.get(key)
+    if client is None:
+        settings = dict(settings)
+        session_file = settings.pop("session_file")
+        client = oneupsdk.integration.client.OneUpClient(
+            session_store=(None if session_file is None
+                           else oneupsdk.integration.sessions.FileSessionStore(session_file)),
+            course_id=course_id,
+            **settings)
+        _process_clients[key] = client
+
+    result = _timed(task, client, course_id)
+
+    # Results are sent back to the parent process, but not all exceptions
+    # survive pickling (for instance, those with keyword-only constructors)
+    try:
+        _pickle.loads(_pickle.dumps(result.error))
+    except Exception:
+        result = result._replace(error=RuntimeError("{}: {}".format(
+            type(result.error).__name__, result.error)))
+
+    return result
+
+
+###############################################################################
+# ORCHESTRATION
+###############################################################################
+
+def run_courses(task, courses=None, client=None, max_workers=None, processes=False):
+    # type: (_typing.Callable, _typing.Optional[_typing.Iterable], _typing.Optional[oneupsdk.integration.client.OneUpClient], _typing.Optional[int], bool) -> _typing.Iterator[CourseResult]
+    """
+    Runs `task(course_client, course_id)` for each course, concurrently, and
+    yields a `CourseResult` for each course as soon as its task completes. An
+    exception raised by the task of one course is reported in its result
+    rather than aborting the others.
+
+    Courses are given by ID, or as returned by `get_instructor_courses` (by
+    default, all the courses of the instructor). Each task is given a client
+    bound to its course (see `OneUpClient.for_course`), created from `client`
+    (by default, the default client), so that tasks for different courses
+    never switch the active course of a shared session.
+
+    At most `max_workers` courses (by default `DEFAULT_MAX_WORKERS`) are
+    processed at once, in threads or, if `processes` is set, in worker
+    processes. In the latter case, `task` must be a module-level function and
+    its return values must be picklable; sessions are shared with the workers
+    only if the client uses a `FileSessionStore`.
+    """
+    client = client or oneupsdk.integration.api.get_default_client()
+
+    if courses is None:
+        courses = client.get_instructor_courses()
+
+    course_ids = list(map(_course_id, courses))
+    max_workers = max_workers or oneupsdk.integration.util.DEFAULT_MAX_WORKERS
+
+    if processes:
+        settings = _client_settings(client)
+        executor = _futures.ProcessPoolExecutor(max_workers=max_workers)
+        submit = lambda course_id: executor.submit(_run_in_process, settings, task, course_id)
+    else:
+        pool = oneupsdk.integration.contexts.CourseContextPool(client)
+        executor = _futures.ThreadPoolExecutor(max_workers=max_workers)
+        submit = lambda course_id: executor.submit(_timed, task, pool.get(course_id), course_id)
+
+    with executor:
+        futures = {submit(course_id): course_id for course_id in course_ids}
+
+        for future in _futures.as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as exc:
+                # The worker itself failed (for instance, a process crashed)
+                yield CourseResult(course_id=futures[future], value=None, error=exc, elapsed=None)
+
+
+def run_courses_report(task, courses=None, client=None, max_workers=None, processes=False):
+    # type: (_typing.Callable, _typing.Optional[_typing.Iterable], _typing.Optional[oneupsdk.integration.client.OneUpClient], _typing.Optional[int], bool) -> CourseRunReport
+    """
+    Same as `run_courses`, but waits for all the courses and returns a
+    `CourseRunReport` of the successes and failures.
+    """
+    started_at = _time.perf_counter()
+
+    results = list(run_courses(
+        task=task, courses=courses, client=client, max_workers=max_workers, processes=processes))
+
+    return CourseRunReport(results=results, elapsed=_time.perf_counter() - started_at)
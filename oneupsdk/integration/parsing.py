@@ -0,0 +1,238 @@
+from __future__ import absolute_import
+
+import typing as _typing
+
+import bs4 as _bs4
+import six as _six
+
+
+PARSER_AUTO = "auto"
+
+PARSER_BACKENDS = [
+    "lxml",
+    "html5lib",
+    "html.parser",
+]
+
+# Targeted extraction: the only parts of each OneUp page that the macros need,
+# so that the parser does not build a tree for the rest of the page
+
+STRAINER_LOGIN_FORM = _bs4.SoupStrainer("input", attrs={"name": "csrfmiddlewaretoken"})
+STRAINER_TABLES = _bs4.SoupStrainer("table")
+STRAINER_STUDENT_FORM = _bs4.SoupStrainer("form", attrs={"id": "createStudentForm"})
+STRAINER_ACTIVITY_FORM = _bs4.SoupStrainer("form", attrs={"id": "actForm"})
+STRAINER_ACTIVITIES_PAGE = _bs4.SoupStrainer(["select", "ul"])
+STRAINER_ASSIGN_POINTS_FORM = _bs4.SoupStrainer(["input", "textarea"])
+
+_resolved_auto_backend = None
+
+
+def _is_available(backend):
+    # type: (str) -> bool
+    try:
+        _bs4.BeautifulSoup("", features=backend)
+    except _bs4.FeatureNotFound:
+        return False
+    return True
+
+
+def resolve_backend(backend=None):
+    # type: (_typing.Optional[str]) -> str
+    """
+    Returns the name of the BeautifulSoup tree builder to use for the
+    requested parser backend: `"auto"` (or `None`) selects the fastest
+    installed backend, `lxml` if available, and `html.parser` otherwise.
+    """
+    global _resolved_auto_backend
+
+    if backend is not None and backend != PARSER_AUTO:
+        if backend not in PARSER_BACKENDS:
+            raise ValueError("unknown parser backend {!r} (expected one of: {})".format(
+                backend, ", ".join([PARSER_AUTO] + PARSER_BACKENDS)))
+        return backend
+
+    if _resolved_auto_backend is None:
+        _resolved_auto_backend = "lxml" if _is_available("lxml") else "html.parser"
+
+    return _resolved_auto_backend
+
+
+def make_soup(content, parse_only=None, backend=None):
+    # type: (_typing.Union[bytes, str], _typing.Optional[_bs4.SoupStrainer], _typing.Optional[str]) -> _bs4.BeautifulSoup
+    """
+    Parses an HTML page with the selected parser backend. If a `parse_only`
+    strainer is provided, only the matching elements (and their contents) are
+    built into the tree.
+    """
+    features = resolve_backend(backend)
+
+    # html5lib does not support partial parsing
+    if features == "html5lib":
+        parse_only = None
+
+    return _bs4.BeautifulSoup(content, features=features, parse_only=parse_only)
+
+
+class StudentListParser(_six.moves.html_parser.HTMLParser):
+    """
+    Incremental parser for the student list page (`createStudentList`).
+
+    Chunks of the page are passed to `feed()` as they are downloaded, and the
+    record of each student is made available (through `pop_records()`) as soon
+    as the closing tag of its table row has been parsed, so that the page never
+    needs to be held in memory. Records are built exactly as they are by
+    `get_enrolled_students`, from the table whose first header is `header_query`.
+    """
+
+    def __init__(self, captions, header_query="Avatar"):
+        # type: (_typing.Dict[str, str], str) -> None
+        _six.moves.html_parser.HTMLParser.__init__(self, convert_charrefs=True)
+
+        self.captions = captions
+        self.header_query = header_query.strip().lower()
+
+        self.records = []  # type: _typing.List[dict]
+        self.done = False
+
+        # Stack of the open tables, with whether they have been identified
+        # (by their first header cell) as the student table
+        self._tables = []  # type: _typing.List[dict]
+        self._target_depth = None  # type: _typing.Optional[int]
+
+        self._headers = None  # type: _typing.Optional[list]
+        self._row = None  # type: _typing.Optional[dict]
+        self._cell = None  # type: _typing.Optional[dict]
+        self._th_text = None  # type: _typing.Optional[list]
+
+    def pop_records(self):
+        # type: () -> _typing.List[dict]
+        records = self.records
+        self.records = []
+        return records
+
+    def _in_target(self):
+        # type: () -> bool
+        return self._target_depth is not None and len(self._tables) == self._target_depth
+
+    def _in_candidate(self):
+        # type: () -> bool
+
+        # Rows are collected in the student table, and in a table that has not
+        # been identified yet (as its header row precedes its first header cell)
+        if self._target_depth is None:
+            return len(self._tables) > 0 and not self._tables[-1]["checked"]
+        return self._in_target()
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+
+        if tag == "table":
+            self._tables.append({"checked": False})
+            return
+
+        if tag == "th":
+            self._th_text = []
+
+        if not self._in_candidate():
+            return
+
+        if tag == "tr":
+            self._end_row()
+            self._row = {"ths": [], "cells": [], "inputs": {}}
+
+        elif tag == "td" and self._row is not None:
+            self._end_cell()
+            self._cell = {"text": [], "img": None}
+
+        elif tag == "img" and self._cell is not None and self._cell["img"] is None:
+            self._cell["img"] = dict(attrs).get("src")
+
+        elif tag == "input" and self._row is not None:
+            attrs = dict(attrs)
+            self._row["inputs"].setdefault(attrs.get("name"), attrs.get("value"))
+
+    def handle_data(self, data):
+        if self._th_text is not None:
+            self._th_text.append(data)
+
+        if self._cell is not None:
+            self._cell["text"].append(data)
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+
+        if tag == "th" and self._th_text is not None:
+            text = "".join(self._th_text)
+            self._th_text = None
+
+            # Identify the tables whose first header cell this is
+            for table in self._tables:
+                if not table["checked"]:
+                    table["checked"] = True
+                    if self._target_depth is None and text.strip().lower() == self.header_query:
+                        self._target_depth = self._tables.index(table) + 1
+
+            if self._in_candidate() and self._row is not None:
+                self._row["ths"].append(text)
+
+        elif tag == "table" and len(self._tables) > 0:
+            if self._in_target():
+                self._end_row()
+                self.done = True
+            self._tables.pop()
+
+        elif not self._in_candidate():
+            return
+
+        elif tag == "td":
+            self._end_cell()
+
+        elif tag == "tr":
+            self._end_row()
+
+    def _end_cell(self):
+        # type: () -> None
+        if self._cell is not None and self._row is not None:
+            self._row["cells"].append(self._cell)
+        self._cell = None
+
+    def _end_row(self):
+        # type: () -> None
+        self._end_cell()
+
+        (row, self._row) = (self._row, None)
+        if row is None or not self._in_target():
+            return
+
+        # The first row of the table provides the headers
+        if self._headers is None:
+            self._headers = list(map(self.captions.get, row["ths"]))
+            return
+
+        def convert_column(c):
+            text = "".join(c["text"])
+            if text != "":
+                return text
+            return c["img"] or ""
+
+        columns = list(map(convert_column, row["cells"]))[:-1]
+
+        if len(columns) != len(self._headers):
+            return
+
+        user_name = row["inputs"].get("userID")
+        if user_name is None:
+            return
+
+        try:
+            user_id = int(row["inputs"].get("student_internal_id"))
+        except (TypeError, ValueError):
+            return
+
+        user_record = dict(zip(self._headers, columns))
+        user_record["username"] = user_name
+        user_record["id"] = user_id
+
+        self.records.append(user_record)
@@ -0,0 +1,399 @@
+from __future__ import absolute_import
+
+import collections as _collections
+import contextlib as _contextlib
+import socket as _socket
+import sys as _sys
+import threading as _threading
+import time as _time
+import typing as _typing
+
+import bs4.element as _bs4_element
+import urllib3.connection as _urllib3_connection
+import urllib3.response as _urllib3_response
+
+import oneupsdk.integration.api
+import oneupsdk.integration.client
+import oneupsdk.integration.instrumentation
+import oneupsdk.integration.util
+
+
+# Phases that time is attributed to, in the order they are reported
+PHASE_DNS = "dns"
+PHASE_CONNECT = "connect"
+PHASE_TLS = "tls"
+PHASE_SEND = "send"
+PHASE_SERVER_WAIT = "server_wait"
+PHASE_DOWNLOAD = "download"
+PHASE_TREE = "tree_construction"
+PHASE_TRAVERSAL = "traversal"
+PHASE_WAIT = "wait"
+PHASE_PYTHON = "python"
+
+PHASES = [
+    PHASE_DNS,
+    PHASE_CONNECT,
+    PHASE_TLS,
+    PHASE_SEND,
+    PHASE_SERVER_WAIT,
+    PHASE_DOWNLOAD,
+    PHASE_TREE,
+    PHASE_TRAVERSAL,
+    PHASE_WAIT,
+    PHASE_PYTHON,
+]
+
+# Name of the call that requests made outside of any macro are attributed to
+NO_MACRO = "(no macro)"
+
+# Library functions that are timed as a phase while a profiler is active
+_PATCHES = [
+    (_socket, "getaddrinfo", PHASE_DNS),
+    (_urllib3_connection.HTTPConnection, "_new_conn", PHASE_CONNECT),
+    (_urllib3_connection.HTTPSConnection, "connect", PHASE_TLS),
+    (_urllib3_connection.HTTPConnection, "request", PHASE_SEND),
+    (_urllib3_connection.HTTPConnection, "getresponse", PHASE_SERVER_WAIT),
+    (_urllib3_response.HTTPResponse, "read", PHASE_DOWNLOAD),
+    (_urllib3_response.HTTPResponse, "read_chunked", PHASE_DOWNLOAD),
+    (_bs4_element.Tag, "find_all", PHASE_TRAVERSAL),
+    (_bs4_element.Tag, "find", PHASE_TRAVERSAL),
+    (oneupsdk.integration.util, "find_table", PHASE_TRAVERSAL),
+
+    # Macros that fan out wait for their worker threads (whose time is
+    # attributed to the macro as well)
+    (_threading.Event, "wait", PHASE_WAIT),
+]
+
+_active_profiler = None  # type: _typing.Optional[Profiler]
+_active_lock = _threading.Lock()
+_originals = []  # type: _typing.List[_typing.Tuple[_typing.Any, str, _typing.Any, bool]]
+
+
+def _timed_phase(original, phase):
+    # type: (_typing.Callable, str) -> _typing.Callable
+    def wrapper(*args, **kwargs):
+        profiler = _active_profiler
+        if profiler is None:
+            return original(*args, **kwargs)
+
+        entered = profiler._enter_phase(phase)
+        try:
+            return original(*args, **kwargs)
+        finally:
+            if entered:
+                profiler._exit(phase)
+    return wrapper
+
+
+def _install_patches():
+    # type: () -> None
+    for (owner, name, phase) in _PATCHES:
+        original = getattr(owner, name, None)
+        if original is None:
+            continue
+        # Methods may be inherited, in which case they are removed afterwards
+        own = name in vars(owner)
+        _originals.append((owner, name, original, own))
+        setattr(owner, name, _timed_phase(original, phase))
+
+
+def _remove_patches():
+    # type: () -> None
+    while len(_originals) > 0:
+        (owner, name, original, own) = _originals.pop()
+        if own:
+            setattr(owner, name, original)
+        else:
+            delattr(owner, name)
+
+
+###############################################################################
+# REPORT
+###############################################################################
+
+class ProfileReport(object):
+    """
+    Breakdown of the time spent in each macro (see `PHASES`): the number of
+    `calls` and their total wall time (`wall`), and the time attributed to
+    each phase (`phases`), by macro. Time spent in threads that a macro fans
+    out to is included, which is why the phases of concurrent macros can
+    add up to more than their wall time.
+    """
+
+    def __init__(self, calls, wall, phases, samples):
+        # type: (_typing.Dict[str, int], _typing.Dict[str, float], _typing.Dict[str, _typing.Dict[str, float]], _typing.Dict[tuple, float]) -> None
+        self.calls = calls
+        self.wall = wall
+        self.phases = phases
+        self.samples = samples
+
+    @property
+    def macros(self):
+        # type: () -> _typing.List[str]
+        return sorted(self.phases, key=lambda macro: -sum(self.phases[macro].values()))
+
+    def to_dict(self):
+        # type: () -> dict
+        return {
+            macro: {
+                "calls": self.calls.get(macro, 0),
+                "wall": self.wall.get(macro, 0.0),
+                "phases": dict(self.phases[macro]),
+            }
+            for macro in self.macros
+        }
+
+    def format(self):
+        # type: () -> str
+        """
+        Returns the breakdown as a table, with a row per macro and a column
+        per phase (in seconds).
+        """
+        widths = [max(len(phase), 7) for phase in PHASES]
+
+        header = "{:<32} {:>6} {:>8}".format("macro", "calls", "wall") + "".join(
+            " {:>{}}".format(phase, width) for (phase, width) in zip(PHASES, widths))
+        lines = [header, "-" * len(header)]
+
+        for macro in self.macros:
+            phases = self.phases[macro]
+            lines.append("{:<32} {:>6} {:>8.3f}".format(
+                macro[:32], self.calls.get(macro, 0), self.wall.get(macro, 0.0)) + "".join(
+                " {:>{}.3f}".format(phases.get(phase, 0.0), width)
+                for (phase, width) in zip(PHASES, widths)))
+
+        return "\n".join(lines)
+
+    def write_collapsed(self, path):
+        # type: (str) -> None
+        """
+        Writes the samples in the "collapsed stacks" format of flame graph
+        tools (such as `flamegraph.pl`, speedscope or inferno): one line per
+        stack of macro calls, requests and phases, with its time in
+        microseconds.
+        """
+        with open(path, "w") as f:
+            for (stack, elapsed) in sorted(self.samples.items()):
+                microseconds = int(round(elapsed * 1e6))
+                if microseconds > 0:
+                    f.write("{} {}\n".format(";".join(stack), microseconds))
+
+
+###############################################################################
+# PROFILER
+###############################################################################
+
+class Profiler(oneupsdk.integration.instrumentation.Observer, _contextlib.ContextDecorator):
+    """
+    Profiles the macro calls of a client (by default, the default client) in
+    a block of code, or in a decorated function, and attributes their time
+    to the network (DNS, connection, TLS handshake, sending the request,
+    waiting for the server and downloading the body), to BeautifulSoup (tree
+    construction and traversal), to waiting for the threads that the macro
+    fans out to, and to the rest of the Python code (such as building
+    records).
+
+    At the end of the block, the breakdown by macro is printed to `output`
+    (by default, the standard error) unless `quiet` is set and, if
+    `flamegraph` is set, the samples are written to that file in the
+    collapsed stacks format. The breakdown can also be retrieved with
+    `report`.
+
+    Profiling relies on the client's instrumentation and on timing some
+    functions of `socket`, `urllib3` and `bs4`, so only one profiler can be
+    active at a time. Time is attributed to the innermost phase (or macro
+    call, or request) of the thread it is spent in.
+    """
+
+    def __init__(self, client=None, output=None, quiet=False, flamegraph=None):
+        # type: (_typing.Optional[oneupsdk.integration.client.OneUpClient], _typing.Optional[_typing.TextIO], bool, _typing.Optional[str]) -> None
+        self.client = client
+        self.output = output
+        self.quiet = quiet
+        self.flamegraph = flamegraph
+
+        self._lock = _threading.Lock()
+        self._local = _threading.local()
+        self._samples = _collections.defaultdict(float)  # type: _typing.Dict[tuple, float]
+        self._calls = _collections.Counter()  # type: _typing.Dict[str, int]
+        self._wall = _collections.defaultdict(float)  # type: _typing.Dict[str, float]
+
+        self._client = None  # type: _typing.Optional[oneupsdk.integration.client.OneUpClient]
+        self._instrumentation = None  # type: _typing.Optional[oneupsdk.integration.instrumentation.Instrumentation]
+        self._owns_instrumentation = False
+
+    # Stacks of frames (macro calls, requests and phases), by thread
+
+    def _state(self):
+        local = self._local
+        if not hasattr(local, "stack"):
+            local.stack = []
+            local.base = 0
+            local.last = None
+        return local
+
+    def _charge(self, state, now):
+        if len(state.stack) > 0:
+            elapsed = now - state.last
+            with self._lock:
+                self._samples[tuple(state.stack)] += elapsed
+        state.last = now
+
+    def _enter(self, name, ancestors=()):
+        # type: (str, _typing.Sequence[str]) -> None
+        state = self._state()
+        self._charge(state, _time.perf_counter())
+
+        # Work handed over to another thread is attributed to the calls that
+        # handed it over
+        if len(state.stack) == 0:
+            state.stack.extend(ancestors)
+            state.base = len(ancestors)
+
+        state.stack.append(name)
+
+    def _enter_phase(self, phase):
+        # type: (str) -> bool
+        state = self._state()
+
+        # Only the work of the profiled calls is timed, and nested calls to
+        # the functions of the same phase are timed as one
+        if len(state.stack) == 0 or state.stack[-1] == phase:
+            return False
+
+        self._enter(phase)
+        return True
+
+    def _exit(self, name):
+        # type: (str) -> None
+        state = self._state()
+        if name not in state.stack[state.base:]:
+            return
+
+        self._charge(state, _time.perf_counter())
+        while state.stack.pop() != name:
+            pass
+
+        if len(state.stack) <= state.base:
+            del state.stack[:]
+            state.base = 0
+
+    # Observer
+
+    def macro_start(self, event):
+        # type: (oneupsdk.integration.instrumentation.MacroEvent) -> None
+        self._enter(event.name, ancestors=event.path[:-1])
+
+    def macro_end(self, event):
+        # type: (oneupsdk.integration.instrumentation.MacroEvent) -> None
+        self._exit(event.name)
+
+        if event.parent is None:
+            with self._lock:
+                self._calls[event.name] += 1
+                self._wall[event.name] += event.elapsed
+
+    def before_request(self, event):
+        # type: (oneupsdk.integration.instrumentation.RequestEvent) -> None
+        ancestors = [NO_MACRO] if event.macro is None else event.macro.path
+        self._enter("{} {}".format(event.method, event.endpoint), ancestors=ancestors)
+
+    def after_response(self, event):
+        # type: (oneupsdk.integration.instrumentation.RequestEvent) -> None
+        self._exit("{} {}".format(event.method, event.endpoint))
+
+    def parse_start(self, event):
+        # type: (oneupsdk.integration.instrumentation.ParseEvent) -> None
+        ancestors = [NO_MACRO] if event.macro is None else event.macro.path
+        self._enter(PHASE_TREE, ancestors=ancestors)
+
+    def parse_end(self, event):
+        # type: (oneupsdk.integration.instrumentation.ParseEvent) -> None
+        self._exit(PHASE_TREE)
+
+    # Activation
+
+    def start(self):
+        # type: () -> Profiler
+        global _active_profiler
+
+        with _active_lock:
+            if _active_profiler is not None:
+                raise RuntimeError("another profiler is already active")
+            _active_profiler = self
+            _install_patches()
+
+        client = self.client or oneupsdk.integration.api.get_default_client()
+
+        if client.instrumentation is None:
+            client.instrumentation = oneupsdk.integration.instrumentation.Instrumentation()
+            self._owns_instrumentation = True
+        self._instrumentation = client.instrumentation
+        self._instrumentation.add(self)
+        self._client = client
+
+        return self
+
+    def stop(self):
+        # type: () -> ProfileReport
+        global _active_profiler
+
+        self._instrumentation.remove(self)
+        if self._owns_instrumentation:
+            self._client.instrumentation = None
+            self._owns_instrumentation = False
+
+        with _active_lock:
+            _remove_patches()
+            _active_profiler = None
+
+        report = self.report()
+
+        if not self.quiet:
+            (self.output or _sys.stderr).write(report.format() + "\n")
+        if self.flamegraph is not None:
+            report.write_collapsed(self.flamegraph)
+
+        return report
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def report(self):
+        # type: () -> ProfileReport
+        """
+        Returns the breakdown of the time profiled so far.
+        """
+        with self._lock:
+            samples = dict(self._samples)
+            calls = dict(self._calls)
+            wall = dict(self._wall)
+
+        # Time spent in the frames of macro calls and requests themselves
+        # (outside of any timed phase) is spent running Python code
+        phases = dict()  # type: _typing.Dict[str, _typing.Dict[str, float]]
+        for (stack, elapsed) in samples.items():
+            phase = stack[-1] if stack[-1] in PHASES else PHASE_PYTHON
+            macro_phases = phases.setdefault(stack[0], _collections.OrderedDict(
+                (name, 0.0) for name in PHASES))
+            macro_phases[phase] += elapsed
+
+        return ProfileReport(calls=calls, wall=wall, phases=phases, samples=samples)
+
+
+def profile(client=None, output=None, quiet=False, flamegraph=None):
+    # type: (_typing.Optional[oneupsdk.integration.client.OneUpClient], _typing.Optional[_typing.TextIO], bool, _typing.Optional[str]) -> Profiler
+    """
+    Returns a `Profiler` of the macro calls of a client (by default, the
+    default client), to be used as a context manager or as a decorator:
+
+    ```python
+    with oneupsdk.integration.profiling.profile(flamegraph="oneup.folded"):
+        oneupsdk.integration.post_points_batch(data)
+    ```
+    """
+    return Profiler(client=client, output=output, quiet=quiet, flamegraph=flamegraph)
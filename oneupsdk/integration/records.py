@@ -0,0 +1,235 @@
+from __future__ import absolute_import
+
+import collections as _collections
+import datetime as _datetime
+import typing as _typing
+
+
+# Format of the dates and times in the forms of the OneUp platform
+DATETIME_FORMAT = "%m/%d/%Y %I:%M %p"
+
+
+def parse_datetime(value):
+    # type: (_typing.Any) -> _typing.Any
+    """
+    Parses a date and time from a OneUp form (such as `"06/20/2028 12:00 AM"`);
+    values that cannot be parsed are returned as they are.
+    """
+    if not isinstance(value, str) or value == "":
+        return value
+
+    try:
+        return _datetime.datetime.strptime(value.strip(), DATETIME_FORMAT)
+    except ValueError:
+        return value
+
+
+def format_datetime(value):
+    # type: (_typing.Any) -> _typing.Any
+    if isinstance(value, _datetime.datetime):
+        return value.strftime(DATETIME_FORMAT)
+    return value
+
+
+def _to_int(value):
+    # type: (_typing.Any) -> _typing.Any
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _to_float(value):
+    # type: (_typing.Any) -> _typing.Any
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class Record(object):
+    """
+    Base class of the compact, immutable records of the OneUp platform.
+
+    Fields are stored in slots (rather than in a dictionary per record), and
+    are accessed as attributes. Records compare and hash by value, which makes
+    them cheap to diff, and are also read-only mappings of their fields that
+    are set (not `None`), with the same keys and values as the dictionaries
+    that the macros have always returned (`dict(record)` converts them).
+    """
+
+    __slots__ = ()
+
+    _fields = ()  # type: _typing.Tuple[str, ...]
+
+    # Conversion of raw (scraped) values into typed values, by field
+    _converters = dict()  # type: _typing.Dict[str, _typing.Callable]
+
+    # Conversion of typed values back into the values of the mapping view
+    _renderers = dict()  # type: _typing.Dict[str, _typing.Callable]
+
+    def __init__(self, **kwargs):
+        unknown = set(kwargs) - set(self._fields)
+        if len(unknown) > 0:
+            raise TypeError("{}() got unexpected fields: {}".format(
+                type(self).__name__, ", ".join(sorted(unknown))))
+
+        for field in self._fields:
+            value = kwargs.get(field)
+            if value is not None and field in self._converters:
+                value = self._converters[field](value)
+            object.__setattr__(self, field, value)
+
+    @classmethod
+    def from_dict(cls, data):
+        # type: (_typing.Mapping) -> Record
+        if isinstance(data, cls):
+            return data
+        return cls(**{key: value for (key, value) in data.items() if key in cls._fields})
+
+    def replace(self, **changes):
+        # type: (_typing.Any) -> Record
+        """
+        Returns a copy of the record with some fields changed.
+        """
+        fields = dict(self.items())
+        fields.update(changes)
+        return type(self).from_dict(fields)
+
+    def _values(self):
+        # type: () -> tuple
+        return tuple(getattr(self, field) for field in self._fields)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} records are immutable".format(type(self).__name__))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self).__name__,) + self._values())
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(field, getattr(self, field))
+            for field in self._fields
+            if getattr(self, field) is not None))
+
+    def __getstate__(self):
+        return self._values()
+
+    def __setstate__(self, state):
+        for (field, value) in zip(self._fields, state):
+            object.__setattr__(self, field, value)
+
+    # Read-only mapping view
+
+    def keys(self):
+        # type: () -> _typing.List[str]
+        return [field for field in self._fields if getattr(self, field) is not None]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, key):
+        return key in self._fields and getattr(self, key) is not None
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+
+        value = getattr(self, key)
+        if key in self._renderers:
+            value = self._renderers[key](value)
+        return value
+
+    def get(self, key, default=None):
+        # type: (str, _typing.Any) -> _typing.Any
+        if key not in self:
+            return default
+        return self[key]
+
+    def items(self):
+        # type: () -> _typing.List[_typing.Tuple[str, _typing.Any]]
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        # type: () -> _typing.List[_typing.Any]
+        return [self[key] for key in self.keys()]
+
+    def to_dict(self):
+        # type: () -> dict
+        return dict(self.items())
+
+
+class Student(Record):
+    """
+    A student enrolled in a course, as listed in the roster (with their
+    `avatar_link` and `last_action`) or as described by their form (with their
+    `password`).
+    """
+
+    __slots__ = ("id", "username", "first", "last", "email", "avatar_link", "last_action", "password")
+
+    _fields = __slots__
+
+    _converters = {
+        "id": _to_int,
+    }
+
+
+class Activity(Record):
+    """
+    An activity of a course, as listed in the activities page, or as described
+    by its form (with its dates and settings). Dates and times are parsed into
+    `datetime` objects (but appear in the OneUp format in the mapping view).
+    """
+
+    __slots__ = ("id", "name", "category_id", "points", "description", "instructor_notes",
+                 "start_time", "end_time", "deadline", "is_graded", "file_upload", "attempts")
+
+    _fields = __slots__
+
+    _converters = {
+        "id": _to_int,
+        "category_id": _to_int,
+        "points": _to_float,
+        "start_time": parse_datetime,
+        "end_time": parse_datetime,
+        "deadline": parse_datetime,
+    }
+
+    _renderers = {
+        "start_time": format_datetime,
+        "end_time": format_datetime,
+        "deadline": format_datetime,
+    }
+
+
+class ActivityCategory(Record):
+    """
+    An activity category of a course.
+    """
+
+    __slots__ = ("id", "name")
+
+    _fields = __slots__
+
+    _converters = {
+        "id": _to_int,
+    }
+
+
+class Course(_collections.namedtuple("Course", ["id", "name"])):
+    """
+    A course that an instructor has access to. Courses are tuples of their ID
+    and name, as `get_instructor_courses` has always returned them.
+    """
+
+    __slots__ = ()
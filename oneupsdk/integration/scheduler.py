@@ -0,0 +1,221 @@
+from __future__ import absolute_import
+
+import random as _random
+import threading as _threading
+import time as _time
+import typing as _typing
+
+import requests as _requests
+import six as _six
+
+
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BACKOFF_BASE = 0.5  # seconds
+DEFAULT_BACKOFF_MAX = 30.0  # seconds
+
+# Statuses of transient failures, after which a request may be sent again
+DEFAULT_RETRY_STATUSES = [429, 502, 503, 504]
+
+# POST requests that set a state rather than create something, and are
+# therefore safe to send twice
+DEFAULT_REPLAYABLE_POSTS = [
+    "/oneUp/setCourse",
+    "/oneUp/instructors/activityAssignPoints",
+]
+
+IDEMPOTENT_METHODS = ["GET", "HEAD", "OPTIONS"]
+
+
+def _endpoint(url):
+    # type: (str) -> str
+    return _six.moves.urllib.parse.urlparse(url).path.rstrip("/")
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket, which lets through `rate` acquisitions per second
+    on average, in bursts of at most `burst` acquisitions.
+    """
+
+    def __init__(self, rate, burst=None, clock=_time.monotonic, sleep=_time.sleep):
+        # type: (float, _typing.Optional[float], _typing.Callable[[], float], _typing.Callable[[float], None]) -> None
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+
+        self._clock = clock
+        self._sleep = sleep
+
+        self._tokens = self.burst
+        self._updated_at = clock()
+        self._lock = _threading.Lock()
+
+    def acquire(self):
+        # type: () -> float
+        """
+        Takes a token, waiting for one to be available if needed, and returns
+        the time waited.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            # The token is reserved right away (the balance can go negative),
+            # so that waiting callers are served in order without holding the lock
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self._sleep(wait)
+
+        return wait
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed requests are sent again, and after how long.
+
+    Requests with an idempotent method (GET) are retried after a connection
+    error or a transient error status (`retry_statuses`); POST requests are
+    only retried if their endpoint is one of `replayable_posts`. Requests are
+    sent at most `max_attempts` times, with exponential backoff and full
+    jitter between attempts, unless the server asks for a delay (with
+    `Retry-After`).
+    """
+
+    def __init__(self,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_max=DEFAULT_BACKOFF_MAX,
+                 retry_statuses=None,
+                 replayable_posts=None):
+        # type: (int, float, float, _typing.Optional[_typing.Iterable[int]], _typing.Optional[_typing.Iterable[str]]) -> None
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.retry_statuses = set(
+            retry_statuses if retry_statuses is not None else DEFAULT_RETRY_STATUSES)
+        self.replayable_posts = set(map(
+            lambda path: path.rstrip("/"),
+            replayable_posts if replayable_posts is not None else DEFAULT_REPLAYABLE_POSTS))
+
+    def is_replayable(self, method, url):
+        # type: (str, str) -> bool
+        method = method.upper()
+        if method in IDEMPOTENT_METHODS:
+            return True
+        return method == "POST" and _endpoint(url) in self.replayable_posts
+
+    def should_retry(self, method, url, attempt, response=None, exc=None):
+        # type: (str, str, int, _typing.Optional[_requests.Response], _typing.Optional[Exception]) -> bool
+        if attempt >= self.max_attempts or not self.is_replayable(method, url):
+            return False
+
+        if exc is not None:
+            return isinstance(exc, (_requests.ConnectionError, _requests.Timeout))
+
+        return response is not None and response.status_code in self.retry_statuses
+
+    def delay(self, attempt, response=None):
+        # type: (int, _typing.Optional[_requests.Response]) -> float
+
+        # Honor the delay requested by the server, if any (in seconds only)
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    return min(self.backoff_max, max(0.0, float(retry_after)))
+                except ValueError:
+                    pass
+
+        return _random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+
+class Scheduler(object):
+    """
+    Paces and retries the requests made through a `Transport`.
+
+    Requests are limited to `rate` per second overall (in bursts of `burst`),
+    and to the rates of `endpoint_rates` (a dictionary mapping an endpoint,
+    such as `"/oneUp/instructors/activityAssignPoints"`, to a rate, or to a
+    `(rate, burst)` pair) for individual endpoints. At most `max_concurrency`
+    requests are in flight at any time. Failed requests are retried according
+    to `retry_policy`.
+
+    The scheduler is thread-safe: a single scheduler can be shared by several
+    transports, clients and threads (including the worker threads of the
+    asyncio client), so that they stay under the limits together.
+    """
+
+    def __init__(self,
+                 rate=None,
+                 burst=None,
+                 endpoint_rates=None,
+                 max_concurrency=None,
+                 retry_policy=None,
+                 sleep=_time.sleep):
+        # type: (_typing.Optional[float], _typing.Optional[float], _typing.Optional[dict], _typing.Optional[int], _typing.Optional[RetryPolicy], _typing.Callable[[float], None]) -> None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.max_concurrency = max_concurrency
+
+        self._sleep = sleep
+
+        self._bucket = None if rate is None else TokenBucket(rate, burst, sleep=sleep)
+
+        self._endpoint_buckets = dict()  # type: _typing.Dict[str, TokenBucket]
+        for (endpoint, endpoint_rate) in (endpoint_rates or dict()).items():
+            (endpoint_rate, endpoint_burst) = (
+                endpoint_rate if isinstance(endpoint_rate, (tuple, list)) else (endpoint_rate, None))
+            self._endpoint_buckets[endpoint.rstrip("/")] = TokenBucket(
+                endpoint_rate, endpoint_burst, sleep=sleep)
+
+        self._slots = (None if max_concurrency is None
+                       else _threading.BoundedSemaphore(max_concurrency))
+
+    def _acquire_rate(self, url):
+        # type: (str) -> None
+        if self._bucket is not None:
+            self._bucket.acquire()
+
+        bucket = self._endpoint_buckets.get(_endpoint(url))
+        if bucket is not None:
+            bucket.acquire()
+
+    def execute(self, method, url, send):
+        # type: (str, str, _typing.Callable[[], _requests.Response]) -> _requests.Response
+        """
+        Sends a request with `send()`, once its turn has come, and again for as
+        long as the retry policy allows it.
+        """
+        attempt = 0
+
+        while True:
+            attempt += 1
+            self._acquire_rate(url)
+
+            response = None
+            error = None
+
+            if self._slots is not None:
+                self._slots.acquire()
+            try:
+                response = send()
+            except _requests.RequestException as exc:
+                error = exc
+            finally:
+                if self._slots is not None:
+                    self._slots.release()
+
+            if not self.retry_policy.should_retry(method, url, attempt, response=response, exc=error):
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self.retry_policy.delay(attempt, response=response)
+
+            # Release the connection of the failed attempt back to the pool
+            if response is not None:
+                response.close()
+
+            self._sleep(delay)
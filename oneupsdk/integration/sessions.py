@@ -0,0 +1,150 @@
+from __future__ import absolute_import
+
+import contextlib as _contextlib
+import json as _json
+import os as _os
+import tempfile as _tempfile
+import threading as _threading
+import time as _time
+import typing as _typing
+
+try:
+    import fcntl as _fcntl
+except ImportError:  # pragma: no cover
+    # Windows: only the atomic replacement of the file protects it
+    _fcntl = None
+
+
+# Sessions this close to their expiry are not reused
+EXPIRY_MARGIN = 60  # seconds
+
+
+def is_session_valid(session, now=None):
+    # type: (_typing.Optional[dict], _typing.Optional[float]) -> bool
+    """
+    Checks that a stored session has both authentication cookies and is not
+    about to expire.
+    """
+    if session is None:
+        return False
+
+    cookies = session.get("cookies") or {}
+    if "sessionid" not in cookies or "csrftoken" not in cookies:
+        return False
+
+    expires = session.get("expires")
+    if expires is None:
+        return True
+
+    now = _time.time() if now is None else now
+    return expires - EXPIRY_MARGIN > now
+
+
+class MemorySessionStore(object):
+    """
+    Stores the authenticated sessions of OneUp accounts (their `sessionid` and
+    `csrftoken` cookies and expiry) for the lifetime of the process, so that
+    clients for the same account can share a login.
+    """
+
+    def __init__(self):
+        self._sessions = dict()  # type: _typing.Dict[str, dict]
+        self._lock = _threading.Lock()
+
+    def load(self, key):
+        # type: (str) -> _typing.Optional[dict]
+        with self._lock:
+            session = self._sessions.get(key)
+            return None if session is None else dict(session)
+
+    def save(self, key, session):
+        # type: (str, dict) -> None
+        with self._lock:
+            self._sessions[key] = dict(session)
+
+    def delete(self, key):
+        # type: (str) -> None
+        with self._lock:
+            self._sessions.pop(key, None)
+
+
+class FileSessionStore(object):
+    """
+    Stores the authenticated sessions of OneUp accounts (their `sessionid` and
+    `csrftoken` cookies and expiry) in a JSON file, so that they can be reused
+    across processes. Accesses are serialized with an advisory lock on a
+    companion `.lock` file, and the file is only readable by its owner.
+    """
+
+    def __init__(self, path):
+        # type: (str) -> None
+        self.path = _os.path.expanduser(path)
+        self.lock_path = self.path + ".lock"
+
+        self._thread_lock = _threading.Lock()
+
+        directory = _os.path.dirname(self.path)
+        if directory != "" and not _os.path.isdir(directory):
+            _os.makedirs(directory)
+
+    @_contextlib.contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if _fcntl is None:
+                yield
+                return
+
+            with open(self.lock_path, "a") as lock_file:
+                _fcntl.flock(lock_file.fileno(), _fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    _fcntl.flock(lock_file.fileno(), _fcntl.LOCK_UN)
+
+    def _read(self):
+        # type: () -> _typing.Dict[str, dict]
+        try:
+            with open(self.path) as f:
+                sessions = _json.load(f)
+        except (IOError, OSError, ValueError):
+            return dict()
+
+        return sessions if isinstance(sessions, dict) else dict()
+
+    def _write(self, sessions):
+        # type: (_typing.Dict[str, dict]) -> None
+
+        # mkstemp creates the file with owner-only permissions
+        (fd, tmp_path) = _tempfile.mkstemp(
+            dir=_os.path.dirname(self.path) or ".", suffix=".tmp")
+        with _os.fdopen(fd, "w") as f:
+            _json.dump(sessions, f)
+        _os.replace(tmp_path, self.path)
+
+    def load(self, key):
+        # type: (str) -> _typing.Optional[dict]
+        with self._locked():
+            return self._read().get(key)
+
+    def save(self, key, session):
+        # type: (str, dict) -> None
+        with self._locked():
+            sessions = self._read()
+
+            # Drop the sessions that have expired in the meantime
+            sessions = {
+                other_key: other_session
+                for (other_key, other_session) in sessions.items()
+                if is_session_valid(other_session)
+            }
+
+            sessions[key] = session
+            self._write(sessions)
+
+    def delete(self, key):
+        # type: (str) -> None
+        with self._locked():
+            sessions = self._read()
+            if key in sessions:
+                del sessions[key]
+                self._write(sessions)
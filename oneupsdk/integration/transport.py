@@ -0,0 +1,83 @@
+from __future__ import absolute_import
+
+import typing as _typing
+
+import requests as _requests
+import requests.adapters as _requests_adapters
+import urllib3.util.retry as _urllib3_retry
+
+import oneupsdk.integration.scheduler
+
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_MAX_RETRIES = 0
+
+
+class Transport(object):
+    """
+    Pooled, persistent HTTP session through which all calls to the OneUp
+    platform are made.
+
+    A single `requests.Session` is kept for the lifetime of the transport, so
+    that TCP/TLS connections are reused across calls instead of being
+    re-established for every request. Failed requests are retried, and
+    requests paced, by the `scheduler` only (see
+    `oneupsdk.integration.scheduler.Scheduler`); the connection pool itself
+    does not retry anything, unless `max_retries` is set, in which case it
+    retries as many failures to establish a connection (which are safe to
+    retry for both GET and POST requests), and nothing else.
+
+    Any object providing `get(url, **kwargs)` and `post(url, **kwargs)` methods
+    that return `requests.Response`-like objects can be used in place of this
+    class (see `oneupsdk.integration.api.set_transport`), for instance to
+    substitute a local stand-in server during tests.
+    """
+
+    def __init__(self,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 keep_alive=True,
+                 session=None,
+                 scheduler=None):
+        # type: (int, int, int, bool, _typing.Optional[_requests.Session], _typing.Optional[oneupsdk.integration.scheduler.Scheduler]) -> None
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.keep_alive = keep_alive
+
+        self.session = session or _requests.Session()
+        self.scheduler = scheduler or oneupsdk.integration.scheduler.Scheduler()
+
+        adapter = _requests_adapters.HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=_urllib3_retry.Retry(
+                total=max_retries, connect=max_retries, read=False, status=0, redirect=False),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        # type: (str, str, _typing.Any) -> _requests.Response
+        return self.scheduler.execute(
+            method=method,
+            url=url,
+            send=lambda: self.session.request(method=method, url=url, **kwargs))
+
+    def get(self, url, **kwargs):
+        # type: (str, _typing.Any) -> _requests.Response
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        # type: (str, _typing.Any) -> _requests.Response
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        # type: () -> None
+        """
+        Release all pooled connections.
+        """
+        self.session.close()
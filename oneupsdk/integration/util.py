@@ -1,9 +1,18 @@
 
+import collections as _collections
+import concurrent.futures as _futures
+import contextvars as _contextvars
 import csv as _csv
+import typing as _typing
 
 import bs4 as _bs4
 
 
+DEFAULT_MAX_WORKERS = 8
+
+BulkResult = _collections.namedtuple("BulkResult", ["key", "value", "error"])
+
+
 def parse_csv(content):
     records = [
         record
@@ -40,4 +49,32 @@ def find_table(soup, header_query, exact=True):
 
 def get_tag_text(parent):
     # https://stackoverflow.com/a/30159450/408734
-    return ''.join(parent.find_all(text=True, recursive=False)).strip()
\ No newline at end of file
+    return ''.join(parent.find_all(text=True, recursive=False)).strip()
+
+
+def fan_out(func, items, max_workers=None):
+    # type: (_typing.Callable, _typing.Iterable, _typing.Optional[int]) -> _typing.Iterator[BulkResult]
+    """
+    Calls `func` on each item from a pool of `max_workers` threads (by default
+    `DEFAULT_MAX_WORKERS`), and yields a `BulkResult` for each item as soon as
+    it completes. An exception raised for one item is reported in its result
+    rather than aborting the batch.
+
+    Each call runs in a copy of the caller's context, so that its requests are
+    attributed to the macro call that fanned out (see `instrumentation`).
+    """
+    with _futures.ThreadPoolExecutor(max_workers=max_workers or DEFAULT_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(_contextvars.copy_context().run, func, item): item
+            for item in items
+        }
+
+        for future in _futures.as_completed(futures):
+            item = futures[future]
+            try:
+                value = future.result()
+            except Exception as exc:
+                yield BulkResult(key=item, value=None, error=exc)
+                continue
+
+            yield BulkResult(key=item, value=value, error=None)
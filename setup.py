@@ -29,7 +29,7 @@ setup(
         "Programming Language :: Python :: 3",
         "Programming Language :: Python :: 3.7",
     ],
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     install_requires=[
         "bs4",
         "confuse",
@@ -42,5 +42,17 @@ setup(
         # "colorama",
         # "eliot",
     ],
+    extras_require={
+        "lxml": ["lxml"],
+        "numpy": ["numpy"],
+        "arrow": ["pyarrow"],
+        "pandas": ["pandas"],
+        "otel": ["opentelemetry-api"],
+    },
+    entry_points={
+        "console_scripts": [
+            "oneup = oneupsdk.cli:main",
+        ],
+    },
     include_package_data=True,
 )
@@ -0,0 +1,49 @@
+"""
+Fixtures running the macros against the local stand-in for the OneUp
+platform (see `benchmarks.fake_server`), so that no account or network
+access is needed.
+"""
+
+import pytest
+
+import oneupsdk.integration.client
+
+import benchmarks.fake_server
+
+
+USERNAME = "instructor@example.edu"
+PASSWORD = "instructor"
+
+
+@pytest.fixture
+def server():
+    with benchmarks.fake_server.FakeOneUpServer(students=3, activities=3, courses=2) as server:
+        yield server
+
+
+@pytest.fixture
+def make_client(server):
+    clients = []
+
+    def make_client(**kwargs):
+        client = oneupsdk.integration.client.OneUpClient(
+            username=USERNAME, password=PASSWORD, base_url=server.url, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make_client
+
+    for client in clients:
+        client.transport.close()
+
+
+@pytest.fixture
+def course(server):
+    return server.state.courses[1]
+
+
+@pytest.fixture
+def client(make_client, course):
+    client = make_client()
+    client.set_active_course(course.id)
+    return client
@@ -0,0 +1,19 @@
+import asyncio
+
+import oneupsdk.integration.aio
+
+
+def test_client_is_usable_from_successive_loops(client, course):
+    async_client = oneupsdk.integration.aio.AsyncOneUpClient(client=client, max_concurrency=1)
+    usernames = list(course.students)
+
+    async def get_students():
+        return await asyncio.gather(*[
+            async_client.get_student_by_username(username) for username in usernames])
+
+    try:
+        for _ in range(2):
+            students = asyncio.run(get_students())
+            assert [student["username"] for student in students] == usernames
+    finally:
+        async_client.close()
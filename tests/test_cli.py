@@ -0,0 +1,32 @@
+import argparse
+import io
+import json
+
+import oneupsdk.cli
+import oneupsdk.integration
+import oneupsdk.integration.client
+
+
+def test_post_points_keeps_falsy_activity_ids(tmp_path, monkeypatch):
+    path = tmp_path / "points.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in [
+        {"activity_id": 0, "id": 1, "points": 5},
+        {"id": 2, "points": 7},
+    ]))
+
+    posted = dict()
+
+    def post_points_batch(data, max_workers=None, dry_run=False):
+        posted.update(data)
+        return {
+            activity_id: oneupsdk.integration.client.PointsReport(
+                activity_id=activity_id, changes={}, submitted=False, ok=True)
+            for activity_id in data
+        }
+
+    monkeypatch.setattr(oneupsdk.integration, "post_points_batch", post_points_batch, raising=False)
+
+    args = argparse.Namespace(file=str(path), format=None, activity=9, workers=None, dry_run=True)
+    assert oneupsdk.cli.cmd_post_points(args, oneupsdk.cli.JSONLWriter(io.StringIO()))
+
+    assert posted == {0: [{"id": 1, "points": 5}], 9: [{"id": 2, "points": 7}]}
@@ -0,0 +1,27 @@
+import oneupsdk.integration.export
+
+
+def test_gradebook_of_a_generator_of_activities(client, course):
+    activity_ids = list(course.activities.keys())
+    (student_id, activity_id) = (next(iter(course.students.values()))["id"], activity_ids[0])
+    course.activities[activity_id]["grades"][student_id] = (7, "Good")
+    course.pages.clear()
+
+    gradebook = oneupsdk.integration.export.get_gradebook(
+        client=client, activity_ids=(activity_id for activity_id in activity_ids))
+
+    assert gradebook.shape == (len(course.students), len(activity_ids))
+    assert gradebook.activity_ids == activity_ids
+    assert gradebook.points[gradebook.student_ids.index(student_id)][0] == 7.0
+    assert gradebook.feedback[gradebook.student_ids.index(student_id)][0] == "Good"
+
+
+def test_assigned_points(client, course):
+    activity_id = next(iter(course.activities))
+    student_id = next(iter(course.students.values()))["id"]
+    course.activities[activity_id]["grades"][student_id] = (3, "Late")
+
+    (points, feedback) = client.get_assigned_points(activity_id)
+
+    assert sorted(points) == sorted(student["id"] for student in course.students.values())
+    assert (points[student_id], feedback[student_id]) == ("3", "Late")
@@ -0,0 +1,38 @@
+def test_points_of_a_student_enrolled_since_the_roster_was_cached(client, make_client, course):
+    client.get_roster()
+
+    other = make_client()
+    other.set_active_course(course.id)
+    assert other.add_student(email="late@example.edu", password="late", username="late")
+
+    activity_id = next(iter(course.activities))
+    report = client.post_activity_points(activity_id, [{"email": "late@example.edu", "points": 10}])
+
+    student_id = course.students["late"]["id"]
+    assert report.ok and report.unresolved == []
+    assert report.changes == {student_id: {"points": ("", 10)}}
+    assert course.activities[activity_id]["grades"][student_id][0] == "10"
+
+
+def test_points_of_unknown_students_are_reported(client, course):
+    activity_id = next(iter(course.activities))
+    student_id = next(iter(course.students.values()))["id"]
+
+    report = client.post_activity_points(activity_id, [
+        {"email": "nobody@example.edu", "points": 10},
+        {"id": student_id, "points": 4},
+    ])
+
+    assert not report.ok
+    assert report.unresolved == ["nobody@example.edu"]
+    assert course.activities[activity_id]["grades"][student_id][0] == "4"
+
+
+def test_roster_of_a_course_bound_client_is_downloaded_once(make_client, course, server):
+    client = make_client().for_course(course.id)
+
+    client.get_roster()
+    client.get_roster()
+
+    assert list(client._rosters) == [course.id]
+    assert server.state.requests["/oneUp/instructors/createStudentList"] == 1
@@ -0,0 +1,38 @@
+import oneupsdk.integration.cache
+
+
+def test_points_are_diffed_against_the_current_form(make_client, course):
+    client = make_client(response_cache=oneupsdk.integration.cache.ResponseCache(ttl=None))
+    client.set_active_course(course.id)
+
+    activity_id = next(iter(course.activities))
+    (student, other) = list(course.students.values())[:2]
+
+    # Cache the form, then change the grades behind the client's back
+    client.get_assigned_points(activity_id)
+    course.activities[activity_id]["grades"][student["id"]] = (5, "")
+    course.activities[activity_id]["grades"][other["id"]] = (8, "Redone")
+    course.pages.clear()
+
+    report = client.post_activity_points(
+        activity_id, [{"id": student["id"], "points": 5}], dry_run=True)
+    assert report.changes == {}
+
+    report = client.post_activity_points(
+        activity_id, [{"id": student["id"], "points": 6}])
+    assert report.ok
+    assert report.changes == {student["id"]: {"points": ("5", 6)}}
+    assert course.activities[activity_id]["grades"][other["id"]] == ("8", "Redone")
+
+
+def test_modified_students_keep_their_current_fields(make_client, course):
+    client = make_client(response_cache=oneupsdk.integration.cache.ResponseCache(ttl=None))
+    client.set_active_course(course.id)
+
+    username = next(iter(course.students))
+    client.get_student_by_username(username)
+    course.students[username]["last"] = "Changed"
+    course.pages.clear()
+
+    assert client.modify_student(username, first="Renamed")
+    assert (course.students[username]["first"], course.students[username]["last"]) == ("Renamed", "Changed")
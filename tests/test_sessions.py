@@ -0,0 +1,173 @@
+import io
+import threading
+import time
+
+import pytest
+import requests
+
+import oneupsdk.integration.exceptions
+import oneupsdk.integration.sessions
+
+
+LOGIN_PAGE = (b"<html><body><form method=\"post\"><input name=\"username\">"
+              b"<input type=\"password\" name=\"password\"></form></body></html>")
+
+
+def _student_ids(client):
+    return sorted(student["id"] for student in client.get_enrolled_students())
+
+
+def _course_student_ids(course):
+    return sorted(student["id"] for student in course.students.values())
+
+
+def test_clients_sharing_a_session_file_keep_their_course(make_client, server, tmp_path):
+    path = str(tmp_path / "sessions.json")
+    (course_1, course_2) = (server.state.courses[1], server.state.courses[2])
+
+    client_a = make_client(session_store=oneupsdk.integration.sessions.FileSessionStore(path))
+    assert client_a.set_active_course(course_1.id)
+    assert _student_ids(client_a) == _course_student_ids(course_1)
+
+    client_b = make_client(session_store=oneupsdk.integration.sessions.FileSessionStore(path))
+    assert client_b.set_active_course(course_2.id)
+    assert _student_ids(client_b) == _course_student_ids(course_2)
+
+    # Switching the course of B does not switch that of A
+    assert _student_ids(client_a) == _course_student_ids(course_1)
+    assert client_a.get_active_course(refresh=True) == course_1.id
+
+
+def test_session_of_a_course_is_reused(make_client, server, tmp_path):
+    path = str(tmp_path / "sessions.json")
+    course = server.state.courses[1]
+
+    client_a = make_client(session_store=oneupsdk.integration.sessions.FileSessionStore(path))
+    assert client_a.set_active_course(course.id)
+    logins = server.state.logins
+
+    client_b = make_client(session_store=oneupsdk.integration.sessions.FileSessionStore(path))
+    assert client_b.set_active_course(course.id)
+    assert _student_ids(client_b) == _course_student_ids(course)
+    assert server.state.logins == logins
+
+
+def _switch_stored_session(server, store, key, course_id):
+    # Another process (or an older client) switches the course of a stored
+    # session behind the back of the clients that restore it
+    session_id = store.load(key)["cookies"]["sessionid"]
+    server.state.sessions[session_id] = course_id
+
+
+def test_restored_course_is_looked_up_again(make_client, server):
+    store = oneupsdk.integration.sessions.MemorySessionStore()
+
+    client_a = make_client(session_store=store)
+    assert client_a.get_active_course() is None
+
+    _switch_stored_session(server, store, client_a._session_key(), 2)
+
+    client_b = make_client(session_store=store)
+    assert client_b.get_active_course() == 2
+
+
+def test_restored_session_is_bound_again(make_client, server):
+    store = oneupsdk.integration.sessions.MemorySessionStore()
+    (course_1, course_2) = (server.state.courses[1], server.state.courses[2])
+
+    client_a = make_client(session_store=store, course_id=course_1.id)
+    assert _student_ids(client_a) == _course_student_ids(course_1)
+
+    _switch_stored_session(server, store, client_a._session_key(), course_2.id)
+
+    client_b = make_client(session_store=store, course_id=course_1.id)
+    assert _student_ids(client_b) == _course_student_ids(course_1)
+    assert client_b.get_active_course() == course_1.id
+
+
+def _html_response(url, body, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response.raw = io.BytesIO(body)
+    return response
+
+
+def _answer_once(client, monkeypatch, path, response):
+    get = client.transport.get
+    answered = []
+
+    def answer(url, **kwargs):
+        if path in url and not answered:
+            answered.append(url)
+            return response(url)
+        return get(url, **kwargs)
+
+    monkeypatch.setattr(client.transport, "get", answer)
+
+
+def test_streamed_login_form_logs_in_again(client, course, server, monkeypatch):
+    logins = server.state.logins
+    _answer_once(client, monkeypatch, "createStudentList", lambda url: _html_response(url, LOGIN_PAGE))
+
+    assert sorted(student["id"] for student in client.iter_enrolled_students()) == _course_student_ids(course)
+    assert server.state.logins == logins + 1
+
+
+def test_forbidden_is_not_a_session_expiry(client, server, monkeypatch):
+    logins = server.state.logins
+    _answer_once(client, monkeypatch, "createStudentList",
+                 lambda url: _html_response(url, b"CSRF verification failed.", status=403))
+
+    with pytest.raises(oneupsdk.integration.exceptions.OneUpAPIException):
+        client.get_enrolled_students()
+    assert server.state.logins == logins
+
+
+def _outcome(action):
+    try:
+        return action()
+    except Exception as exc:
+        return exc
+
+
+def _while_selecting_course(client, monkeypatch, action):
+    # Runs `action` in another thread while the first course selection of
+    # the client is in flight, and returns a function waiting for its outcome
+    post = client.transport.post
+    outcomes = []
+    workers = []
+
+    def select_course(url, **kwargs):
+        if url.endswith("/oneUp/setCourse") and not workers:
+            workers.append(threading.Thread(target=lambda: outcomes.append(_outcome(action))))
+            workers[0].start()
+            time.sleep(0.3)
+        return post(url, **kwargs)
+
+    monkeypatch.setattr(client.transport, "post", select_course)
+
+    def outcome():
+        workers[0].join()
+        return outcomes[0]
+
+    return outcome
+
+
+def test_new_session_is_used_once_its_course_is_selected(client, course, server, monkeypatch):
+    assert _student_ids(client) == _course_student_ids(course)
+    server.state.sessions.clear()
+
+    outcome = _while_selecting_course(client, monkeypatch, lambda: _student_ids(client))
+
+    assert _student_ids(client) == _course_student_ids(course)
+    assert outcome() == _course_student_ids(course)
+
+
+def test_course_bound_session_is_used_once_its_course_is_selected(make_client, course, monkeypatch):
+    client = make_client().for_course(course.id)
+    outcome = _while_selecting_course(client, monkeypatch, lambda: _student_ids(client))
+
+    assert _student_ids(client) == _course_student_ids(course)
+    assert outcome() == _course_student_ids(course)
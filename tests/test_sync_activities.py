@@ -0,0 +1,65 @@
+import requests
+
+
+def _spec(course, **fields):
+    return {
+        "activities": [
+            dict({"name": activity["name"]}, **fields)
+            for activity in course.activities.values()
+        ],
+    }
+
+
+def test_boolean_fields_can_be_set_and_cleared(client, course):
+    report = client.sync_activities(_spec(course, is_graded=True))
+    assert report
+    assert all(activity["is_graded"] for activity in course.activities.values())
+
+    report = client.sync_activities(_spec(course, is_graded=False))
+    assert report
+    assert sorted(report.modified) == sorted(activity["name"] for activity in course.activities.values())
+    assert not any(activity["is_graded"] for activity in course.activities.values())
+
+    # Once applied, the specification no longer changes anything
+    report = client.sync_activities(_spec(course, is_graded=False))
+    assert report.modified == {}
+
+
+def test_modify_activity_clears_boolean_fields(client, course):
+    activity = next(iter(course.activities.values()))
+    activity["is_graded"] = True
+    course.pages.clear()
+
+    assert client.modify_activity(activity["id"], is_graded=False)
+    assert activity["is_graded"] is False
+    assert client.get_activity_by_id(activity["id"])["is_graded"] is False
+
+
+def test_unapplied_form_fields_are_reported_as_failed(client, course, monkeypatch):
+    # Changes that the server ignores must not be reported as applied
+    monkeypatch.setattr(client, "_modify_activity", lambda activity_info, **kwargs: True)
+
+    report = client.sync_activities(_spec(course, instructor_notes="Notes"))
+
+    assert report.modified == {}
+    assert sorted(report.failed) == sorted(activity["name"] for activity in course.activities.values())
+
+
+def test_rejected_categories_are_reported_apart_from_activities(client, course, monkeypatch):
+    def create_category(name, xp_weight=1):
+        response = requests.Response()
+        response.status_code = 500
+        return response
+
+    monkeypatch.setattr(client, "_create_activity_category", create_category)
+
+    report = client.sync_activities({
+        "categories": ["Quizzes"],
+        "activities": [{"name": "Quizzes", "category": "Quizzes", "points": 5}],
+    })
+
+    assert not report
+    assert report.categories_added == []
+    assert list(report.categories_failed) == ["Quizzes"]
+    assert isinstance(report.failed["Quizzes"], ValueError)
+    assert "Quizzes" not in course.categories.values()
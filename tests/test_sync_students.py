@@ -0,0 +1,46 @@
+def _records(course, **changes):
+    # Records with the email of each student, but without their username
+    return [
+        dict({"email": student["email"], "first": student["first"], "last": student["last"]}, **changes)
+        for student in course.students.values()
+    ]
+
+
+def test_email_only_records_are_unchanged(client, course):
+    report = client.sync_students(_records(course), dry_run=True)
+
+    assert report.modified == {}
+    assert sorted(report.unchanged) == sorted(course.students.keys())
+
+
+def test_email_only_records_keep_usernames(client, course):
+    usernames = list(course.students.keys())
+
+    report = client.sync_students(_records(course, last="Renamed"))
+
+    assert report
+    assert sorted(report.modified) == sorted(usernames)
+    assert all(set(changes) == {"last"} for changes in report.modified.values())
+    assert sorted(course.students.keys()) == sorted(usernames)
+    assert all(student["last"] == "Renamed" for student in course.students.values())
+
+
+def test_missing_students_are_kept_by_default(client, course):
+    usernames = list(course.students.keys())
+
+    report = client.sync_students(_records(course)[:1])
+
+    assert report.deleted == []
+    assert sorted(course.students.keys()) == sorted(usernames)
+
+
+def test_records_without_identifier_are_failed(client, course):
+    usernames = list(course.students.keys())
+    records = _records(course) + [{"first": "No", "last": "Identifier", "password": "secret"}]
+
+    report = client.sync_students(records)
+
+    assert not report
+    assert list(report.failed) == ["#{}".format(len(records) - 1)]
+    assert report.added == []
+    assert sorted(course.students.keys()) == sorted(usernames)
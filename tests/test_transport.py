@@ -0,0 +1,19 @@
+import oneupsdk.integration.transport
+
+
+def test_connection_pool_does_not_retry_by_default():
+    transport = oneupsdk.integration.transport.Transport()
+    try:
+        retries = transport.session.get_adapter("https://oneup.example.edu").max_retries
+        assert (retries.total, retries.connect, retries.read, retries.status) == (0, 0, False, 0)
+    finally:
+        transport.close()
+
+
+def test_connection_pool_only_retries_connections():
+    transport = oneupsdk.integration.transport.Transport(max_retries=2)
+    try:
+        retries = transport.session.get_adapter("https://oneup.example.edu").max_retries
+        assert (retries.connect, retries.read, retries.status) == (2, False, 0)
+    finally:
+        transport.close()